@@ -1,21 +1,28 @@
-import google.generativeai as genai
 import os
+import sys
 from dotenv import load_dotenv
 
-load_dotenv()
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+# The shared LLM client lives in common/ at the repository root
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from common.llm_client import get_client
+from common.token_accounting import session_usage
 
+load_dotenv()
 
+GEMINI_MODEL = "gemini-1.5-flash"
 
 
-def get_gemini_response(prompt: str) -> str:    
-    model = genai.GenerativeModel("gemini-1.5-flash")
-    response = model.generate_content(prompt)    
-    print(f"Prompt Tokens: {model.count_tokens(prompt).total_tokens}")
-    print(f"Response Tokens: {model.count_tokens(response.text).total_tokens}")
+def get_gemini_response(prompt: str) -> str:
+    # One pooled keep-alive session for every call instead of a new model client per call
+    client = get_client()
+    response = client.complete("gemini", GEMINI_MODEL, prompt)
+    # Token counts come from the response's usage metadata, not extra count_tokens calls
+    print(f"Prompt Tokens: {response.usage.input_tokens}")
+    print(f"Response Tokens: {response.usage.output_tokens}")
     return response.text
 
 if __name__ == "__main__":
     user_question = input("\nEnter your question for Gemini: ")
     response = get_gemini_response(user_question)
     print("Gemini Response:", response)
+    print(f"Session usage: {session_usage.total()}")
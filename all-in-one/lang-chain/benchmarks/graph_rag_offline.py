@@ -0,0 +1,274 @@
+"""
+Offline end-to-end benchmark of GraphRAGSystem with local stand-ins.
+
+Neo4j, the chat model and the embedding model are replaced by
+graph_rag.fakes.InMemoryGraph, a scripted FakeChatModel with fixed
+latency and DeterministicFakeEmbedding, so the numbers measure the
+system's own scheduling, batching and caching overhead and can run in CI.
+
+Measured: ingest rows/sec and chunks/sec, LLM calls per chunk, hybrid
+retrieval p50/p95, Cypher QA and end-to-end (retrieve + answer) p50/p95, and the
+throughput of answer_questions() over the same questions.
+The benchmark runs --repeat times and reports the median of each metric.
+Results are compared with a stored baseline; a metric worse than the
+baseline by more than --tolerance is reported and the exit code is 1.
+Latencies must also be worse by more than --min-delta-ms, because a few
+milliseconds of wall-clock p95 differ between machines and runs.
+
+Usage (from all-in-one/lang-chain):
+    python benchmarks/graph_rag_offline.py --script gemini
+    python benchmarks/graph_rag_offline.py --script perpexity --save-baseline
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.append(ROOT)
+from graph_rag.embedding_service import CachedEmbeddingService, EmbeddingCache
+from graph_rag.fakes import FakeChatModel, InMemoryGraph, default_responder
+from graph_rag.schema_cache import SchemaSnapshotStore
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "graph_rag_offline.json")
+
+# metric -> True when higher is better
+METRICS = {
+    "ingest_rows_per_sec": True,
+    "ingest_chunks_per_sec": True,
+    "llm_calls_per_chunk": False,
+    "retrieval_p50_ms": False,
+    "retrieval_p95_ms": False,
+    "cypher_qa_p50_ms": False,
+    "cypher_qa_p95_ms": False,
+    "answer_p50_ms": False,
+    "answer_p95_ms": False,
+    "batch_questions_per_sec": True,
+}
+
+TECHNOLOGIES = ["Neo4j", "LangChain", "GraphRAG", "OpenAI", "Gemini", "Perplexity", "Azure", "Python",
+                "Kubernetes", "Postgres", "Redis", "Kafka", "Spark", "PyTorch", "Whisper", "Ollama"]
+VERBS = ["integrates with", "stores data for", "is deployed on", "improves", "depends on", "streams into"]
+
+
+def synthetic_corpus(docs: int, sentences: int, seed: int = 7):
+    """Documents of capitalised entity mentions, so the fake LLM extracts a connected graph"""
+    rng = random.Random(seed)
+    for i in range(docs):
+        lines = []
+        for _ in range(sentences):
+            a, b = rng.sample(TECHNOLOGIES, 2)
+            lines.append(f"{a} {rng.choice(VERBS)} {b} in Project{i % 25}.")
+        yield f"doc-{i}", " ".join(lines)
+
+
+def scripted_responder(prompt: str) -> str:
+    """Plausible answers for each prompt the system sends"""
+    if "Cypher" in prompt and "Schema" in prompt:
+        return "MATCH (s:`__Entity__`)-[r]->(t:`__Entity__`) RETURN s.name AS source, type(r) AS rel, t.name AS target LIMIT 10"
+    if "Helpful Answer" in prompt or prompt.rstrip().endswith("Answer:"):
+        return "Neo4j stores the graph and LangChain connects it to the language model."
+    return default_responder(prompt)
+
+
+def load_system_class(script: str):
+    path = os.path.join(ROOT, script, "03_graph-rag.py")
+    spec = importlib.util.spec_from_file_location(f"graph_rag_{script}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.GraphRAGSystem
+
+
+def offline_system(base, llm_latency: float, graph_latency: float):
+    class OfflineGraphRAGSystem(base):
+        def _initialize_neo4j_connection(self):
+            graph = InMemoryGraph(write_latency=graph_latency, read_latency=graph_latency)
+            self.schema_store = SchemaSnapshotStore(os.environ["SCHEMA_SNAPSHOT_DIR"])
+            self.schema_store.sync(graph)
+            return graph
+
+        def _initialize_llm(self):
+            return FakeChatModel(latency=llm_latency, responder=scripted_responder)
+
+        def _initialize_embeddings(self):
+            return CachedEmbeddingService(
+                DeterministicFakeEmbedding(size=384),
+                model_name="deterministic-fake-384",
+                cache=EmbeddingCache(os.environ["EMBEDDING_CACHE_PATH"])
+            )
+
+        def _create_text_splitter(self):
+            # TokenTextSplitter downloads its BPE file on first use; ~512 tokens of English text instead
+            return RecursiveCharacterTextSplitter(chunk_size=2048, chunk_overlap=96)
+
+    return OfflineGraphRAGSystem()
+
+
+def percentiles(samples_ms):
+    return float(np.percentile(samples_ms, 50)), float(np.percentile(samples_ms, 95))
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def run(args) -> dict:
+    workdir = tempfile.mkdtemp(prefix="graph_rag_bench_")
+    os.environ.update({
+        "VECTOR_BACKEND": "local",
+        "LOCAL_VECTOR_PATH": os.path.join(workdir, "vectors"),
+        "EXTRACTION_CACHE_PATH": os.path.join(workdir, "extraction.sqlite"),
+        "EMBEDDING_CACHE_PATH": os.path.join(workdir, "embeddings.sqlite"),
+        "CYPHER_CACHE_PATH": os.path.join(workdir, "cypher_cache.json"),
+        "SCHEMA_SNAPSHOT_DIR": os.path.join(workdir, "schema"),
+        "PIPELINE_CHECKPOINT_PATH": os.path.join(workdir, "checkpoint.json"),
+        "INGEST_MANIFEST_PATH": os.path.join(workdir, "manifest.json"),
+        "EXTRACTION_RPS": "1000",
+        "CONTEXT_TOKENIZER": "estimate",
+    })
+    log = io.StringIO()
+    quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(log)
+    try:
+        with quiet:
+            system = offline_system(load_system_class(args.script), args.llm_latency, args.graph_latency)
+
+            start = time.perf_counter()
+            ingest = system.ingest_streaming(synthetic_corpus(args.docs, args.sentences))
+            ingest_seconds = time.perf_counter() - start
+            chunks = ingest.stages["splitter"].items_out
+            calls_per_chunk = system.llm.calls / chunks if chunks else 0.0
+            rows = len(system.graph.nodes) + len(system.graph.edges)
+
+            vector_index = system.create_vector_index()
+            questions = [f"What does {a} integrate with in Project{i % 25}?"
+                         for i, a in enumerate(TECHNOLOGIES * (args.questions // len(TECHNOLOGIES) + 1))]
+            questions = questions[:args.questions]
+
+            retrieval_ms, answer_ms = [], []
+            for question in questions:
+                context, elapsed = timed(system.hybrid_retrieval, question, vector_index)
+                retrieval_ms.append(elapsed)
+                _, answer_elapsed = timed(system.generate_answer_with_context, question, context)
+                answer_ms.append(elapsed + answer_elapsed)
+
+            chain = system.setup_cypher_qa_chain()
+            cypher_ms = [timed(system.query_graph_with_natural_language, q, chain)[1] for q in questions]
+
+            start = time.perf_counter()
+            answered = sum(1 for _ in system.answer_questions(questions, vector_index, chain))
+            batch_seconds = time.perf_counter() - start
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    retrieval_p50, retrieval_p95 = percentiles(retrieval_ms)
+    cypher_p50, cypher_p95 = percentiles(cypher_ms)
+    answer_p50, answer_p95 = percentiles(answer_ms)
+    return {
+        "ingest_rows_per_sec": rows / ingest_seconds,
+        "ingest_chunks_per_sec": chunks / ingest_seconds,
+        "llm_calls_per_chunk": calls_per_chunk,
+        "retrieval_p50_ms": retrieval_p50,
+        "retrieval_p95_ms": retrieval_p95,
+        "cypher_qa_p50_ms": cypher_p50,
+        "cypher_qa_p95_ms": cypher_p95,
+        "answer_p50_ms": answer_p50,
+        "answer_p95_ms": answer_p95,
+        "batch_questions_per_sec": answered / batch_seconds,
+    }
+
+
+def median_results(runs: list) -> dict:
+    return {name: float(np.median([results[name] for results in runs])) for name in runs[0]}
+
+
+def compare(results: dict, baseline: dict, tolerance: float, min_delta_ms: float = 0.0) -> list:
+    regressions = []
+    for name, higher_is_better in METRICS.items():
+        if name not in baseline:
+            continue
+        old, new = baseline[name], results[name]
+        if old <= 0:
+            continue
+        if name.endswith("_ms") and new - old <= min_delta_ms:
+            continue
+        change = (new - old) / old
+        worse = -change if higher_is_better else change
+        if worse > tolerance:
+            regressions.append(f"{name}: {old:.2f} -> {new:.2f} ({change:+.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--script", choices=["gemini", "perpexity"], default="gemini")
+    parser.add_argument("--docs", type=int, default=60)
+    parser.add_argument("--sentences", type=int, default=40, help="sentences per document")
+    parser.add_argument("--questions", type=int, default=40)
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="seconds per fake LLM call")
+    parser.add_argument("--graph-latency", type=float, default=0.002, help="seconds per fake graph round trip")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown")
+    parser.add_argument("--min-delta-ms", type=float, default=10.0,
+                        help="latency increases up to this many ms are never a regression")
+    parser.add_argument("--repeat", type=int, default=3, help="runs whose median is reported and compared")
+    parser.add_argument("--verbose", action="store_true", help="show the system's own progress output")
+    args = parser.parse_args()
+
+    params = {k: getattr(args, k) for k in ("script", "docs", "sentences", "questions", "llm_latency", "graph_latency")}
+    runs = []
+    for attempt in range(args.repeat):
+        runs.append(run(args))
+        if args.repeat > 1:
+            print(f"run {attempt + 1}/{args.repeat} done")
+    results = median_results(runs)
+
+    print(f"{'metric':<24}{'value':>12}")
+    for name, value in results.items():
+        print(f"{name:<24}{value:>12.2f}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        baselines = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, "r", encoding="utf-8") as f:
+                baselines = json.load(f)
+        baselines[args.script] = {"params": params, "metrics": results}
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baselines, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print("No baseline stored; run with --save-baseline to create one")
+        return
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        stored = json.load(f).get(args.script)
+    if stored is None or stored["params"] != params:
+        print("Stored baseline was recorded with different parameters; not comparing")
+        return
+    regressions = compare(results, stored["metrics"], args.tolerance, args.min_delta_ms)
+    if regressions:
+        print(f"Regressions beyond {args.tolerance:.0%}:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print(f"No regressions beyond {args.tolerance:.0%} against the stored baseline")
+
+
+if __name__ == "__main__":
+    main()
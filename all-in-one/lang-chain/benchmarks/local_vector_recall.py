@@ -0,0 +1,90 @@
+"""
+Recall vs latency of the local IVF index against exact brute-force search.
+
+Usage (from all-in-one/lang-chain):
+    python benchmarks/local_vector_recall.py --rows 200000 --dim 384 --dtype float16
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from graph_rag.local_vector import LocalVectorIndex
+
+
+def clustered_vectors(rows: int, dim: int, clusters: int, rng: np.random.Generator) -> np.ndarray:
+    """Synthetic embeddings with topic structure, closer to real text than uniform noise"""
+    centres = rng.normal(size=(clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, size=rows)
+    return centres[labels] + 0.35 * rng.normal(size=(rows, dim)).astype(np.float32)
+
+
+def timed_search(index: LocalVectorIndex, queries: np.ndarray, k: int, **kwargs):
+    latencies = []
+    results = []
+    for query in queries:
+        start = time.perf_counter()
+        rows, _ = index.search_vectors([query], k=k, **kwargs)
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append(rows[0])
+    return np.vstack(results), np.percentile(latencies, 50), np.percentile(latencies, 95)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--dtype", choices=["float32", "float16"], default="float32")
+    parser.add_argument("--lists", type=int, default=None, help="IVF lists (default sqrt(rows))")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    vectors = clustered_vectors(args.rows, args.dim, clusters=max(8, args.rows // 2000), rng=rng)
+    queries = vectors[rng.choice(args.rows, size=args.queries, replace=False)]
+    queries = queries + 0.1 * rng.normal(size=queries.shape).astype(np.float32)
+
+    path = tempfile.mkdtemp(prefix="local_vector_bench_")
+    try:
+        index = LocalVectorIndex(path, dtype=args.dtype)
+        start = time.perf_counter()
+        for offset in range(0, args.rows, 10000):
+            chunk = vectors[offset:offset + 10000]
+            index.add_vectors(chunk, [""] * len(chunk), [str(offset + i) for i in range(len(chunk))])
+        print(f"Loaded {args.rows} x {args.dim} {args.dtype} vectors in {time.perf_counter() - start:.2f}s")
+
+        exact_rows, p50, p95 = timed_search(index, queries, args.k, exact=True)
+        print(f"{'mode':<14}{'recall@' + str(args.k):>10}{'p50 ms':>10}{'p95 ms':>10}")
+        print(f"{'exact':<14}{1.0:>10.3f}{p50:>10.2f}{p95:>10.2f}")
+
+        start = time.perf_counter()
+        index.build_ivf(n_lists=args.lists)
+        print(f"Built IVF with {len(index.centroids)} lists in {time.perf_counter() - start:.2f}s")
+
+        for n_probe in (1, 2, 4, 8, 16, 32):
+            if n_probe > len(index.centroids):
+                break
+            ivf_rows, p50, p95 = timed_search(index, queries, args.k, n_probe=n_probe)
+            recall = np.mean([
+                len(set(exact) & set(approx)) / args.k for exact, approx in zip(exact_rows, ivf_rows)
+            ])
+            print(f"{'ivf/' + str(n_probe):<14}{recall:>10.3f}{p50:>10.2f}{p95:>10.2f}")
+
+        # Persistence round trip: reload must not need any embedding calls
+        index.save()
+        start = time.perf_counter()
+        reloaded = LocalVectorIndex.load(path)
+        print(f"Reloaded {reloaded.count} vectors in {(time.perf_counter() - start) * 1000:.1f} ms")
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,22 @@
 import os
+import sys
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
+from langchain_core.globals import set_llm_cache
+
+# The shared response cache lives in common/ at the repository root
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
+from common.langchain_cache import LangChainResponseCache
 
 # 1. Setup API Key
 # Get your key from https://aistudio.google.com/
 os.environ["GOOGLE_API_KEY"] = os.getenv("GOOGLE_API_KEY")
 
+# Repeated runs of the same prompt are answered from .cache/llm/responses.sqlite
+cache = LangChainResponseCache()
+set_llm_cache(cache)
+
 # 2. Initialize Gemini Pro Model
 # "gemini-pro" is the standard text model
 llm = ChatGoogleGenerativeAI(
@@ -29,4 +39,5 @@ chain = prompt | llm | StrOutputParser()
 # 5. Invoke the chain programmatically
 response = chain.invoke({"topic": "blockchain technology"})
 
-print(response)
\ No newline at end of file
+print(response)
+print(f"Response cache: {cache.stats}")
\ No newline at end of file
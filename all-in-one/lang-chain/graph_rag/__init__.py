@@ -0,0 +1,63 @@
+"""
+Shared building blocks for the GraphRAG scripts (gemini/ and perpexity/)
+"""
+
+from graph_rag.bulk_ingest import BulkGraphWriter, IngestStats
+from graph_rag.async_extraction import ExtractionScheduler, ExtractionStats, TokenBucket
+from graph_rag.extraction_cache import ExtractionCache
+from graph_rag.incremental import IncrementalIngestor, IngestManifest, IngestPlan
+from graph_rag.hybrid import GraphRetriever, HybridResult, HybridRetriever
+from graph_rag.embedding_service import CachedEmbeddingService, EmbeddingCache, EmbeddingStats
+from graph_rag.cypher_cache import CachedCypherQA, CypherCache
+from graph_rag.streaming import StreamStats
+from graph_rag.schema_cache import SchemaSnapshotStore, prune_schema
+from graph_rag.pipeline import IngestionPipeline, PipelineCheckpoint, PipelineStats, StageStats
+from graph_rag.kg_extraction import JSONItemScanner, KnowledgeExtraction, KnowledgeExtractor
+from graph_rag.entity_resolution import EntityResolver, ResolutionStats, normalise_name
+from graph_rag.context_packing import ContextPacker, PackedContext
+from graph_rag.batch_query import BatchAnswer, BatchQueryRunner, BatchStats, SingleFlight
+from graph_rag.tracing import FileExporter, OTLPHTTPExporter, Tracer, configure_from_env, tracer
+
+__all__ = [
+    "BulkGraphWriter",
+    "IngestStats",
+    "ExtractionScheduler",
+    "ExtractionStats",
+    "TokenBucket",
+    "ExtractionCache",
+    "IncrementalIngestor",
+    "IngestManifest",
+    "IngestPlan",
+    "GraphRetriever",
+    "HybridResult",
+    "HybridRetriever",
+    "CachedEmbeddingService",
+    "EmbeddingCache",
+    "EmbeddingStats",
+    "CachedCypherQA",
+    "CypherCache",
+    "StreamStats",
+    "SchemaSnapshotStore",
+    "prune_schema",
+    "IngestionPipeline",
+    "PipelineCheckpoint",
+    "PipelineStats",
+    "StageStats",
+    "JSONItemScanner",
+    "KnowledgeExtraction",
+    "KnowledgeExtractor",
+    "EntityResolver",
+    "ResolutionStats",
+    "normalise_name",
+    "ContextPacker",
+    "PackedContext",
+    "BatchAnswer",
+    "BatchQueryRunner",
+    "BatchStats",
+    "SingleFlight",
+    "FileExporter",
+    "OTLPHTTPExporter",
+    "Tracer",
+    "configure_from_env",
+    "tracer",
+]
@@ -0,0 +1,214 @@
+"""
+Batch question answering over the hybrid retriever.
+
+    runner = BatchQueryRunner(vector_index, graph_retriever, answer_fn, embeddings=embeddings)
+    for result in runner.run(questions):
+        print(result.question, result.answer, result.timings)
+
+- repeated questions (ignoring case and spacing) are answered once and the
+  result is shared by every copy
+- all question embeddings are fetched up front with one cache read, so
+  vector search does not embed per question
+- per question, hybrid retrieval (vector + k-hop graph, themselves
+  concurrent) runs alongside the optional Cypher QA chain
+- identical graph expansions (same full-text query and path limit) from
+  different questions are coalesced into one round trip
+- LLM work (answer generation, Cypher QA) is bounded by a semaphore so a
+  large batch does not trip provider rate limits
+- results are yielded in completion order, each with its own timings
+"""
+
+import contextvars
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Sequence
+
+from graph_rag.hybrid import GraphRetriever, HybridRetriever
+from graph_rag.tracing import tracer
+
+
+def question_key(question: str) -> str:
+    """Questions that differ only in case or spacing share a key"""
+    return re.sub(r"\s+", " ", question).strip().casefold()
+
+
+class SingleFlight:
+    """Runs each key once; concurrent and later callers with the same key share the result"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._futures: Dict[Hashable, Future] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def run(self, key: Hashable, fn: Callable, *args: Any) -> Any:
+        with self._lock:
+            future = self._futures.get(key)
+            owner = future is None
+            if owner:
+                future = self._futures[key] = Future()
+                self.calls += 1
+            else:
+                self.coalesced += 1
+        if owner:
+            try:
+                future.set_result(fn(*args))
+            except Exception as e:
+                future.set_exception(e)
+        return future.result()
+
+
+class _CoalescedGraphRetriever:
+    """GraphRetriever front that shares identical expansions between questions in a batch"""
+
+    def __init__(self, inner: GraphRetriever, flight: SingleFlight):
+        self.inner = inner
+        self.flight = flight
+        self.paths_per_seed = inner.paths_per_seed
+
+    def retrieve(self, question: str, paths_per_seed: int = None) -> List[str]:
+        key = ("graph", self.inner.lucene_query(question), paths_per_seed)
+        return self.flight.run(key, self.inner.retrieve, question, paths_per_seed)
+
+
+@dataclass
+class BatchAnswer:
+    """One question's result; timings are in milliseconds"""
+    index: int
+    question: str
+    answer: Optional[str] = None
+    graph_answer: Optional[str] = None
+    context: List[str] = field(default_factory=list)
+    timings: Dict[str, float] = field(default_factory=dict)
+    duplicate_of: Optional[int] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class BatchStats:
+    """Outcome of one batch run"""
+    questions: int = 0
+    unique: int = 0
+    graph_lookups: int = 0
+    graph_coalesced: int = 0
+    failed: int = 0
+    embed_ms: float = 0.0
+    seconds: float = 0.0
+
+    @property
+    def questions_per_sec(self) -> float:
+        return self.questions / self.seconds if self.seconds > 0 else 0.0
+
+    def __str__(self) -> str:
+        return (f"{self.questions} questions ({self.unique} unique), {self.failed} failed, "
+                f"{self.graph_lookups} graph lookups ({self.graph_coalesced} coalesced), "
+                f"embedded in {self.embed_ms:.0f}ms ({self.seconds:.2f}s, {self.questions_per_sec:.2f} questions/sec)")
+
+
+class BatchQueryRunner:
+    """Answers many questions concurrently and yields results as they finish"""
+
+    def __init__(self, vector_index: Any, graph_retriever: GraphRetriever,
+                 answer: Callable[[str, List[str]], str], embeddings: Any = None,
+                 graph_qa: Callable[[str], Any] = None, k: int = 3, latency_budget_ms: float = 800.0,
+                 max_workers: int = 16, max_llm_concurrency: int = 4):
+        self.vector_index = vector_index
+        self.graph_retriever = graph_retriever
+        self.answer = answer
+        self.embeddings = embeddings
+        self.graph_qa = graph_qa
+        self.k = k
+        self.latency_budget_ms = latency_budget_ms
+        self.max_workers = max_workers
+        self._llm_slots = threading.BoundedSemaphore(max_llm_concurrency)
+        self.stats = BatchStats()
+
+    def _embed(self, questions: List[str]) -> Dict[str, List[float]]:
+        if self.embeddings is None:
+            return {}
+        start = time.perf_counter()
+        if hasattr(self.embeddings, "embed_queries"):
+            vectors = self.embeddings.embed_queries(questions)
+        else:
+            vectors = [self.embeddings.embed_query(q) for q in questions]
+        self.stats.embed_ms = (time.perf_counter() - start) * 1000
+        return dict(zip(questions, vectors))
+
+    def _graph_answer(self, question: str) -> Optional[str]:
+        with self._llm_slots:
+            response = self.graph_qa(question)
+        return response.get("result") if isinstance(response, dict) else str(response)
+
+    def _answer_one(self, retriever: HybridRetriever, index: int, question: str,
+                    vector: Optional[List[float]], qa_pool: ThreadPoolExecutor) -> BatchAnswer:
+        result = BatchAnswer(index, question)
+        start = time.perf_counter()
+        with tracer.span("batch_question", index=index) as span:
+            qa_future = None
+            if self.graph_qa is not None:
+                qa_future = qa_pool.submit(contextvars.copy_context().run, self._timed_graph_answer, question)
+            try:
+                hybrid = retriever.retrieve(question, k=self.k, query_vector=vector)
+                result.context = hybrid.context
+                result.timings["retrieval_ms"] = hybrid.timings["total_ms"]
+
+                llm_wait = time.perf_counter()
+                with self._llm_slots:
+                    llm_start = time.perf_counter()
+                    result.answer = self.answer(question, hybrid.context)
+                result.timings["llm_wait_ms"] = (llm_start - llm_wait) * 1000
+                result.timings["answer_ms"] = (time.perf_counter() - llm_start) * 1000
+
+                if qa_future is not None:
+                    result.graph_answer, result.timings["cypher_qa_ms"] = qa_future.result()
+            except Exception as e:
+                result.error = f"{type(e).__name__}: {e}"
+                span.set("error", result.error)
+        result.timings["total_ms"] = (time.perf_counter() - start) * 1000
+        return result
+
+    def _timed_graph_answer(self, question: str):
+        start = time.perf_counter()
+        answer = self._graph_answer(question)
+        return answer, (time.perf_counter() - start) * 1000
+
+    def run(self, questions: Sequence[str]) -> Iterator[BatchAnswer]:
+        """Yield one BatchAnswer per question (duplicates included), in completion order"""
+        start = time.perf_counter()
+        self.stats = BatchStats(questions=len(questions))
+        copies: Dict[str, List[int]] = {}
+        for index, question in enumerate(questions):
+            copies.setdefault(question_key(question), []).append(index)
+        self.stats.unique = len(copies)
+
+        firsts = [indices[0] for indices in copies.values()]
+        vectors = self._embed([questions[i] for i in firsts])
+
+        flight = SingleFlight()
+        # Each question submits two retrieval stages; size the pool so they do not queue behind each other
+        retriever = HybridRetriever(self.vector_index, _CoalescedGraphRetriever(self.graph_retriever, flight),
+                                    latency_budget_ms=self.latency_budget_ms, max_workers=2 * self.max_workers)
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="batch") as pool, \
+                    ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="batch-qa") as qa_pool:
+                futures = {
+                    pool.submit(contextvars.copy_context().run, self._answer_one, retriever,
+                                i, questions[i], vectors.get(questions[i]), qa_pool): question_key(questions[i])
+                    for i in firsts
+                }
+                for future in as_completed(futures):
+                    result = future.result()
+                    if result.error:
+                        self.stats.failed += len(copies[futures[future]])
+                    yield result
+                    for index in copies[futures[future]][1:]:
+                        yield replace(result, index=index, question=questions[index], duplicate_of=result.index)
+        finally:
+            retriever.close()
+
+        self.stats.graph_lookups = flight.calls
+        self.stats.graph_coalesced = flight.coalesced
+        self.stats.seconds = time.perf_counter() - start
@@ -0,0 +1,165 @@
+"""
+Bulk ingestion of extracted entities and relationships into Neo4j.
+
+Entities are grouped by label and relationships by (type, source label,
+target label) so that each group is written with a single parameterised
+UNWIND query per batch instead of one Bolt round trip per row.
+"""
+
+import re
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Tuple
+
+from langchain_neo4j import Neo4jGraph
+
+from graph_rag.entity_resolution import normalise_name
+
+BASE_ENTITY_LABEL = "__Entity__"
+DEFAULT_LABEL = "Entity"
+DEFAULT_RELATION = "RELATED_TO"
+
+
+def sanitize_identifier(value: str, default: str) -> str:
+    """Turn an LLM-provided type into a safe Neo4j label / relationship type"""
+    cleaned = re.sub(r"[^0-9A-Za-z_]+", "_", (value or "").strip()).strip("_")
+    if not cleaned:
+        return default
+    if cleaned[0].isdigit():
+        cleaned = f"_{cleaned}"
+    return cleaned
+
+
+def _batches(rows: List[Dict[str, Any]], size: int) -> Iterable[List[Dict[str, Any]]]:
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+@dataclass
+class IngestStats:
+    """Counters and timing for one bulk write"""
+    entities: int = 0
+    relationships: int = 0
+    queries: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows(self) -> int:
+        return self.entities + self.relationships
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+    def merge(self, other: "IngestStats") -> None:
+        self.entities += other.entities
+        self.relationships += other.relationships
+        self.queries += other.queries
+        self.seconds += other.seconds
+
+    def __str__(self) -> str:
+        return (f"{self.entities} entities, {self.relationships} relationships "
+                f"in {self.queries} queries ({self.seconds:.2f}s, {self.rows_per_sec:.0f} rows/sec)")
+
+
+class BulkGraphWriter:
+    """Writes knowledge-graph rows to Neo4j with batched UNWIND queries"""
+
+    def __init__(self, graph: Neo4jGraph, batch_size: int = 1000):
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.graph = graph
+        self.batch_size = batch_size
+        self._indexed_labels = set()
+
+    def ensure_constraints(self, labels: Iterable[str]) -> None:
+        """Create uniqueness constraints on `name` for every label not seen yet"""
+        if BASE_ENTITY_LABEL not in self._indexed_labels:
+            self.graph.query(
+                f"CREATE INDEX entity_name IF NOT EXISTS FOR (n:`{BASE_ENTITY_LABEL}`) ON (n.name)"
+            )
+            # Used by EntityResolver to find existing spellings of an entity
+            self.graph.query(
+                f"CREATE INDEX entity_norm_name IF NOT EXISTS FOR (n:`{BASE_ENTITY_LABEL}`) ON (n.norm_name)"
+            )
+            self._indexed_labels.add(BASE_ENTITY_LABEL)
+
+        for label in sorted(set(labels) - self._indexed_labels):
+            self.graph.query(
+                f"CREATE CONSTRAINT {label}_name_unique IF NOT EXISTS "
+                f"FOR (n:`{label}`) REQUIRE n.name IS UNIQUE"
+            )
+            self._indexed_labels.add(label)
+
+    def write_entities(self, entities: List[Dict[str, Any]]) -> Tuple[IngestStats, Dict[str, str]]:
+        """MERGE entities grouped by label; returns stats and a name -> label map"""
+        stats = IngestStats()
+        by_label: Dict[str, Dict[str, Dict[str, Any]]] = defaultdict(dict)
+        name_to_label: Dict[str, str] = {}
+
+        for entity in entities:
+            name = entity.get("name")
+            if not name:
+                continue
+            label = sanitize_identifier(entity.get("type", DEFAULT_LABEL), DEFAULT_LABEL)
+            by_label[label][name] = {"name": name, "norm_name": normalise_name(name)}
+            name_to_label.setdefault(name, label)
+
+        self.ensure_constraints(by_label.keys())
+
+        start = time.perf_counter()
+        for label, rows_by_name in by_label.items():
+            query = f"""
+            UNWIND $rows AS row
+            MERGE (e:`{label}` {{name: row.name}})
+            SET e:`{BASE_ENTITY_LABEL}`, e.norm_name = row.norm_name
+            """
+            for batch in _batches(list(rows_by_name.values()), self.batch_size):
+                self.graph.query(query, params={"rows": batch})
+                stats.entities += len(batch)
+                stats.queries += 1
+        stats.seconds = time.perf_counter() - start
+        return stats, name_to_label
+
+    def write_relationships(self, relationships: List[Dict[str, Any]],
+                            name_to_label: Dict[str, str] = None) -> IngestStats:
+        """MERGE relationships grouped by type and endpoint labels"""
+        stats = IngestStats()
+        name_to_label = name_to_label or {}
+        groups: Dict[Tuple[str, str, str], List[Dict[str, Any]]] = defaultdict(list)
+
+        for rel in relationships:
+            source, target = rel.get("source"), rel.get("target")
+            if not source or not target:
+                continue
+            rel_type = sanitize_identifier(
+                (rel.get("relation") or DEFAULT_RELATION).upper().replace(" ", "_"), DEFAULT_RELATION
+            )
+            # Endpoints that were not extracted as entities are still matched through the base label index
+            key = (rel_type,
+                   name_to_label.get(source, BASE_ENTITY_LABEL),
+                   name_to_label.get(target, BASE_ENTITY_LABEL))
+            groups[key].append({"source": source, "target": target})
+
+        start = time.perf_counter()
+        for (rel_type, source_label, target_label), rows in groups.items():
+            query = f"""
+            UNWIND $rows AS row
+            MATCH (s:`{source_label}` {{name: row.source}})
+            MATCH (t:`{target_label}` {{name: row.target}})
+            MERGE (s)-[r:`{rel_type}`]->(t)
+            """
+            for batch in _batches(rows, self.batch_size):
+                self.graph.query(query, params={"rows": batch})
+                stats.relationships += len(batch)
+                stats.queries += 1
+        stats.seconds = time.perf_counter() - start
+        return stats
+
+    def write(self, kg_data: Dict[str, Any]) -> IngestStats:
+        """Write an extraction result of the form {"entities": [...], "relationships": [...]}"""
+        stats, name_to_label = self.write_entities(kg_data.get("entities", []))
+        stats.merge(self.write_relationships(kg_data.get("relationships", []), name_to_label))
+        print(f"Bulk ingest: {stats}")
+        return stats
@@ -0,0 +1,179 @@
+"""
+Context packing for answer prompts.
+
+Retrieved context (vector chunks plus graph facts) is:
+
+1. deduplicated: whitespace-insensitive duplicates and items contained in
+   another item are dropped
+2. ranked by retrieval score (list order when no scores are given)
+3. packed greedily into a token budget, one chunk or fact at a time. Items
+   are measured with a cheap local counter; when the model's own tokenizer
+   is supplied (which for Gemini is a remote count_tokens call) it measures
+   the packed text once and the selection is tightened if the estimate was
+   too low
+4. stitched: selected chunks that overlap end-to-start (the splitter's
+   chunk_overlap) become one passage. This happens after budgeting, so a
+   run of overlapping chunks cannot grow into one passage that crowds out
+   the graph facts
+5. emitted in a stable order (graph facts, then passages, each sorted by
+   text) so the same retrieved set always yields the same prompt prefix
+   and provider-side prefix caching can reuse it
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Sequence
+
+from graph_rag.tracing import approx_tokens
+
+WHITESPACE = re.compile(r"\s+")
+
+
+def _normalise(text: str) -> str:
+    return WHITESPACE.sub(" ", text).strip()
+
+
+def _overlap(left: str, right: str, min_chars: int) -> int:
+    """Length of the longest suffix of `left` that is a prefix of `right` (0 if under min_chars)"""
+    longest = min(len(left), len(right))
+    for size in range(longest, min_chars - 1, -1):
+        if left.endswith(right[:size]):
+            return size
+    return 0
+
+
+@dataclass
+class _Item:
+    text: str
+    score: float
+    tokens: int = 0
+
+
+@dataclass
+class PackedContext:
+    """Packed context text plus what was kept, merged and dropped"""
+    text: str
+    items: List[str] = field(default_factory=list)
+    tokens: int = 0
+    input_items: int = 0
+    duplicates: int = 0
+    merged: int = 0
+    dropped: int = 0
+    truncated: bool = False
+    # Set when the model tokenizer failed and the local estimate was used instead
+    counter_error: Optional[str] = None
+
+    def __str__(self) -> str:
+        return (f"{self.input_items} -> {len(self.items)} items, {self.tokens} tokens "
+                f"({self.duplicates} duplicates, {self.merged} overlaps merged, {self.dropped} over budget"
+                f"{', top item truncated' if self.truncated else ''}"
+                f"{', model token count failed: ' + self.counter_error if self.counter_error else ''})")
+
+
+class ContextPacker:
+    """Deduplicates, ranks and fits retrieved context into a token budget"""
+
+    def __init__(self, budget_tokens: int = 3000, token_counter: Callable[[str], int] = None,
+                 model_counter: Callable[[str], int] = None, min_overlap_chars: int = 40, separator: str = "\n"):
+        self.budget_tokens = budget_tokens
+        self.count_tokens = token_counter or approx_tokens
+        # Exact counter for the packed text (e.g. llm.get_num_tokens); called once or twice per pack
+        self.model_counter = model_counter
+        self.min_overlap_chars = min_overlap_chars
+        self.separator = separator
+
+    def _dedupe(self, items: List[_Item], result: PackedContext) -> List[_Item]:
+        unique: List[_Item] = []
+        for item in sorted(items, key=lambda i: len(i.text), reverse=True):
+            container = next((u for u in unique if item.text in u.text), None)
+            if container is not None:
+                container.score = max(container.score, item.score)
+                result.duplicates += 1
+            else:
+                unique.append(item)
+        return unique
+
+    def _stitch(self, items: List[_Item], result: PackedContext) -> List[_Item]:
+        """Join chunks whose tail is the head of another (splitter overlap)"""
+        unique = [_Item(item.text, item.score, item.tokens) for item in items]
+        result.merged = 0
+        merged = True
+        while merged:
+            merged = False
+            for left in unique:
+                for right in unique:
+                    if left is right:
+                        continue
+                    size = _overlap(left.text, right.text, self.min_overlap_chars)
+                    if size:
+                        left.text = left.text + right.text[size:]
+                        left.score = max(left.score, right.score)
+                        left.tokens = self.count_tokens(left.text)
+                        unique.remove(right)
+                        result.merged += 1
+                        merged = True
+                        break
+                if merged:
+                    break
+        return unique
+
+    def _select(self, items: List[_Item], budget: int, result: PackedContext) -> List[_Item]:
+        separator_tokens = self.count_tokens(self.separator) if self.separator.strip() else 0
+        remaining = budget
+        selected: List[_Item] = []
+        result.dropped = 0
+        result.truncated = False
+        for item in sorted(items, key=lambda i: i.score, reverse=True):
+            cost = item.tokens + (separator_tokens if selected else 0)
+            if cost <= remaining:
+                selected.append(item)
+                remaining -= cost
+            elif not selected:
+                # The best item alone is over budget: keep its head rather than nothing
+                keep = max(1, int(len(item.text) * budget / max(item.tokens, 1)))
+                head = _Item(item.text[:keep], item.score)
+                head.tokens = self.count_tokens(head.text)
+                selected.append(head)
+                remaining -= head.tokens
+                result.truncated = True
+            else:
+                result.dropped += 1
+        result.tokens = budget - remaining
+        return selected
+
+    def pack(self, context: Sequence[str], scores: Optional[Sequence[float]] = None) -> PackedContext:
+        """`scores` align with `context`; without them earlier items rank higher"""
+        if scores is None:
+            scores = [1.0 / (rank + 1) for rank in range(len(context))]
+        result = PackedContext(text="", input_items=len(context))
+        items = [_Item(_normalise(text), score) for text, score in zip(context, scores) if text and text.strip()]
+        items = self._dedupe(items, result)
+        for item in items:
+            item.tokens = self.count_tokens(item.text)
+
+        budget = self.budget_tokens
+        for _ in range(3):
+            selected = self._stitch(self._select(items, budget, result), result)
+            if result.merged:
+                # Stitching removed the repeated overlap text
+                separator_tokens = self.count_tokens(self.separator) if self.separator.strip() else 0
+                result.tokens = sum(item.tokens for item in selected) + separator_tokens * (len(selected) - 1)
+            # Facts (single lines) before passages, each sorted by text: identical sets give identical prefixes
+            selected.sort(key=lambda i: (len(i.text) > 200, i.text))
+            result.items = [item.text for item in selected]
+            result.text = self.separator.join(result.items)
+            if self.model_counter is None or not result.text:
+                break
+            try:
+                actual = self.model_counter(result.text)
+            except Exception as e:
+                # Packing still succeeds on the estimate; the caller reports it with the rest of the result
+                result.counter_error = str(e)
+                self.model_counter = None
+                break
+            estimated, result.tokens = result.tokens, actual
+            if actual <= self.budget_tokens:
+                break
+            # The estimate undercounted this text; shrink the estimated budget by the observed ratio
+            budget = max(1, min(estimated - 1, int(estimated * self.budget_tokens / actual)))
+        return result
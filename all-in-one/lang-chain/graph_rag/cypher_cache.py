@@ -0,0 +1,457 @@
+"""
+Question -> Cypher cache in front of GraphCypherQAChain.
+
+Only Cypher that executed successfully is stored. A lookup tries, in order:
+
+1. exact match on the normalised question
+2. template match: string literals of the stored Cypher that came from
+   the question become query parameters, so "What is Neo4j used for?" also
+   serves "What is LangChain used for?" with $slot0 = "LangChain". A
+   template hit is only accepted when every filled value names an entity
+   already in the graph, so arbitrary question text never reaches Cypher
+3. embedding similarity above a threshold, accepted only when every
+   string literal of the cached Cypher also appears in the new question
+   and both questions contain the same numbers, so a cached "LIMIT 5" or
+   "p.age > 30" is not replayed for a question about 10 or 40
+
+A hit skips the LLM Cypher generation step entirely. Entries expire after
+a TTL, and the whole cache is dropped when the graph schema fingerprint
+changes. The cache is shared by concurrent requests: mutation and save
+happen under a lock, and save writes a private temp file before renaming
+it over the cache file.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_neo4j.chains.graph_qa.cypher import extract_cypher
+
+from graph_rag.entity_resolution import BASE_ENTITY_LABEL, normalise_name
+from graph_rag.tracing import text_size, tracer
+
+STRING_LITERAL = re.compile(r"'((?:[^'\\]|\\.)*)'|\"((?:[^\"\\]|\\.)*)\"")
+SLOT = "slot{}"
+
+KNOWN_ENTITIES_QUERY = f"""
+UNWIND $rows AS row
+MATCH (e:`{BASE_ENTITY_LABEL}`)
+WHERE e.name = row.value OR e.id = row.value OR e.norm_name = row.norm
+WITH row, e ORDER BY e.name
+RETURN row.value AS value, head(collect(coalesce(e.name, e.id))) AS name
+"""
+
+
+def normalise_question(question: str) -> str:
+    return re.sub(r"\s+", " ", question.strip().lower()).rstrip(" ?.!")
+
+
+def schema_fingerprint(schema: str) -> str:
+    return hashlib.sha256(schema.encode("utf-8")).hexdigest()
+
+
+def format_examples(examples: List[Dict[str, str]]) -> str:
+    """Render few-shot (question, query) pairs for the {examples} slot of the Cypher prompt"""
+    return "\n\n".join(f"Question: {ex['question']}\nCypher: {ex['query']}" for ex in examples or [])
+
+
+def _literals(cypher: str) -> List[str]:
+    return [single if single is not None else double for single, double in STRING_LITERAL.findall(cypher)]
+
+
+def _numbers(text: str) -> Tuple[str, ...]:
+    return tuple(sorted(re.findall(r"\d+(?:\.\d+)?", text)))
+
+
+def _whole_word(text: str) -> re.Pattern:
+    return re.compile(rf"(?<!\w){re.escape(text)}(?!\w)")
+
+
+def build_template(key: str, cypher: str) -> Optional[Tuple[re.Pattern, str, int]]:
+    """(question pattern, Cypher with $slotN parameters, slot count) for literals copied from the question, or None
+
+    Literals are matched as whole words of the normalised question. The first
+    occurrence of each becomes a named group and repeats a back-reference.
+    If a literal only occurs inside a longer literal's match, the mapping is
+    ambiguous and no template is built.
+    """
+    literals = sorted({literal for literal in _literals(cypher) if len(literal) > 1}, key=len, reverse=True)
+    spans: List[Tuple[int, int, str]] = []
+    for literal in literals:
+        matches = [m for m in _whole_word(literal.lower()).finditer(key)
+                   if not any(m.start() < end and start < m.end() for start, end, _ in spans)]
+        if not matches:
+            if _whole_word(literal.lower()).search(key):
+                return None
+            continue
+        spans.extend((m.start(), m.end(), literal) for m in matches)
+    if not spans:
+        return None
+
+    slots: Dict[str, int] = {}
+    pattern, position = "", 0
+    for start, end, literal in sorted(spans):
+        pattern += re.escape(key[position:start])
+        slot = literal.lower()
+        if slot in slots:
+            pattern += f"(?P=s{slots[slot]})"
+        else:
+            slots[slot] = len(slots)
+            pattern += f"(?P<s{slots[slot]}>.+?)"
+        position = end
+    pattern += re.escape(key[position:])
+
+    def mask(match: re.Match) -> str:
+        value = match.group(1) if match.group(1) is not None else match.group(2)
+        if value.lower() not in slots:
+            return match.group(0)
+        return "$" + SLOT.format(slots[value.lower()])
+
+    return re.compile(f"^{pattern}$"), STRING_LITERAL.sub(mask, cypher), len(slots)
+
+
+@dataclass
+class CypherCacheEntry:
+    question: str
+    cypher: str
+    created_at: float
+    hits: int = 0
+
+
+class CypherCache:
+    """Exact, templated and embedding-similarity cache of validated Cypher"""
+
+    def __init__(self, embeddings: Embeddings = None, similarity_threshold: float = 0.92,
+                 ttl_seconds: float = 24 * 3600, max_entries: int = 5000, path: str = None):
+        self.embeddings = embeddings
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.path = path
+        self.schema = ""
+        self.entries: "OrderedDict[str, CypherCacheEntry]" = OrderedDict()
+        self._vectors: Dict[str, np.ndarray] = {}
+        self._templates: Dict[str, Tuple[re.Pattern, str, int]] = {}
+        self.exact_hits = 0
+        self.template_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        # Re-entrant: lookups evict expired entries through _remove
+        self._lock = threading.RLock()
+        if path and os.path.exists(path):
+            self._load()
+
+    # ------------------------------------------------------------------ persistence
+
+    def _load(self) -> None:
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self.schema = data.get("schema", "")
+        for raw in data.get("entries", []):
+            entry = CypherCacheEntry(**raw)
+            key = normalise_question(entry.question)
+            self._index(key, entry)
+            if self.embeddings is not None:
+                self._vectors[key] = self._embed(entry.question)
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Held through the rename so an older snapshot never replaces a newer one
+        with self._lock:
+            data = {"schema": self.schema, "entries": [asdict(e) for e in self.entries.values()]}
+            with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=directory or ".", suffix=".tmp",
+                                             delete=False) as f:
+                tmp_path = f.name
+                try:
+                    json.dump(data, f)
+                except BaseException:
+                    f.close()
+                    os.remove(tmp_path)
+                    raise
+            os.replace(tmp_path, self.path)
+
+    # ------------------------------------------------------------------ maintenance
+
+    def set_schema(self, fingerprint: str) -> None:
+        """Drop every entry when the graph schema changed since they were validated"""
+        with self._lock:
+            if fingerprint != self.schema:
+                if self.entries:
+                    self.invalidations += 1
+                    print(f"Graph schema changed; dropping {len(self.entries)} cached Cypher queries")
+                self.clear()
+                self.schema = fingerprint
+
+    def clear(self) -> None:
+        with self._lock:
+            self.entries.clear()
+            self._vectors.clear()
+            self._templates.clear()
+
+    def _remove(self, key: str) -> None:
+        self.entries.pop(key, None)
+        self._vectors.pop(key, None)
+        self._templates.pop(key, None)
+
+    def invalidate(self, question: str = None, key: str = None) -> None:
+        """Drop the entry stored for `question`, or the entry under `key` as returned by lookup()"""
+        with self._lock:
+            self._remove(key if key is not None else normalise_question(question))
+
+    def _expired(self, entry: CypherCacheEntry) -> bool:
+        return self.ttl_seconds is not None and time.time() - entry.created_at > self.ttl_seconds
+
+    def _index(self, key: str, entry: CypherCacheEntry) -> None:
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        self._templates.pop(key, None)
+        try:
+            template = build_template(key, entry.cypher)
+        except Exception as e:
+            # A template is only an optimisation; never let it fail the store
+            print(f"Cypher template skipped for {entry.question!r}: {e}")
+            template = None
+        if template is not None:
+            self._templates[key] = template
+
+        while len(self.entries) > self.max_entries:
+            self._remove(next(iter(self.entries)))
+
+    # ------------------------------------------------------------------ lookup
+
+    def _template_lookup(self, key: str, question: str,
+                         known_entities: Callable[[List[str]], Dict[str, str]]
+                         ) -> Optional[Tuple[str, Dict[str, str], str]]:
+        candidates = []
+        with self._lock:
+            for stored_key, (pattern, masked_cypher, slots) in list(self._templates.items()):
+                entry = self.entries.get(stored_key)
+                if entry is None or self._expired(entry):
+                    self._remove(stored_key)
+                    continue
+                match = pattern.match(key)
+                if not match:
+                    continue
+                values = []
+                for slot in range(slots):
+                    # Recover the original casing of the literal from the question
+                    value = match.group(f"s{slot}")
+                    start = question.lower().find(value)
+                    if start >= 0:
+                        value = question[start:start + len(value)]
+                    values.append(value)
+                candidates.append((stored_key, entry, masked_cypher, values))
+
+        # Checked outside the lock: it is a graph round trip
+        for stored_key, entry, masked_cypher, values in candidates:
+            # Only reuse the query for values naming entities that exist, passed as their stored names
+            names = known_entities(values)
+            if not all(value in names for value in values):
+                continue
+            with self._lock:
+                entry.hits += 1
+            params = {SLOT.format(slot): names[value] for slot, value in enumerate(values)}
+            return masked_cypher, params, stored_key
+        return None
+
+    def _semantic_lookup(self, question: str) -> Optional[Tuple[str, str]]:
+        if self.embeddings is None or not self._vectors:
+            return None
+        query = self._embed(question)
+        with self._lock:
+            keys = list(self._vectors)
+            if not keys:
+                return None
+            matrix = np.vstack([self._vectors[k] for k in keys])
+            scores = matrix @ query
+            lowered = question.lower()
+            for index in np.argsort(-scores):
+                if scores[index] < self.similarity_threshold:
+                    break
+                entry = self.entries.get(keys[index])
+                if entry is None or self._expired(entry):
+                    self._remove(keys[index])
+                    continue
+                # Never reuse Cypher that filters on a value or count the new question does not mention
+                if (_numbers(question) == _numbers(entry.question)
+                        and all(literal.lower() in lowered for literal in _literals(entry.cypher))):
+                    entry.hits += 1
+                    return entry.cypher, keys[index]
+        return None
+
+    def lookup(self, question: str, known_entities: Callable[[List[str]], Dict[str, str]] = None
+               ) -> Tuple[Optional[str], str, Dict[str, Any], Optional[str]]:
+        """Return (cypher, "exact" | "template" | "semantic", params, key) or (None, "miss", {}, None)
+
+        `key` identifies the stored entry that served the hit, for invalidate(key=...).
+
+        Templates are only tried with `known_entities`, which maps the slot
+        values that name an existing entity to that entity's stored name.
+        """
+        key = normalise_question(question)
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                if self._expired(entry):
+                    self._remove(key)
+                else:
+                    entry.hits += 1
+                    self.entries.move_to_end(key)
+                    self.exact_hits += 1
+                    return entry.cypher, "exact", {}, key
+
+        if known_entities is not None:
+            hit = self._template_lookup(key, question, known_entities)
+            if hit is not None:
+                with self._lock:
+                    self.template_hits += 1
+                return hit[0], "template", hit[1], hit[2]
+
+        hit = self._semantic_lookup(question)
+        with self._lock:
+            if hit is not None:
+                self.semantic_hits += 1
+                return hit[0], "semantic", {}, hit[1]
+            self.misses += 1
+        return None, "miss", {}, None
+
+    def store(self, question: str, cypher: str) -> None:
+        """Remember Cypher that executed successfully for `question`"""
+        key = normalise_question(question)
+        vector = self._embed(question) if self.embeddings is not None else None
+        with self._lock:
+            self._index(key, CypherCacheEntry(question=question, cypher=cypher, created_at=time.time()))
+            if vector is not None and key in self.entries:
+                self._vectors[key] = vector
+
+    def _embed(self, question: str) -> np.ndarray:
+        vector = np.asarray(self.embeddings.embed_query(question), dtype=np.float32)
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+    # ------------------------------------------------------------------ metrics
+
+    @property
+    def hits(self) -> int:
+        return self.exact_hits + self.template_hits + self.semantic_hits
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __str__(self) -> str:
+        return (f"{self.hits} hits ({self.exact_hits} exact, {self.template_hits} template, "
+                f"{self.semantic_hits} semantic), {self.misses} misses, "
+                f"{self.hit_rate:.0%} hit rate, {len(self.entries)} entries")
+
+
+class CachedCypherQA:
+    """Runs a GraphCypherQAChain's steps with the Cypher generation step served from a CypherCache"""
+
+    def __init__(self, chain: Any, cache: CypherCache, examples: List[Dict[str, str]] = None,
+                 schema_for: Callable[[str], str] = None):
+        self.chain = chain
+        self.cache = cache
+        # Optional question -> (pruned) schema text; defaults to the chain's full schema
+        self.schema_for = schema_for
+        self.examples = format_examples(examples)
+        self.cache.set_schema(schema_fingerprint(chain.graph_schema))
+        # Hand-written examples are trusted and seed the cache directly
+        for example in examples or []:
+            if normalise_question(example["question"]) not in self.cache.entries:
+                self.cache.store(example["question"], example["query"])
+
+    def cypher_args(self, question: str) -> Dict[str, Any]:
+        schema = self.schema_for(question) if self.schema_for else self.chain.graph_schema
+        return {"question": question, "schema": schema, "examples": self.examples}
+
+    def _prepare(self, generated: str) -> str:
+        cypher = extract_cypher(generated)
+        if self.chain.cypher_query_corrector:
+            cypher = self.chain.cypher_query_corrector(cypher)
+        return cypher
+
+    def _generate(self, question: str) -> str:
+        with tracer.span("cypher_generation") as span:
+            args = self.cypher_args(question)
+            if span.sampled:
+                span.update({f"prompt_{k}": v for k, v in text_size("".join(args.values())).items()})
+            cypher = self._prepare(self.chain.cypher_generation_chain.invoke(args))
+            span.set("cypher_bytes", len(cypher.encode("utf-8")))
+            return cypher
+
+    def known_entities(self, values: List[str]) -> Dict[str, str]:
+        """Template slot values that name an entity in the graph -> that entity's stored name"""
+        rows = self.chain.graph.query(KNOWN_ENTITIES_QUERY,
+                                      {"rows": [{"value": v, "norm": normalise_name(v)} for v in values]})
+        return {row["value"]: row["name"] for row in rows if row.get("name") is not None}
+
+    def resolve_cypher(self, question: str) -> Tuple[str, str, Dict[str, Any], Optional[str]]:
+        """(cypher, source, params, cache key of the entry that served it)"""
+        with tracer.span("cypher_lookup") as span:
+            cypher, source, params, key = self.cache.lookup(question, self.known_entities)
+            span.set("source", source)
+        if cypher is None:
+            cypher = self._generate(question)
+        return cypher, source, params, key
+
+    async def aresolve_cypher(self, question: str) -> Tuple[str, str, Dict[str, Any], Optional[str]]:
+        cypher, source, params, key = await asyncio.to_thread(self.cache.lookup, question, self.known_entities)
+        if cypher is None:
+            cypher = self._prepare(await self.chain.cypher_generation_chain.ainvoke(self.cypher_args(question)))
+        return cypher, source, params, key
+
+    def _run(self, cypher: str, params: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        with tracer.span("cypher_execution") as span:
+            context = self.chain.graph.query(cypher, params or {})[: self.chain.top_k] if cypher else []
+            span.set("rows", len(context))
+            if span.sampled:
+                span.set("result_bytes", len(json.dumps(context, default=str).encode("utf-8")))
+            return context
+
+    def execute(self, question: str, cypher: str, source: str, params: Dict[str, Any] = None,
+                key: str = None) -> Tuple[str, List[Dict[str, Any]]]:
+        """Run Cypher; a cached query that fails is evicted (the entry under `key`) and regenerated once"""
+        try:
+            context = self._run(cypher, params)
+        except Exception:
+            if source == "miss":
+                raise
+            # Evict the entry that produced the bad Cypher, which may belong to a different question
+            self.cache.invalidate(question, key=key)
+            cypher = self._generate(question)
+            context = self._run(cypher)
+            source = "miss"
+        if source == "miss" and cypher:
+            try:
+                self.cache.store(question, cypher)
+                self.cache.save()
+            except Exception as e:
+                # The query already succeeded; failing to cache it must not fail the answer
+                print(f"Could not cache Cypher: {e}")
+        return cypher, context
+
+    def invoke(self, question: str) -> Dict[str, Any]:
+        cypher, source, params, key = self.resolve_cypher(question)
+        cypher, context = self.execute(question, cypher, source, params, key)
+        with tracer.span("qa_answer") as span:
+            result = self.chain.qa_chain.invoke({"question": question, "context": context})
+            if span.sampled:
+                span.update({f"answer_{k}": v for k, v in text_size(str(result)).items()})
+        print(f"Cypher ({source}): {cypher}")
+        return {"query": question, "result": result, "cypher": cypher, "cypher_source": source}
@@ -0,0 +1,273 @@
+"""
+Batched, cached embedding service shared by the GraphRAG pipelines.
+
+CachedEmbeddingService wraps any LangChain Embeddings model and is itself
+an Embeddings, so it can be passed to Neo4jVector, LocalVectorIndex, etc.
+
+- identical texts in a call are embedded once
+- vectors are cached in SQLite keyed by (model, sha256(text))
+- cache misses are grouped into batches bounded by an approximate token
+  budget, shortest texts together so padding stays low
+- local models (sentence-transformers) run batches on a thread pool,
+  remote APIs fan batches out concurrently with asyncio; the sync API runs
+  that fan-out on one background event loop, so it also works when called
+  from inside a running loop and async clients always see the same loop
+"""
+
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+from langchain_core.embeddings import Embeddings
+
+from graph_rag.tracing import approx_tokens, text_size, tracer
+
+
+def token_batches(texts: Sequence[str], max_batch_tokens: int, max_batch_size: int) -> List[List[int]]:
+    """Group text indices into batches that respect both a token and a size limit"""
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    batches, current, current_tokens = [], [], 0
+    for i in order:
+        tokens = approx_tokens(texts[i])
+        if current and (current_tokens + tokens > max_batch_tokens or len(current) >= max_batch_size):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(i)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+class EmbeddingCache:
+    """SQLite store of float32 vectors keyed by (model, text hash)"""
+
+    def __init__(self, path: str = ".cache/graph_rag/embeddings.sqlite"):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL,"
+            " text_hash TEXT NOT NULL,"
+            " vector BLOB NOT NULL,"
+            " PRIMARY KEY (model, text_hash))"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def text_hash(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get_many(self, model: str, hashes: Sequence[str]) -> Dict[str, List[float]]:
+        found = {}
+        with self._lock:
+            # SQLite limits bound parameters per statement, so look up in slices
+            for start in range(0, len(hashes), 500):
+                chunk = list(hashes[start:start + 500])
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model] + chunk
+                ).fetchall()
+                for text_hash, blob in rows:
+                    found[text_hash] = array("f", blob).tolist()
+        return found
+
+    def put_many(self, model: str, items: Dict[str, List[float]]) -> None:
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector) VALUES (?, ?, ?)",
+                [(model, text_hash, array("f", vector).tobytes()) for text_hash, vector in items.items()]
+            )
+            self._conn.commit()
+
+
+@dataclass
+class EmbeddingStats:
+    """Running counters for a CachedEmbeddingService"""
+    requested: int = 0
+    unique: int = 0
+    cache_hits: int = 0
+    embedded: int = 0
+    batches: int = 0
+    embed_seconds: float = 0.0
+
+    @property
+    def texts_per_sec(self) -> float:
+        """Cold throughput: texts actually sent to the model per second of model time"""
+        return self.embedded / self.embed_seconds if self.embed_seconds > 0 else 0.0
+
+    def __str__(self) -> str:
+        return (f"{self.requested} requested, {self.unique} unique, {self.cache_hits} cache hits, "
+                f"{self.embedded} embedded in {self.batches} batches ({self.texts_per_sec:.1f} texts/sec)")
+
+
+class CachedEmbeddingService(Embeddings):
+    """Deduplicating, caching, dynamically batching front for an Embeddings model"""
+
+    def __init__(self, inner: Embeddings, model_name: str, cache: Optional[EmbeddingCache] = None,
+                 remote: bool = False, max_batch_tokens: int = 8192, max_batch_size: int = 64,
+                 max_workers: int = 4):
+        self.inner = inner
+        self.model_name = model_name
+        self.cache = cache or EmbeddingCache()
+        self.remote = remote
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_size = max_batch_size
+        self.max_workers = max_workers
+        self.stats = EmbeddingStats()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="embed")
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+
+    def _background_loop(self) -> asyncio.AbstractEventLoop:
+        """Event loop on a daemon thread that runs the remote fan-out for the sync API"""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="embed-loop", daemon=True).start()
+            return self._loop
+
+    def _plan(self, texts: List[str]):
+        unique = list(dict.fromkeys(texts))
+        hashes = {text: EmbeddingCache.text_hash(text) for text in unique}
+        cached = self.cache.get_many(self.model_name, list(hashes.values()))
+        vectors = {text: cached[h] for text, h in hashes.items() if h in cached}
+        missing = [text for text in unique if text not in vectors]
+
+        self.stats.requested += len(texts)
+        self.stats.unique += len(unique)
+        self.stats.cache_hits += len(vectors)
+        batches = [[missing[i] for i in batch]
+                   for batch in token_batches(missing, self.max_batch_tokens, self.max_batch_size)]
+        return vectors, hashes, batches
+
+    def _store(self, vectors: Dict[str, List[float]], hashes: Dict[str, str],
+               batches: List[List[str]], results: List[List[List[float]]], seconds: float) -> None:
+        fresh = {}
+        for batch, embedded in zip(batches, results):
+            for text, vector in zip(batch, embedded):
+                # Round to float32 now so cold and cached results are identical
+                vector = array("f", vector).tolist()
+                vectors[text] = vector
+                fresh[hashes[text]] = vector
+        if fresh:
+            self.cache.put_many(self.model_name, fresh)
+        self.stats.embedded += len(fresh)
+        self.stats.batches += len(batches)
+        self.stats.embed_seconds += seconds
+
+    async def _fan_out(self, batches: List[List[str]]) -> List[List[List[float]]]:
+        semaphore = asyncio.Semaphore(self.max_workers)
+
+        async def one(batch: List[str]) -> List[List[float]]:
+            async with semaphore:
+                return await self.inner.aembed_documents(batch)
+
+        return await asyncio.gather(*(one(batch) for batch in batches))
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        with tracer.span("embed_documents", model=self.model_name, texts=len(texts)) as span:
+            embedded = self.stats.embedded
+            vectors = self._embed_documents(texts)
+            span.set("embedded", self.stats.embedded - embedded)
+            return vectors
+
+    def _embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors, hashes, batches = self._plan(texts)
+        if batches:
+            start = time.perf_counter()
+            if self.remote:
+                # Never asyncio.run() here: it fails inside a running loop (notebooks, async servers)
+                results = asyncio.run_coroutine_threadsafe(self._fan_out(batches), self._background_loop()).result()
+            else:
+                results = list(self._executor.map(self.inner.embed_documents, batches))
+            self._store(vectors, hashes, batches, results, time.perf_counter() - start)
+        return [vectors[text] for text in texts]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors, hashes, batches = self._plan(texts)
+        if batches:
+            start = time.perf_counter()
+            if self.remote:
+                results = await self._fan_out(batches)
+            else:
+                loop = asyncio.get_running_loop()
+                results = await asyncio.gather(*(
+                    loop.run_in_executor(self._executor, self.inner.embed_documents, batch) for batch in batches
+                ))
+            self._store(vectors, hashes, batches, results, time.perf_counter() - start)
+        return [vectors[text] for text in texts]
+
+    def _query_model(self) -> str:
+        # Some providers embed queries differently from documents, so they get their own namespace
+        return f"{self.model_name}#query"
+
+    def _cached_query(self, text: str):
+        text_hash = EmbeddingCache.text_hash(text)
+        self.stats.requested += 1
+        cached = self.cache.get_many(self._query_model(), [text_hash]).get(text_hash)
+        if cached is not None:
+            self.stats.cache_hits += 1
+        return text_hash, cached
+
+    def _store_query(self, text_hash: str, vector: List[float], seconds: float) -> None:
+        self.cache.put_many(self._query_model(), {text_hash: vector})
+        self.stats.embedded += 1
+        self.stats.batches += 1
+        self.stats.embed_seconds += seconds
+
+    def embed_query(self, text: str) -> List[float]:
+        with tracer.span("embed_query", model=self.model_name) as span:
+            text_hash, vector = self._cached_query(text)
+            span.set("cache_hit", vector is not None)
+            if span.sampled:
+                span.update(text_size(text))
+            if vector is None:
+                start = time.perf_counter()
+                vector = array("f", self.inner.embed_query(text)).tolist()
+                self._store_query(text_hash, vector, time.perf_counter() - start)
+            return vector
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Query embeddings for many texts: one cache read, then the misses embedded concurrently"""
+        with tracer.span("embed_queries", model=self.model_name, texts=len(texts)) as span:
+            unique = list(dict.fromkeys(texts))
+            hashes = {text: EmbeddingCache.text_hash(text) for text in unique}
+            cached = self.cache.get_many(self._query_model(), list(hashes.values()))
+            vectors = {text: cached[h] for text, h in hashes.items() if h in cached}
+            missing = [text for text in unique if text not in vectors]
+            self.stats.requested += len(texts)
+            self.stats.unique += len(unique)
+            self.stats.cache_hits += len(vectors)
+            span.set("embedded", len(missing))
+            if missing:
+                # Query embeddings cannot go through embed_documents: some providers embed queries differently
+                start = time.perf_counter()
+                fresh = {text: array("f", vector).tolist()
+                         for text, vector in zip(missing, self._executor.map(self.inner.embed_query, missing))}
+                self.cache.put_many(self._query_model(), {hashes[text]: vector for text, vector in fresh.items()})
+                vectors.update(fresh)
+                self.stats.embedded += len(fresh)
+                self.stats.batches += 1
+                self.stats.embed_seconds += time.perf_counter() - start
+            return [vectors[text] for text in texts]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        text_hash, vector = self._cached_query(text)
+        if vector is None:
+            start = time.perf_counter()
+            vector = array("f", await self.inner.aembed_query(text)).tolist()
+            self._store_query(text_hash, vector, time.perf_counter() - start)
+        return vector
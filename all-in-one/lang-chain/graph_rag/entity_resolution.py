@@ -0,0 +1,250 @@
+"""
+Entity resolution ahead of graph writes.
+
+LLM extraction spells the same entity many ways ("OpenAI", "Open AI",
+"openai", "OpenAI Inc."). EntityResolver maps every extracted name to one
+canonical entity before anything is written:
+
+1. exact match on a normalised key (case, accents, punctuation, spacing
+   and company suffixes removed), first against the in-memory index and
+   then with one batched query per write against `norm_name` in Neo4j
+2. optionally, embedding similarity against the names already indexed,
+   accepted only when both names contain the same numbers so "GPT-3" and
+   "GPT-4" stay apart
+
+The first spelling seen (or the one already in the graph) becomes the
+canonical name, and its label wins over later, different LLM-given types.
+"""
+
+import re
+import threading
+import time
+import unicodedata
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+BASE_ENTITY_LABEL = "__Entity__"
+CORPORATE_SUFFIXES = ("inc", "incorporated", "corp", "corporation", "ltd", "limited", "llc", "plc", "gmbh", "co")
+
+LOOKUP_QUERY = f"""
+UNWIND $norms AS norm
+MATCH (e:`{BASE_ENTITY_LABEL}` {{norm_name: norm}})
+WITH norm, e ORDER BY e.name
+RETURN norm, coalesce(e.name, e.id) AS name,
+       head([l IN labels(e) WHERE l <> '{BASE_ENTITY_LABEL}']) AS label
+"""
+
+
+def normalise_name(name: str) -> str:
+    """"Open AI, Inc." / "openai" / "OpenAI" -> "openai" """
+    text = unicodedata.normalize("NFKD", name or "")
+    text = "".join(char for char in text if not unicodedata.combining(char)).lower()
+    words = re.findall(r"[a-z0-9]+", text.replace("&", " and "))
+    while len(words) > 1 and words[-1] in CORPORATE_SUFFIXES:
+        words.pop()
+    return "".join(words)
+
+
+def _numbers(name: str) -> Tuple[str, ...]:
+    return tuple(re.findall(r"\d+", name))
+
+
+@dataclass
+class CanonicalEntity:
+    name: str
+    label: Optional[str]
+
+
+@dataclass
+class ResolutionStats:
+    """Counters for an EntityResolver"""
+    names: int = 0
+    repeats: int = 0
+    variants: int = 0
+    graph: int = 0
+    semantic: int = 0
+    new: int = 0
+    lookups: int = 0
+    seconds: float = 0.0
+
+    @property
+    def merged(self) -> int:
+        """Differently spelled names that were folded into an existing entity"""
+        return self.variants + self.semantic
+
+    def __str__(self) -> str:
+        return (f"{self.names} names -> {self.new} new entities, {self.repeats} repeats, {self.merged} variants "
+                f"merged ({self.semantic} by embedding), {self.graph} matched in graph "
+                f"with {self.lookups} lookups ({self.seconds:.2f}s)")
+
+
+class EntityResolver:
+    """In-memory index of canonical entities keyed by normalised name, with optional embeddings"""
+
+    def __init__(self, graph: Any = None, embeddings: Embeddings = None, similarity_threshold: float = 0.93,
+                 batch_size: int = 1000):
+        self.graph = graph
+        self.embeddings = embeddings
+        self.similarity_threshold = similarity_threshold
+        self.batch_size = batch_size
+        self.index: Dict[str, CanonicalEntity] = {}
+        self.aliases: Dict[str, str] = {}
+        self._vector_keys: List[str] = []
+        self._vectors: Optional[np.ndarray] = None
+        self._batch_vectors: Dict[str, np.ndarray] = {}
+        # Writers may resolve from worker threads; the index is not safe to mutate concurrently
+        self._lock = threading.RLock()
+        self.stats = ResolutionStats()
+
+    # ------------------------------------------------------------------ index
+
+    def _vector(self, name: str) -> np.ndarray:
+        vector = self._batch_vectors.get(name)
+        if vector is None:
+            vector = np.asarray(self.embeddings.embed_documents([name])[0], dtype=np.float32)
+            vector /= np.linalg.norm(vector) or 1.0
+        return vector
+
+    def _add(self, norm: str, entity: CanonicalEntity) -> None:
+        self.index[norm] = entity
+        if self.embeddings is not None:
+            vector = self._vector(entity.name)
+            self._vector_keys.append(norm)
+            self._vectors = vector[None, :] if self._vectors is None else np.vstack([self._vectors, vector])
+
+    def _lookup_graph(self, norms: List[str]) -> None:
+        """One round trip per batch for all normalised names not in memory yet"""
+        if self.graph is None or not norms:
+            return
+        for start in range(0, len(norms), self.batch_size):
+            rows = self.graph.query(LOOKUP_QUERY, {"norms": norms[start:start + self.batch_size]})
+            self.stats.lookups += 1
+            for row in rows or []:
+                if row["norm"] not in self.index:
+                    self.index[row["norm"]] = CanonicalEntity(row["name"], row.get("label"))
+                    self.aliases[row["norm"]] = "graph"
+
+    def _similar(self, name: str) -> Optional[str]:
+        if self.embeddings is None or self._vectors is None:
+            return None
+        scores = self._vectors @ self._vector(name)
+        for position in np.argsort(-scores):
+            if scores[position] < self.similarity_threshold:
+                break
+            norm = self._vector_keys[position]
+            # Versions, years and model numbers must agree exactly
+            if _numbers(self.index[norm].name) == _numbers(name):
+                return norm
+        return None
+
+    # ------------------------------------------------------------------ resolution
+
+    def _prefetch(self, names: Iterable[str]) -> None:
+        """Batch the graph lookup and the embedding call for every name not indexed yet"""
+        names = {n for n in names if n}
+        self._lookup_graph(sorted({normalise_name(n) for n in names} - set(self.index) - {""}))
+        self._batch_vectors = {}
+        if self.embeddings is not None:
+            unknown = sorted(n for n in names if normalise_name(n) not in self.index)
+            if unknown:
+                matrix = np.asarray(self.embeddings.embed_documents(unknown), dtype=np.float32)
+                matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+                self._batch_vectors = dict(zip(unknown, matrix))
+
+    def resolve_name(self, name: str, label: str = None) -> CanonicalEntity:
+        """Canonical entity for `name`, registering it as new if nothing matches"""
+        self.stats.names += 1
+        norm = normalise_name(name) or name
+        entity = self.index.get(norm)
+        if entity is not None:
+            if self.aliases.pop(norm, None) == "graph":
+                self.stats.graph += 1
+                if self.embeddings is not None:
+                    # Loaded from the graph without a vector; index it now that it is in use
+                    self._add(norm, entity)
+            elif entity.name == name:
+                self.stats.repeats += 1
+            else:
+                self.stats.variants += 1
+            return entity
+        similar = self._similar(name)
+        if similar is not None:
+            self.stats.semantic += 1
+            entity = self.index[similar]
+            self.index[norm] = entity
+            return entity
+        entity = CanonicalEntity(name, label)
+        self._add(norm, entity)
+        self.stats.new += 1
+        return entity
+
+    def resolve_entities(self, entities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Map {"name", "type"} rows to canonical ones, without duplicates"""
+        with self._lock:
+            return self._resolve_entities(entities)
+
+    def _resolve_entities(self, entities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        start = time.perf_counter()
+        self._prefetch(e.get("name") for e in entities)
+        resolved = {}
+        for entity in entities:
+            if not entity.get("name"):
+                continue
+            canonical = self.resolve_name(entity["name"], entity.get("type"))
+            resolved.setdefault(canonical.name, {**entity, "name": canonical.name,
+                                                 "type": canonical.label or entity.get("type")})
+        self.stats.seconds += time.perf_counter() - start
+        return list(resolved.values())
+
+    def resolve_relationships(self, relationships: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Rewrite endpoints to canonical names, dropping self-loops and duplicates created by merging"""
+        with self._lock:
+            return self._resolve_relationships(relationships)
+
+    def _resolve_relationships(self, relationships: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        start = time.perf_counter()
+        self._prefetch(n for r in relationships for n in (r.get("source"), r.get("target")))
+        resolved = {}
+        for rel in relationships:
+            if not rel.get("source") or not rel.get("target"):
+                continue
+            source = self.resolve_name(rel["source"]).name
+            target = self.resolve_name(rel["target"]).name
+            if source == target:
+                continue
+            resolved.setdefault((source, rel.get("relation"), target), {**rel, "source": source, "target": target})
+        self.stats.seconds += time.perf_counter() - start
+        return list(resolved.values())
+
+    def resolve(self, kg_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Canonical version of an extraction result {"entities": [...], "relationships": [...]}"""
+        return {"entities": self.resolve_entities(kg_data.get("entities", [])),
+                "relationships": self.resolve_relationships(kg_data.get("relationships", []))}
+
+    def resolve_graph_documents(self, graph_documents: List[Any]) -> List[Any]:
+        """Rewrite LLMGraphTransformer GraphDocuments in place so variants share one node id"""
+        with self._lock:
+            return self._resolve_graph_documents(graph_documents)
+
+    def _resolve_graph_documents(self, graph_documents: List[Any]) -> List[Any]:
+        start = time.perf_counter()
+        nodes = [node for doc in graph_documents for node in doc.nodes]
+        nodes += [node for doc in graph_documents for rel in doc.relationships for node in (rel.source, rel.target)]
+        self._prefetch(str(node.id) for node in nodes)
+        for node in nodes:
+            canonical = self.resolve_name(str(node.id), node.type)
+            node.properties["norm_name"] = normalise_name(canonical.name)
+            node.id = canonical.name
+            if canonical.label:
+                node.type = canonical.label
+        for doc in graph_documents:
+            unique = {}
+            for node in doc.nodes:
+                unique.setdefault(node.id, node)
+            doc.nodes = list(unique.values())
+            doc.relationships = [rel for rel in doc.relationships if rel.source.id != rel.target.id]
+        self.stats.seconds += time.perf_counter() - start
+        return graph_documents
@@ -0,0 +1,179 @@
+"""
+Persistent, content-addressed cache for LLM extraction results.
+
+Entries are keyed by a hash of (chunk text, model name, prompt id),
+where transformer_prompt_id() fingerprints an LLMGraphTransformer's
+prompt, allowed node and relationship types and output schema. Entries are
+stored as JSON in SQLite and evicted least-recently-used once the cache
+holds more than `max_entries` rows.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from langchain_core.documents import Document
+from langchain_community.graphs.graph_document import GraphDocument, Node, Relationship
+
+
+def graph_document_to_dict(graph_document: GraphDocument) -> Dict[str, Any]:
+    """Serialise the nodes and relationships of a GraphDocument (the source is not stored)"""
+    def node(n: Node) -> Dict[str, Any]:
+        return {"id": n.id, "type": n.type, "properties": dict(n.properties or {})}
+
+    return {
+        "nodes": [node(n) for n in graph_document.nodes],
+        "relationships": [
+            {
+                "source": node(r.source),
+                "target": node(r.target),
+                "type": r.type,
+                "properties": dict(r.properties or {}),
+            }
+            for r in graph_document.relationships
+        ],
+    }
+
+
+def graph_document_from_dict(data: Dict[str, Any], source: Document) -> GraphDocument:
+    """Rebuild a GraphDocument for `source` from graph_document_to_dict output"""
+    return GraphDocument(
+        nodes=[Node(**n) for n in data.get("nodes", [])],
+        relationships=[
+            Relationship(
+                source=Node(**r["source"]),
+                target=Node(**r["target"]),
+                type=r["type"],
+                properties=r.get("properties", {}),
+            )
+            for r in data.get("relationships", [])
+        ],
+        source=source,
+    )
+
+
+def _bound_tools(runnable: Any, depth: int = 0) -> list:
+    """Tool / schema kwargs bound anywhere inside a runnable chain"""
+    if runnable is None or depth > 8:
+        return []
+    found = []
+    kwargs = getattr(runnable, "kwargs", None)
+    if isinstance(kwargs, dict):
+        found += [kwargs[key] for key in ("tools", "functions", "response_format") if key in kwargs]
+    children = [getattr(runnable, name, None) for name in ("bound", "first", "last", "runnable", "mapper")]
+    children += list(getattr(runnable, "middle", None) or []) + list(getattr(runnable, "fallbacks", None) or [])
+    children += list((getattr(runnable, "steps__", None) or {}).values())
+    for child in children:
+        found += _bound_tools(child, depth + 1)
+    return found
+
+
+def transformer_prompt_id(transformer: Any) -> str:
+    """Hash of everything besides the model and the chunk that shapes an LLMGraphTransformer's output"""
+    chain = getattr(transformer, "chain", None)
+    prompt = getattr(chain, "first", None)
+    messages = [
+        [type(message).__name__, getattr(getattr(message, "prompt", None), "template", None) or str(message)]
+        for message in getattr(prompt, "messages", [])
+    ]
+    config = {
+        "transformer": type(transformer).__name__,
+        "prompt": messages,
+        "allowed_nodes": list(getattr(transformer, "allowed_nodes", []) or []),
+        "allowed_relationships": [list(r) if isinstance(r, tuple) else r
+                                  for r in getattr(transformer, "allowed_relationships", []) or []],
+        "strict_mode": getattr(transformer, "strict_mode", None),
+        "function_call": getattr(transformer, "_function_call", None),
+        "schema": _bound_tools(chain),
+    }
+    payload = json.dumps(config, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class ExtractionCache:
+    """SQLite-backed LRU cache of extraction results with hit/miss counters"""
+
+    def __init__(self, path: str = ".cache/graph_rag/extraction.sqlite", max_entries: int = 50000):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS extractions ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS extractions_lru ON extractions(last_access)")
+        self._conn.commit()
+        self._count = self._conn.execute("SELECT COUNT(*) FROM extractions").fetchone()[0]
+
+    @staticmethod
+    def make_key(text: str, model: str, prompt: str) -> str:
+        digest = hashlib.sha256()
+        for part in (model, prompt, text):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM extractions WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE extractions SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            self.hits += 1
+            return json.loads(row[0])
+
+    def put(self, key: str, value: Any) -> None:
+        payload = json.dumps(value)
+        with self._lock:
+            exists = self._conn.execute("SELECT 1 FROM extractions WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO extractions (key, value, last_access) VALUES (?, ?, ?)",
+                (key, payload, time.time())
+            )
+            if not exists:
+                self._count += 1
+            overflow = self._count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM extractions WHERE key IN "
+                    "(SELECT key FROM extractions ORDER BY last_access ASC LIMIT ?)",
+                    (overflow,)
+                )
+                self._count -= overflow
+                self.evictions += overflow
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __str__(self) -> str:
+        return (f"{self.hits} hits, {self.misses} misses ({self.hit_rate:.0%} hit rate), "
+                f"{self._count} entries, {self.evictions} evicted")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,257 @@
+"""
+Local stand-ins for the remote services used by GraphRAGSystem.
+
+These let the extraction and ingestion code run without Gemini,
+Perplexity or Neo4j, e.g. to measure scheduling overhead.
+"""
+
+import asyncio
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+
+def _capitalised_terms(text: str) -> List[str]:
+    seen = []
+    for term in re.findall(r"\b[A-Z][A-Za-z0-9\-]+\b", text):
+        if term not in seen:
+            seen.append(term)
+    return seen
+
+
+def default_responder(prompt: str) -> str:
+    """Build a deterministic extraction answer from capitalised words in the prompt"""
+    text = prompt.rsplit("Text:", 1)[-1] if "Text:" in prompt else prompt
+    terms = _capitalised_terms(text)[:8]
+    pairs = list(zip(terms, terms[1:]))
+
+    if '"entities"' in prompt:
+        return json.dumps({
+            "entities": [{"name": term, "type": "Concept"} for term in terms],
+            "relationships": [{"source": a, "relation": "RELATED_TO", "target": b} for a, b in pairs],
+        })
+    # Shape expected by LLMGraphTransformer's prompt-based (non tool-calling) mode
+    return json.dumps([
+        {"head": a, "head_type": "Concept", "relation": "RELATED_TO", "tail": b, "tail_type": "Concept"}
+        for a, b in pairs
+    ])
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model that answers locally after a configurable delay"""
+
+    latency: float = 0.0
+    responder: Callable[[str], str] = default_responder
+    calls: int = 0
+    # Characters per chunk when streamed
+    stream_chunk_size: int = 16
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _respond(self, messages: List[BaseMessage]) -> ChatResult:
+        self.calls += 1
+        prompt = "\n".join(str(message.content) for message in messages)
+        message = AIMessage(content=self.responder(prompt))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency)
+        return self._respond(messages)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._respond(messages)
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager: Any = None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        if self.latency:
+            time.sleep(self.latency)
+        content = self._respond(messages).generations[0].message.content
+        for start in range(0, len(content), self.stream_chunk_size):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=content[start:start + self.stream_chunk_size]))
+
+
+class RecordingGraph:
+    """Minimal Neo4jGraph stand-in that records writes instead of sending them"""
+
+    def __init__(self, write_latency: float = 0.0):
+        self.write_latency = write_latency
+        self.queries: List[Dict[str, Any]] = []
+        self.graph_documents: List[Any] = []
+
+    def query(self, query: str, params: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        if self.write_latency:
+            time.sleep(self.write_latency)
+        self.queries.append({"query": query, "params": params or {}})
+        return []
+
+    def add_graph_documents(self, graph_documents: List[Any], **kwargs: Any) -> None:
+        if self.write_latency:
+            time.sleep(self.write_latency)
+        self.graph_documents.extend(graph_documents)
+
+
+class InMemoryGraph(RecordingGraph):
+    """Neo4jGraph stand-in that keeps entities, relationships and Document chunks in memory
+
+    It understands the query shapes issued by graph_rag (bulk UNWIND writes,
+    the schema probe, full-text seeded k-hop expansion, Document paging,
+    embedding updates, norm_name lookups, chunk deletion). Anything else, e.g. index DDL or
+    LLM-generated Cypher, is recorded and returns no rows. Every query costs
+    one round trip of `write_latency` or `read_latency`.
+    """
+
+    def __init__(self, write_latency: float = 0.0, read_latency: float = 0.0):
+        super().__init__(write_latency)
+        self.read_latency = read_latency
+        self.nodes: Dict[str, Dict[str, Any]] = {}
+        self.edges: Set[Tuple[str, str, str]] = set()
+        self.documents: Dict[str, Dict[str, Any]] = {}
+        self.structured_schema: Dict[str, Any] = {"node_props": {}, "rel_props": {}, "relationships": [],
+                                                  "metadata": {"constraint": [], "index": []}}
+        self.schema = ""
+        self._lock = threading.RLock()
+
+    @property
+    def get_schema(self) -> str:
+        return self.schema
+
+    @property
+    def get_structured_schema(self) -> Dict[str, Any]:
+        return self.structured_schema
+
+    def refresh_schema(self) -> None:
+        from langchain_neo4j.chains.graph_qa.cypher import construct_schema
+
+        with self._lock:
+            node_props = {label: [{"property": "name", "type": "STRING"}]
+                          for label in sorted({node["label"] for node in self.nodes.values()})}
+            if self.documents:
+                node_props["Document"] = [{"property": "id", "type": "STRING"}, {"property": "text", "type": "STRING"}]
+            relationships = sorted({(self.nodes[s]["label"], t, self.nodes[e]["label"]) for s, t, e in self.edges})
+            self.structured_schema = {
+                "node_props": node_props,
+                "rel_props": {},
+                "relationships": [{"start": s, "type": t, "end": e} for s, t, e in relationships],
+                "metadata": {"constraint": [], "index": []},
+            }
+            self.schema = construct_schema(self.structured_schema, [], [], False)
+
+    def _node(self, name: str, label: str = None, norm_name: str = None) -> None:
+        node = self.nodes.setdefault(name, {"label": label or "Entity", "norm_name": norm_name})
+        if norm_name:
+            node["norm_name"] = norm_name
+
+    def query(self, query: str, params: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        params = params or {}
+        writes = re.search(r"\b(MERGE|CREATE|SET|DELETE)\b", query) is not None
+        latency = self.write_latency if writes else self.read_latency
+        if latency:
+            time.sleep(latency)
+        with self._lock:
+            self.queries.append({"query": query, "params": params})
+            return self._dispatch(query, params)
+
+    def _dispatch(self, query: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        if "db.labels()" in query:
+            labels = {node["label"] for node in self.nodes.values()} | ({"Document"} if self.documents else set())
+            return [{"labels": sorted(labels), "types": sorted({t for _, t, _ in self.edges})}]
+        if "db.index.fulltext.queryNodes" in query:
+            hops = int(re.search(r"\[\*1\.\.(\d+)\]", query).group(1))
+            return self._expand(params["query"], params["seeds"], params["per_seed"], params["max_facts"], hops)
+        if "norm_name: norm" in query:
+            found = {node["norm_name"]: name for name, node in self.nodes.items() if node.get("norm_name")}
+            return [{"norm": norm, "name": found[norm], "label": self.nodes[found[norm]]["label"]}
+                    for norm in params["norms"] if norm in found]
+        if "e.norm_name = row.norm" in query:
+            rows = []
+            for row in params["rows"]:
+                names = sorted(name for name, node in self.nodes.items()
+                               if name == row["value"] or node.get("norm_name") == row["norm"])
+                if names:
+                    rows.append({"value": row["value"], "name": names[0]})
+            return rows
+        if "SKIP $skip" in query and "Document" in query:
+            rows = [{"id": doc_id, "text": doc["text"], "embedding": doc.get("embedding")}
+                    for doc_id, doc in sorted(self.documents.items())]
+            return rows[params["skip"]:params["skip"] + params["limit"]]
+
+        entity_write = re.search(r"MERGE \(e:`([^`]+)` \{name: row\.name\}\)", query)
+        if entity_write:
+            for row in params["rows"]:
+                self._node(row["name"], entity_write.group(1), row.get("norm_name"))
+            return []
+        relationship_write = re.search(r"MERGE \(s\)-\[r:`([^`]+)`\]->\(t\)", query)
+        if relationship_write:
+            for row in params["rows"]:
+                if row["source"] in self.nodes and row["target"] in self.nodes:
+                    self.edges.add((row["source"], relationship_write.group(1), row["target"]))
+            return []
+        if "DETACH DELETE d" in query:
+            for doc_id in params["ids"]:
+                self.documents.pop(doc_id, None)
+            return []
+        if "SET d.embedding" in query:
+            for row in params["rows"]:
+                if row["id"] in self.documents:
+                    self.documents[row["id"]]["embedding"] = row["embedding"]
+        return []
+
+    def _expand(self, lucene: str, seeds: int, per_seed: int, max_facts: int, hops: int) -> List[Dict[str, Any]]:
+        terms = [t.replace("\\", "").lower() for t in lucene.split(" OR ") if t]
+        seed_names = [name for name in self.nodes if any(term in name.lower() for term in terms)][:seeds]
+        adjacency: Dict[str, List[Tuple[str, str, str]]] = {}
+        for edge in self.edges:
+            adjacency.setdefault(edge[0], []).append(edge)
+            adjacency.setdefault(edge[2], []).append(edge)
+
+        best: Dict[Tuple[str, str, str], int] = {}
+        for seed in seed_names:
+            seen, frontier, paths = {seed}, deque([(seed, 0)]), 0
+            while frontier and paths < per_seed:
+                name, depth = frontier.popleft()
+                if depth == hops:
+                    continue
+                for edge in adjacency.get(name, []):
+                    best[edge] = min(best.get(edge, depth + 1), depth + 1)
+                    paths += 1
+                    other = edge[2] if edge[0] == name else edge[0]
+                    if other not in seen:
+                        seen.add(other)
+                        frontier.append((other, depth + 1))
+        ranked = sorted(best, key=lambda edge: (best[edge], edge))[:max_facts]
+        return [{"source": s, "relation": t, "target": e} for s, t, e in ranked]
+
+    def add_graph_documents(self, graph_documents: List[Any], include_source: bool = False,
+                            baseEntityLabel: bool = False) -> None:
+        if self.write_latency:
+            time.sleep(self.write_latency)
+        with self._lock:
+            self.graph_documents.extend(graph_documents)
+            for graph_document in graph_documents:
+                for node in graph_document.nodes:
+                    self._node(str(node.id), node.type, node.properties.get("norm_name"))
+                for rel in graph_document.relationships:
+                    self._node(str(rel.source.id), rel.source.type)
+                    self._node(str(rel.target.id), rel.target.type)
+                    self.edges.add((str(rel.source.id), rel.type, str(rel.target.id)))
+                if include_source and graph_document.source is not None:
+                    source = graph_document.source
+                    doc_id = source.metadata.get("id") or hashlib.md5(source.page_content.encode("utf-8")).hexdigest()
+                    source.metadata["id"] = doc_id
+                    document = self.documents.setdefault(doc_id, {"text": source.page_content, "embedding": None})
+                    document["text"] = source.page_content
@@ -0,0 +1,233 @@
+"""
+Hybrid retrieval: vector search and graph expansion run concurrently and
+are merged with reciprocal-rank fusion.
+
+The graph stage links question terms to entities through a full-text
+index and expands a bounded k-hop neighbourhood in one Cypher round trip.
+A rolling p95 of end-to-end latency is compared to a budget; while it is
+over budget the graph stage is cut off earlier (fewer paths per seed).
+
+Graph queries run on their own small pool: a query that overruns its
+budget keeps running on the server, and it must not hold a thread the
+next question's vector search needs.
+"""
+
+import contextvars
+import re
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+from graph_rag.tracing import tracer
+
+STOPWORDS = {
+    "the", "and", "for", "are", "what", "which", "who", "whom", "how", "does", "did", "with",
+    "from", "that", "this", "those", "these", "into", "about", "used", "use", "is", "was", "were",
+    "has", "have", "had", "can", "could", "would", "should", "why", "when", "where", "its", "their",
+    # Lucene operators; matched case-insensitively, so a standalone AND / OR / NOT never reaches the query
+    "or", "not",
+}
+LUCENE_SPECIAL = re.compile(r'([+\-!(){}\[\]^"~*?:\\/]|&&|\|\|)')
+
+
+def question_terms(question: str) -> List[str]:
+    """Candidate entity terms from a question, in order of appearance"""
+    terms = []
+    for token in re.findall(r"[\w\-\.]+", question):
+        token = token.strip(".")
+        if len(token) < 2 or token.lower() in STOPWORDS or token in terms:
+            continue
+        terms.append(token)
+    return terms
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], k: int = 60) -> List[str]:
+    """Merge ranked lists; items ranked high in any list float to the top"""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(scores, key=lambda item: scores[item], reverse=True)
+
+
+class LatencyWindow:
+    """Rolling window of latencies (ms) with percentile lookup"""
+
+    def __init__(self, size: int = 200):
+        self.samples = deque(maxlen=size)
+
+    def add(self, value_ms: float) -> None:
+        self.samples.append(value_ms)
+
+    def percentile(self, pct: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+        return ordered[index]
+
+
+class GraphRetriever:
+    """Full-text entity linking plus bounded k-hop expansion"""
+
+    def __init__(self, graph: Any, index_name: str = "entity_names", max_hops: int = 2,
+                 max_seeds: int = 5, paths_per_seed: int = 25, max_facts: int = 20):
+        self.graph = graph
+        self.index_name = index_name
+        self.max_hops = max_hops
+        self.max_seeds = max_seeds
+        self.paths_per_seed = paths_per_seed
+        self.max_facts = max_facts
+        self._index_ready = False
+
+    def ensure_fulltext_index(self) -> None:
+        if self._index_ready:
+            return
+        self.graph.query(
+            f"CREATE FULLTEXT INDEX {self.index_name} IF NOT EXISTS "
+            f"FOR (n:`__Entity__`) ON EACH [n.id, n.name]"
+        )
+        self._index_ready = True
+
+    def lucene_query(self, question: str) -> str:
+        return " OR ".join(LUCENE_SPECIAL.sub(r"\\\1", term) for term in question_terms(question))
+
+    def retrieve(self, question: str, paths_per_seed: int = None) -> List[str]:
+        """Return facts like "LangChain INTEGRATES_WITH Neo4j", best first"""
+        self.ensure_fulltext_index()
+        lucene = self.lucene_query(question)
+        if not lucene:
+            return []
+
+        # Hop count cannot be a parameter in variable-length patterns; it is an int we control
+        query = f"""
+        CALL db.index.fulltext.queryNodes($index, $query, {{limit: $seeds}}) YIELD node, score
+        CALL {{
+            WITH node
+            MATCH path = (node)-[*1..{int(self.max_hops)}]-(:`__Entity__`)
+            WHERE none(x IN nodes(path) WHERE x:Document)
+            RETURN path
+            LIMIT $per_seed
+        }}
+        WITH score, path
+        UNWIND range(0, length(path) - 1) AS i
+        WITH relationships(path)[i] AS r, score, i + 1 AS hop
+        WITH r, max(score) AS score, min(hop) AS hop
+        RETURN coalesce(startNode(r).name, startNode(r).id) AS source,
+               type(r) AS relation,
+               coalesce(endNode(r).name, endNode(r).id) AS target
+        ORDER BY score DESC, hop ASC
+        LIMIT $max_facts
+        """
+        rows = self.graph.query(query, params={
+            "index": self.index_name,
+            "query": lucene,
+            "seeds": self.max_seeds,
+            "per_seed": paths_per_seed or self.paths_per_seed,
+            "max_facts": self.max_facts,
+        })
+        return [f"{row['source']} {row['relation']} {row['target']}" for row in rows]
+
+
+@dataclass
+class HybridResult:
+    """Fused context plus per-stage timings in milliseconds"""
+    context: List[str]
+    timings: Dict[str, float] = field(default_factory=dict)
+    vector_hits: int = 0
+    graph_hits: int = 0
+    graph_cut_off: bool = False
+    graph_error: Optional[str] = None
+
+
+class HybridRetriever:
+    """Runs vector and graph retrieval in parallel within a latency budget"""
+
+    def __init__(self, vector_index: Any, graph_retriever: GraphRetriever,
+                 latency_budget_ms: float = 800.0, rrf_k: int = 60, min_paths_per_seed: int = 2,
+                 max_workers: int = 4, graph_workers: int = 2):
+        self.vector_index = vector_index
+        self.graph_retriever = graph_retriever
+        self.latency_budget_ms = latency_budget_ms
+        self.rrf_k = rrf_k
+        self.min_paths_per_seed = min_paths_per_seed
+        self.paths_per_seed = graph_retriever.paths_per_seed
+        self.latencies = LatencyWindow()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hybrid")
+        self._graph_executor = ThreadPoolExecutor(max_workers=graph_workers, thread_name_prefix="hybrid-graph")
+
+    def close(self) -> None:
+        """Release the stage threads (stages still running finish in the background)"""
+        self._executor.shutdown(wait=False)
+        self._graph_executor.shutdown(wait=False, cancel_futures=True)
+
+    def _timed(self, name: str, fn, *args):
+        start = time.perf_counter()
+        with tracer.span(name) as span:
+            result = fn(*args)
+            span.set("items", len(result))
+        return result, (time.perf_counter() - start) * 1000
+
+    def _submit(self, executor: ThreadPoolExecutor, name: str, fn, *args):
+        # Run in a copy of the caller's context so stage spans nest under the current span
+        return executor.submit(contextvars.copy_context().run, self._timed, name, fn, *args)
+
+    def _vector_search(self, question: str, k: int, query_vector: List[float] = None) -> List[str]:
+        if query_vector is not None:
+            documents = self.vector_index.similarity_search_by_vector(query_vector, k=k)
+        else:
+            documents = self.vector_index.similarity_search(question, k=k)
+        return [doc.page_content for doc in documents]
+
+    def _adapt(self) -> None:
+        p95 = self.latencies.percentile(95)
+        if p95 > self.latency_budget_ms:
+            self.paths_per_seed = max(self.min_paths_per_seed, self.paths_per_seed // 2)
+        elif p95 < self.latency_budget_ms / 2:
+            self.paths_per_seed = min(self.graph_retriever.paths_per_seed, self.paths_per_seed * 2)
+
+    def retrieve(self, question: str, k: int = 3, limit: int = None, query_vector: List[float] = None) -> HybridResult:
+        """`query_vector` skips embedding the question (e.g. when a batch was embedded up front)"""
+        start = time.perf_counter()
+        vector_future = self._submit(self._executor, "vector_search", self._vector_search, question, k, query_vector)
+        graph_future = self._submit(self._graph_executor, "graph_retrieval", self.graph_retriever.retrieve,
+                                    question, self.paths_per_seed)
+
+        semantic_facts, vector_ms = vector_future.result()
+        result = HybridResult(context=[], timings={"vector_ms": vector_ms})
+
+        # The vector stage is required; the graph stage only gets what is left of the budget
+        remaining_s = max(0.0, self.latency_budget_ms - (time.perf_counter() - start) * 1000) / 1000
+        try:
+            graph_facts, graph_ms = graph_future.result(timeout=remaining_s)
+            result.timings["graph_ms"] = graph_ms
+        except FutureTimeout:
+            # Still queued behind overrunning queries: drop it rather than add to the backlog
+            graph_future.cancel()
+            graph_facts = []
+            result.graph_cut_off = True
+            result.timings["graph_ms"] = (time.perf_counter() - start) * 1000
+        except Exception as e:
+            # The graph stage is optional; answer from the vector results alone
+            print(f"Graph retrieval failed, using vector results only: {e}")
+            graph_facts = []
+            result.graph_error = str(e)
+            result.timings["graph_ms"] = (time.perf_counter() - start) * 1000
+
+        fuse_start = time.perf_counter()
+        with tracer.span("fusion", vector_hits=len(semantic_facts), graph_hits=len(graph_facts),
+                         graph_cut_off=result.graph_cut_off, paths_per_seed=self.paths_per_seed) as span:
+            fused = reciprocal_rank_fusion([semantic_facts, graph_facts], k=self.rrf_k)
+            result.context = fused[:limit or 2 * k]
+            span.set("context_items", len(result.context))
+        result.timings["fusion_ms"] = (time.perf_counter() - fuse_start) * 1000
+        result.timings["total_ms"] = (time.perf_counter() - start) * 1000
+        result.vector_hits = len(semantic_facts)
+        result.graph_hits = len(graph_facts)
+
+        self.latencies.add(result.timings["total_ms"])
+        self._adapt()
+        result.timings["p95_ms"] = self.latencies.percentile(95)
+        return result
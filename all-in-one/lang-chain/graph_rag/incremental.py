@@ -0,0 +1,210 @@
+"""
+Incremental document ingestion with change detection.
+
+Every source document and every chunk produced by the text splitter is
+fingerprinted. A local JSON manifest records which chunks of which source
+are already in the graph, so each run only extracts new chunks and
+removes the ones that disappeared:
+
+- removed chunks lose their Document node (and with it its embedding)
+- relationships extracted only from removed chunks are deleted
+- entities no longer mentioned by any Document are deleted
+
+Added chunks are written as Document nodes whose `id` is the chunk
+fingerprint. Their `embedding` stays null, so the next
+Neo4jVector.from_existing_graph call embeds only them.
+"""
+
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+from langchain_core.documents import Document
+from langchain_text_splitters import TokenTextSplitter
+
+from graph_rag.async_extraction import ExtractionScheduler
+
+
+def fingerprint(*parts: str) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class IngestManifest:
+    """JSON manifest of source fingerprints and the chunk ids stored for each source"""
+
+    def __init__(self, path: str = ".cache/graph_rag/manifest.json"):
+        self.path = path
+        self.sources: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.sources = json.load(f).get("sources", {})
+
+    def save(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"sources": self.sources, "updated_at": time.time()}, f, indent=2)
+        # Atomic replace so a crash never leaves a half-written manifest
+        os.replace(tmp_path, self.path)
+
+
+@dataclass
+class IngestPlan:
+    """Chunks to add and chunk ids to remove for one incremental run"""
+    added: List[Document] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    unchanged_sources: List[str] = field(default_factory=list)
+    changed_sources: List[str] = field(default_factory=list)
+    deleted_sources: List[str] = field(default_factory=list)
+    new_chunks: Dict[str, List[str]] = field(default_factory=dict)
+    fingerprints: Dict[str, str] = field(default_factory=dict)
+
+    def __str__(self) -> str:
+        return (f"{len(self.added)} chunks to add, {len(self.removed)} to remove "
+                f"({len(self.changed_sources)} changed, {len(self.unchanged_sources)} unchanged, "
+                f"{len(self.deleted_sources)} deleted sources)")
+
+
+class IncrementalIngestor:
+    """Adds, updates and removes only the chunks that changed since the last run"""
+
+    def __init__(self, graph: Any, splitter: TokenTextSplitter, manifest: IngestManifest,
+                 batch_size: int = 1000):
+        self.graph = graph
+        self.splitter = splitter
+        self.manifest = manifest
+        self.batch_size = batch_size
+
+    def ensure_indexes(self) -> None:
+        self.graph.query("CREATE INDEX document_id IF NOT EXISTS FOR (d:Document) ON (d.id)")
+
+    def plan(self, sources: Dict[str, str], delete_missing: bool = False) -> IngestPlan:
+        """Diff `sources` (source id -> text) against the manifest"""
+        plan = IngestPlan()
+
+        for source_id, text in sources.items():
+            doc_fp = fingerprint(text)
+            previous = self.manifest.sources.get(source_id, {})
+            if previous.get("fingerprint") == doc_fp:
+                plan.unchanged_sources.append(source_id)
+                continue
+
+            plan.changed_sources.append(source_id)
+            plan.fingerprints[source_id] = doc_fp
+            old_ids = set(previous.get("chunks", []))
+            chunk_ids = []
+            for index, chunk in enumerate(self.splitter.split_text(text)):
+                chunk_id = fingerprint(source_id, chunk)
+                chunk_ids.append(chunk_id)
+                if chunk_id not in old_ids:
+                    plan.added.append(Document(
+                        page_content=chunk,
+                        metadata={"id": chunk_id, "source_id": source_id, "chunk_index": index}
+                    ))
+            plan.new_chunks[source_id] = chunk_ids
+            plan.removed.extend(old_ids - set(chunk_ids))
+
+        if delete_missing:
+            for source_id in set(self.manifest.sources) - set(sources):
+                plan.deleted_sources.append(source_id)
+                plan.removed.extend(self.manifest.sources[source_id].get("chunks", []))
+
+        return plan
+
+    def record_provenance(self, graph_documents: List[Any]) -> None:
+        """Tag each written relationship with the chunk it was extracted from"""
+        rows = [
+            {
+                "chunk": gd.source.metadata["id"],
+                "source": rel.source.id,
+                "target": rel.target.id,
+                "type": rel.type,
+            }
+            for gd in graph_documents
+            if gd.source is not None and gd.source.metadata.get("id")
+            for rel in gd.relationships
+        ]
+        for start in range(0, len(rows), self.batch_size):
+            self.graph.query("""
+            UNWIND $rows AS row
+            MATCH (s:`__Entity__` {id: row.source})-[r]->(t:`__Entity__` {id: row.target})
+            WHERE type(r) = row.type
+            SET r.source_chunks = CASE
+                WHEN row.chunk IN coalesce(r.source_chunks, []) THEN r.source_chunks
+                ELSE coalesce(r.source_chunks, []) + row.chunk
+            END
+            """, params={"rows": rows[start:start + self.batch_size]})
+
+    def remove_chunks(self, chunk_ids: List[str]) -> None:
+        """Delete chunk nodes plus the edges and entities that only they supported"""
+        for start in range(0, len(chunk_ids), self.batch_size):
+            batch = chunk_ids[start:start + self.batch_size]
+            self.graph.query("""
+            UNWIND $ids AS cid
+            MATCH (:Document {id: cid})-[:MENTIONS]->(:`__Entity__`)-[r]-()
+            WHERE cid IN coalesce(r.source_chunks, [])
+            WITH r, collect(DISTINCT cid) AS removed
+            SET r.source_chunks = [c IN r.source_chunks WHERE NOT c IN removed]
+            WITH r WHERE size(r.source_chunks) = 0
+            DELETE r
+            """, params={"ids": batch})
+            self.graph.query("""
+            UNWIND $ids AS cid
+            MATCH (d:Document {id: cid})
+            OPTIONAL MATCH (d)-[:MENTIONS]->(e:`__Entity__`)
+            WITH d, collect(DISTINCT e) AS entities
+            DETACH DELETE d
+            WITH entities
+            UNWIND entities AS e
+            WITH DISTINCT e
+            WHERE NOT (e)<-[:MENTIONS]-(:Document)
+            DETACH DELETE e
+            """, params={"ids": batch})
+
+    def run(self, sources: Dict[str, str], scheduler: ExtractionScheduler,
+            delete_missing: bool = False) -> IngestPlan:
+        """Apply one incremental run and update the manifest"""
+        self.ensure_indexes()
+        plan = self.plan(sources, delete_missing=delete_missing)
+        print(f"Incremental ingest plan: {plan}")
+
+        if plan.removed:
+            self.remove_chunks(plan.removed)
+
+        written = set()
+
+        def after_flush(batch: List[Any]) -> None:
+            self.record_provenance(batch)
+            written.update(gd.source.metadata["id"] for gd in batch)
+
+        if plan.added:
+            scheduler.after_flush = after_flush
+            try:
+                stats = scheduler.run(plan.added)
+            finally:
+                scheduler.after_flush = None
+            print(f"Incremental extraction: {stats}")
+
+        added_ids = {doc.metadata["id"] for doc in plan.added}
+        for source_id in plan.changed_sources:
+            chunk_ids = plan.new_chunks[source_id]
+            stored = [cid for cid in chunk_ids if cid not in added_ids or cid in written]
+            complete = len(stored) == len(chunk_ids)
+            # An incomplete source keeps no fingerprint so that the next run retries its missing chunks
+            self.manifest.sources[source_id] = {
+                "fingerprint": plan.fingerprints[source_id] if complete else None,
+                "chunks": stored,
+            }
+        for source_id in plan.deleted_sources:
+            del self.manifest.sources[source_id]
+        self.manifest.save()
+        return plan
@@ -0,0 +1,227 @@
+"""
+Entity/relationship extraction that does not throw away imperfect responses.
+
+Two modes, tried in this order by KnowledgeExtractor(mode="auto"):
+
+1. structured: `llm.with_structured_output(KnowledgeExtraction)`, i.e. the
+   provider's JSON-schema / tool-calling mode, so the response is already
+   parsed and validated
+2. stream: the plain prompt is streamed through JSONItemScanner, which
+   picks complete entity and relationship objects out of the text as they
+   arrive. Markdown fences, surrounding prose, trailing commas and a
+   truncated tail do not lose the objects that were already complete, and
+   the caller can start writing them before the response finishes.
+"""
+
+import json
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Tuple
+
+from pydantic import BaseModel, Field
+
+TRAILING_COMMA = re.compile(r",\s*([}\]])")
+UNSUPPORTED_HINTS = re.compile(r"schema|tool|function|response_format|json mode|structured", re.IGNORECASE)
+
+
+class ExtractedEntity(BaseModel):
+    name: str = Field(description="Entity name as written in the text")
+    type: str = Field(description="Entity type, e.g. Technology, Person, Organization, Concept")
+
+
+class ExtractedRelationship(BaseModel):
+    source: str = Field(description="Name of the source entity")
+    relation: str = Field(description="Relationship type in UPPER_SNAKE_CASE, e.g. INTEGRATES_WITH")
+    target: str = Field(description="Name of the target entity")
+
+
+class KnowledgeExtraction(BaseModel):
+    """Entities and relationships extracted from a text"""
+    entities: List[ExtractedEntity] = Field(default_factory=list)
+    relationships: List[ExtractedRelationship] = Field(default_factory=list)
+
+
+def _loads_tolerant(text: str) -> Any:
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return json.loads(TRAILING_COMMA.sub(r"\1", text))
+
+
+class JSONItemScanner:
+    """Incrementally yields complete objects found inside arrays stored under the given keys"""
+
+    def __init__(self, keys: Tuple[str, ...] = ("entities", "relationships")):
+        self.keys = set(keys)
+        self.buffer = ""
+        self._pos = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_string = None
+        # Open containers: [kind, key the container sits under, start offset, current key (objects)]
+        self._stack: List[List[Any]] = []
+
+    def feed(self, text: str) -> List[Tuple[str, Dict[str, Any]]]:
+        """Add response text; returns (key, object) for every object completed by it"""
+        self.buffer += text
+        found = []
+        while self._pos < len(self.buffer):
+            char = self.buffer[self._pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    self._last_string = self.buffer[self._string_start + 1:self._pos]
+            elif char == '"':
+                # Strings only matter inside JSON; quotes in leading prose are skipped
+                if self._stack:
+                    self._in_string = True
+                    self._string_start = self._pos
+            elif char == ":" and self._stack and self._stack[-1][0] == "{":
+                self._stack[-1][3] = self._last_string
+            elif char in "{[":
+                parent_key = None
+                if self._stack:
+                    parent = self._stack[-1]
+                    parent_key = parent[3] if parent[0] == "{" else parent[1]
+                self._stack.append([char, parent_key, self._pos, None])
+            elif char in "}]" and self._stack:
+                kind, key, start, _ = self._stack.pop()
+                inside_target_array = (self._stack and self._stack[-1][0] == "["
+                                       and self._stack[-1][1] in self.keys)
+                if kind == "{" and char == "}" and inside_target_array:
+                    try:
+                        item = _loads_tolerant(self.buffer[start:self._pos + 1])
+                    except json.JSONDecodeError:
+                        item = None
+                    if isinstance(item, dict):
+                        found.append((self._stack[-1][1], item))
+            self._pos += 1
+        return found
+
+
+def scan_knowledge(text: str) -> Dict[str, List[Dict[str, Any]]]:
+    """One-shot tolerant parse of a complete (or truncated) extraction response"""
+    kg_data = {"entities": [], "relationships": []}
+    for key, item in JSONItemScanner().feed(text):
+        kg_data[key].append(item)
+    return kg_data
+
+
+def _valid(key: str, item: Dict[str, Any]) -> bool:
+    required = ("name",) if key == "entities" else ("source", "target")
+    return all(isinstance(item.get(field), str) and item.get(field) for field in required)
+
+
+def structured_output_unsupported(error: BaseException) -> bool:
+    """True for errors saying the model cannot do structured output, False for transient ones"""
+    if isinstance(error, NotImplementedError):
+        return True
+    response = getattr(error, "response", None)
+    status = next((value for value in (getattr(error, "status_code", None), getattr(error, "status", None),
+                                       getattr(error, "code", None), getattr(response, "status_code", None))
+                   if isinstance(value, int)), None)
+    return status == 400 and UNSUPPORTED_HINTS.search(str(error)) is not None
+
+
+@dataclass
+class ExtractorStats:
+    """How extractions were obtained"""
+    structured: int = 0
+    streamed: int = 0
+    empty: int = 0
+    structured_fallbacks: int = 0
+    partial_flushes: int = 0
+    seconds: float = 0.0
+
+    def __str__(self) -> str:
+        return (f"{self.structured} structured, {self.streamed} streamed, {self.empty} empty, "
+                f"{self.structured_fallbacks} structured-output fallbacks, {self.partial_flushes} early flushes "
+                f"({self.seconds:.2f}s)")
+
+
+class KnowledgeExtractor:
+    """Extracts {"entities": [...], "relationships": [...]} via structured output or a streamed, scanned response"""
+
+    def __init__(self, llm: Any, prompt: Any, mode: str = "auto", partial_batch_size: int = 20):
+        if mode not in ("auto", "structured", "stream"):
+            raise ValueError("mode must be 'auto', 'structured' or 'stream'")
+        self.llm = llm
+        self.prompt = prompt
+        self.mode = mode
+        self.partial_batch_size = partial_batch_size
+        self.stats = ExtractorStats()
+        self._structured = None
+        self._structured_supported = mode != "stream"
+
+    def _structured_llm(self) -> Any:
+        if self._structured is None:
+            self._structured = self.llm.with_structured_output(KnowledgeExtraction)
+        return self._structured
+
+    def _extract_structured(self, text: str) -> Dict[str, Any]:
+        result = self._structured_llm().invoke(self.prompt.format(text=text))
+        if isinstance(result, BaseModel):
+            result = result.model_dump()
+        return {"entities": [e for e in result.get("entities", []) if _valid("entities", e)],
+                "relationships": [r for r in result.get("relationships", []) if _valid("relationships", r)]}
+
+    def _extract_streamed(self, text: str, on_partial: Callable[[List[Dict], List[Dict]], None] = None
+                          ) -> Dict[str, Any]:
+        scanner = JSONItemScanner()
+        kg_data = {"entities": [], "relationships": []}
+        pending = {"entities": [], "relationships": []}
+
+        def flush() -> None:
+            if on_partial is not None and (pending["entities"] or pending["relationships"]):
+                on_partial(pending["entities"], pending["relationships"])
+                self.stats.partial_flushes += 1
+            pending["entities"], pending["relationships"] = [], []
+
+        for chunk in self.llm.stream(self.prompt.format(text=text)):
+            content = getattr(chunk, "content", chunk)
+            if not isinstance(content, str):
+                continue
+            for key, item in scanner.feed(content):
+                if _valid(key, item):
+                    kg_data[key].append(item)
+                    pending[key].append(item)
+            if len(pending["entities"]) + len(pending["relationships"]) >= self.partial_batch_size:
+                flush()
+        flush()
+        return kg_data
+
+    def extract(self, text: str, on_partial: Callable[[List[Dict], List[Dict]], None] = None) -> Dict[str, Any]:
+        """`on_partial(entities, relationships)` receives items as soon as they are parsed (streaming mode)"""
+        start = time.perf_counter()
+        kg_data = None
+        if self._structured_supported:
+            try:
+                kg_data = self._extract_structured(text)
+                self.stats.structured += 1
+                if on_partial is not None:
+                    on_partial(kg_data["entities"], kg_data["relationships"])
+            except Exception as e:
+                if self.mode == "structured":
+                    raise
+                if structured_output_unsupported(e):
+                    # Provider/model without schema-constrained output: stop trying it for this extractor
+                    print(f"Structured output unavailable ({type(e).__name__}: {e}); "
+                          f"falling back to streamed parsing")
+                    self._structured_supported = False
+                else:
+                    # Timeouts, rate limits, malformed output: stream this text only and keep structured mode
+                    print(f"Structured extraction failed ({type(e).__name__}: {e}); streaming this text instead")
+                self.stats.structured_fallbacks += 1
+        if kg_data is None:
+            kg_data = self._extract_streamed(text, on_partial)
+            self.stats.streamed += 1
+        if not kg_data["entities"] and not kg_data["relationships"]:
+            self.stats.empty += 1
+        self.stats.seconds += time.perf_counter() - start
+        return kg_data
@@ -0,0 +1,353 @@
+"""
+In-process vector index backed by a memory-mapped NumPy matrix.
+
+An alternative to Neo4jVector for similarity search: vectors live in
+`<path>/vectors.bin` (float32 or float16, L2-normalised so that a dot
+product is cosine similarity) with ids, texts and metadata in
+`<path>/meta.json`. Search is exact brute force over row blocks by
+default. An optional IVF index (spherical k-means lists) trades a little
+recall for speed through `n_probe`.
+
+The index persists to disk and reloads without re-embedding. When it is
+built from Neo4j, embeddings already stored on Document nodes are reused,
+and rows whose Document node is gone are compacted away.
+"""
+
+import json
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+VECTOR_FILE = "vectors.bin"
+META_FILE = "meta.json"
+IVF_FILE = "ivf.npz"
+
+
+def _normalise(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _top_k(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Indices and scores of the k largest entries of each row, best first"""
+    k = min(k, scores.shape[1])
+    part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    part_scores = np.take_along_axis(scores, part, axis=1)
+    order = np.argsort(-part_scores, axis=1)
+    return np.take_along_axis(part, order, axis=1), np.take_along_axis(part_scores, order, axis=1)
+
+
+class LocalVectorIndex:
+    """Memory-mapped brute-force / IVF vector index with a Neo4jVector-like search API"""
+
+    def __init__(self, path: str, embeddings: Embeddings = None, dim: int = None,
+                 dtype: str = "float32", block_size: int = 65536):
+        if dtype not in ("float32", "float16"):
+            raise ValueError("dtype must be float32 or float16")
+        self.path = path
+        self.embeddings = embeddings
+        self.dim = dim
+        self.dtype = np.dtype(dtype)
+        self.block_size = block_size
+        self.count = 0
+        self.capacity = 0
+        self.ids: List[str] = []
+        self.texts: List[str] = []
+        self.metadatas: List[Dict[str, Any]] = []
+        self._id_to_row: Dict[str, int] = {}
+        self._vectors: Optional[np.memmap] = None
+        self.centroids: Optional[np.ndarray] = None
+        self.assignments: Optional[np.ndarray] = None
+        self.n_probe = 8
+        self._list_rows: Optional[np.ndarray] = None
+        self._list_offsets: Optional[np.ndarray] = None
+
+    # ------------------------------------------------------------------ persistence
+
+    @property
+    def _vector_path(self) -> str:
+        return os.path.join(self.path, VECTOR_FILE)
+
+    def _open(self, capacity: int) -> None:
+        """(Re)open the backing file with room for `capacity` rows"""
+        os.makedirs(self.path, exist_ok=True)
+        if self._vectors is not None:
+            self._vectors.flush()
+            del self._vectors
+        mode = "r+" if os.path.exists(self._vector_path) else "w+"
+        if mode == "r+" and os.path.getsize(self._vector_path) < capacity * self.dim * self.dtype.itemsize:
+            with open(self._vector_path, "r+b") as f:
+                f.truncate(capacity * self.dim * self.dtype.itemsize)
+        self._vectors = np.memmap(self._vector_path, dtype=self.dtype, mode=mode, shape=(capacity, self.dim))
+        self.capacity = capacity
+
+    def save(self) -> None:
+        if self.dim is None:
+            # Nothing was ever added; an index without a dimension cannot be reopened
+            return
+        if self._vectors is not None:
+            self._vectors.flush()
+        meta = {
+            "dim": self.dim,
+            "dtype": self.dtype.name,
+            "count": self.count,
+            "capacity": self.capacity,
+            "ids": self.ids,
+            "texts": self.texts,
+            "metadatas": self.metadatas,
+            "n_probe": self.n_probe,
+        }
+        tmp_path = os.path.join(self.path, f"{META_FILE}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, os.path.join(self.path, META_FILE))
+        ivf_path = os.path.join(self.path, IVF_FILE)
+        if self.centroids is not None:
+            np.savez(ivf_path, centroids=self.centroids, assignments=self.assignments)
+        elif os.path.exists(ivf_path):
+            # Stale lists from before the last append would not cover the new rows
+            os.remove(ivf_path)
+
+    @classmethod
+    def load(cls, path: str, embeddings: Embeddings = None, block_size: int = 65536) -> "LocalVectorIndex":
+        with open(os.path.join(path, META_FILE), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        index = cls(path, embeddings, dim=meta["dim"], dtype=meta["dtype"], block_size=block_size)
+        index.count = meta["count"]
+        index.ids = meta["ids"]
+        index.texts = meta["texts"]
+        index.metadatas = meta["metadatas"]
+        index.n_probe = meta.get("n_probe", index.n_probe)
+        index._id_to_row = {doc_id: row for row, doc_id in enumerate(index.ids)}
+        if index.dim is not None:
+            index._open(max(meta["capacity"], 1))
+        ivf_path = os.path.join(path, IVF_FILE)
+        if os.path.exists(ivf_path):
+            data = np.load(ivf_path)
+            index._set_ivf(data["centroids"], data["assignments"])
+        return index
+
+    @classmethod
+    def exists(cls, path: str) -> bool:
+        return os.path.exists(os.path.join(path, META_FILE))
+
+    # ------------------------------------------------------------------ writes
+
+    def add_vectors(self, vectors: Sequence[Sequence[float]], texts: Sequence[str],
+                    ids: Sequence[str] = None, metadatas: Sequence[Dict[str, Any]] = None) -> List[str]:
+        """Append pre-computed vectors; rows whose id is already present are skipped"""
+        matrix = _normalise(vectors)
+        if matrix.ndim != 2 or len(matrix) != len(texts):
+            raise ValueError("vectors and texts must have the same length")
+        if self.dim is None:
+            self.dim = matrix.shape[1]
+        elif matrix.shape[1] != self.dim:
+            raise ValueError(f"expected vectors of dimension {self.dim}, got {matrix.shape[1]}")
+
+        ids = list(ids) if ids is not None else [str(self.count + i) for i in range(len(texts))]
+        metadatas = list(metadatas) if metadatas is not None else [{} for _ in texts]
+        keep = [i for i, doc_id in enumerate(ids) if doc_id not in self._id_to_row]
+        if not keep:
+            return []
+
+        needed = self.count + len(keep)
+        if self._vectors is None or needed > self.capacity:
+            # Grow geometrically so appends stay amortised O(1)
+            self._open(max(needed, 2 * self.capacity, 1024))
+
+        self._vectors[self.count:needed] = matrix[keep].astype(self.dtype)
+        for i in keep:
+            self._id_to_row[ids[i]] = len(self.ids)
+            self.ids.append(ids[i])
+            self.texts.append(texts[i])
+            self.metadatas.append(metadatas[i])
+        self.count = needed
+        # New rows are not in any IVF list; fall back to exact search until rebuilt
+        self._set_ivf(None, None)
+        return [ids[i] for i in keep]
+
+    def add_texts(self, texts: Sequence[str], metadatas: Sequence[Dict[str, Any]] = None,
+                  ids: Sequence[str] = None, batch_size: int = 256) -> List[str]:
+        """Embed and append texts in batches"""
+        if self.embeddings is None:
+            raise ValueError("an Embeddings instance is required to add texts")
+        ids = list(ids) if ids is not None else [str(self.count + i) for i in range(len(texts))]
+        metadatas = list(metadatas) if metadatas is not None else [{} for _ in texts]
+        added = []
+        for start in range(0, len(texts), batch_size):
+            end = start + batch_size
+            pending = [i for i in range(start, min(end, len(texts))) if ids[i] not in self._id_to_row]
+            if not pending:
+                continue
+            vectors = self.embeddings.embed_documents([texts[i] for i in pending])
+            added += self.add_vectors(vectors, [texts[i] for i in pending],
+                                      [ids[i] for i in pending], [metadatas[i] for i in pending])
+        return added
+
+    def remove(self, ids: Sequence[str]) -> int:
+        """Drop rows by id and compact the rest to the front of the matrix; IVF lists stay valid"""
+        drop = {self._id_to_row[doc_id] for doc_id in ids if doc_id in self._id_to_row}
+        if not drop:
+            return 0
+        keep = np.array([row for row in range(self.count) if row not in drop], dtype=np.int64)
+        # Rows only move towards the front, so copying block by block in order never overwrites unread rows
+        for start in range(0, len(keep), self.block_size):
+            rows = keep[start:start + self.block_size]
+            self._vectors[start:start + len(rows)] = self._vectors[rows]
+        self.ids = [self.ids[row] for row in keep]
+        self.texts = [self.texts[row] for row in keep]
+        self.metadatas = [self.metadatas[row] for row in keep]
+        self._id_to_row = {doc_id: row for row, doc_id in enumerate(self.ids)}
+        self.count = len(keep)
+        if self.centroids is not None:
+            self._set_ivf(self.centroids, self.assignments[keep])
+        return len(drop)
+
+    # ------------------------------------------------------------------ IVF
+
+    def _set_ivf(self, centroids: Optional[np.ndarray], assignments: Optional[np.ndarray]) -> None:
+        """Install IVF lists as rows sorted by list id plus per-list offsets"""
+        self.centroids, self.assignments = centroids, assignments
+        if centroids is None:
+            self._list_rows = self._list_offsets = None
+            return
+        self._list_rows = np.argsort(assignments, kind="stable")
+        self._list_offsets = np.searchsorted(assignments[self._list_rows], np.arange(len(centroids) + 1))
+
+    def build_ivf(self, n_lists: int = None, n_iter: int = 10, sample_size: int = 50000,
+                  n_probe: int = None, seed: int = 0) -> None:
+        """Cluster rows with spherical k-means and assign each row to its nearest centroid"""
+        if self.count == 0:
+            return
+        rng = np.random.default_rng(seed)
+        n_lists = n_lists or max(1, int(np.sqrt(self.count)))
+        n_lists = min(n_lists, self.count)
+        sample_rows = np.sort(rng.choice(self.count, size=min(sample_size, self.count), replace=False))
+        sample = np.asarray(self._vectors[sample_rows], dtype=np.float32)
+
+        centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)]
+        for _ in range(n_iter):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(n_lists):
+                members = sample[labels == c]
+                if len(members):
+                    centroids[c] = members.mean(axis=0)
+            centroids = _normalise(centroids)
+
+        assignments = np.empty(self.count, dtype=np.int32)
+        for start in range(0, self.count, self.block_size):
+            block = np.asarray(self._vectors[start:min(start + self.block_size, self.count)], dtype=np.float32)
+            assignments[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+        self._set_ivf(centroids, assignments)
+        if n_probe:
+            self.n_probe = n_probe
+
+    # ------------------------------------------------------------------ search
+
+    def _search_exact(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        best_rows = np.empty((len(queries), 0), dtype=np.int64)
+        best_scores = np.empty((len(queries), 0), dtype=np.float32)
+        for start in range(0, self.count, self.block_size):
+            block = np.asarray(self._vectors[start:min(start + self.block_size, self.count)], dtype=np.float32)
+            rows, scores = _top_k(queries @ block.T, k)
+            best_rows = np.concatenate([best_rows, rows + start], axis=1)
+            best_scores = np.concatenate([best_scores, scores], axis=1)
+            picked, best_scores = _top_k(best_scores, k)
+            best_rows = np.take_along_axis(best_rows, picked, axis=1)
+        return best_rows, best_scores
+
+    def _search_ivf(self, queries: np.ndarray, k: int, n_probe: int) -> Tuple[np.ndarray, np.ndarray]:
+        probes, _ = _top_k(queries @ self.centroids.T, n_probe)
+        all_rows, all_scores = [], []
+        for query, lists in zip(queries, probes):
+            candidates = np.concatenate([
+                self._list_rows[self._list_offsets[c]:self._list_offsets[c + 1]] for c in lists
+            ])
+            if len(candidates) == 0:
+                all_rows.append(np.full(k, -1))
+                all_scores.append(np.full(k, -np.inf, dtype=np.float32))
+                continue
+            scores = np.asarray(self._vectors[candidates], dtype=np.float32) @ query
+            picked, top_scores = _top_k(scores[None, :], k)
+            rows = np.full(k, -1)
+            padded = np.full(k, -np.inf, dtype=np.float32)
+            rows[:picked.shape[1]] = candidates[picked[0]]
+            padded[:picked.shape[1]] = top_scores[0]
+            all_rows.append(rows)
+            all_scores.append(padded)
+        return np.vstack(all_rows), np.vstack(all_scores)
+
+    def search_vectors(self, queries: Sequence[Sequence[float]], k: int = 4,
+                       exact: bool = None, n_probe: int = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Batched search; returns (rows, scores) arrays of shape (n_queries, k), -1 where empty"""
+        queries = _normalise(np.atleast_2d(queries))
+        if self.count == 0:
+            return np.full((len(queries), 0), -1), np.empty((len(queries), 0), dtype=np.float32)
+        use_ivf = self.centroids is not None and not exact
+        if use_ivf:
+            return self._search_ivf(queries, k, n_probe or self.n_probe)
+        return self._search_exact(queries, k)
+
+    def _to_documents(self, rows: np.ndarray, scores: np.ndarray) -> List[Tuple[Document, float]]:
+        results = []
+        for row, score in zip(rows, scores):
+            if row < 0:
+                continue
+            metadata = dict(self.metadatas[row], id=self.ids[row])
+            results.append((Document(page_content=self.texts[row], metadata=metadata), float(score)))
+        return results
+
+    def similarity_search_by_vector(self, embedding: Sequence[float], k: int = 4, **kwargs: Any) -> List[Document]:
+        rows, scores = self.search_vectors([embedding], k=k, **kwargs)
+        return [doc for doc, _ in self._to_documents(rows[0], scores[0])]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> List[Tuple[Document, float]]:
+        rows, scores = self.search_vectors([self.embeddings.embed_query(query)], k=k, **kwargs)
+        return self._to_documents(rows[0], scores[0])
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k=k, **kwargs)]
+
+    # ------------------------------------------------------------------ Neo4j sync
+
+    def sync_from_graph(self, graph: Any, node_label: str = "Document", text_property: str = "text",
+                        embedding_property: str = "embedding", page_size: int = 1000) -> int:
+        """Add graph nodes missing from the index, reusing stored embeddings where present
+
+        Rows whose node no longer exists in the graph are removed. Returns
+        the number of rows added.
+        """
+        added = 0
+        skip = 0
+        seen = set()
+        while True:
+            rows = graph.query(
+                f"MATCH (d:`{node_label}`) WHERE d.`{text_property}` IS NOT NULL "
+                f"RETURN coalesce(d.id, elementId(d)) AS id, d.`{text_property}` AS text, "
+                f"d.`{embedding_property}` AS embedding "
+                f"ORDER BY id SKIP $skip LIMIT $limit",
+                params={"skip": skip, "limit": page_size}
+            )
+            if not rows:
+                break
+            skip += len(rows)
+            seen.update(row["id"] for row in rows)
+            rows = [row for row in rows if row["id"] not in self._id_to_row]
+            with_vectors = [row for row in rows if row.get("embedding")]
+            without = [row for row in rows if not row.get("embedding")]
+            if with_vectors:
+                added += len(self.add_vectors([r["embedding"] for r in with_vectors],
+                                              [r["text"] for r in with_vectors],
+                                              [r["id"] for r in with_vectors]))
+            if without:
+                added += len(self.add_texts([r["text"] for r in without], ids=[r["id"] for r in without]))
+
+        removed = self.remove([doc_id for doc_id in self.ids if doc_id not in seen])
+        if removed:
+            print(f"Removed {removed} vectors whose {node_label} nodes are no longer in the graph")
+        return added
@@ -0,0 +1,153 @@
+"""
+Versioned on-disk snapshots of the Neo4j schema, plus question-specific
+schema pruning for Cypher generation prompts.
+
+Neo4jGraph(refresh_schema=True) introspects every label, property and
+relationship on startup. Instead the graph is created with
+refresh_schema=False. A cheap probe (`db.labels()` and
+`db.relationshipTypes()`) is fingerprinted, and the full introspection
+only runs when that label/type set differs from the latest snapshot.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import re
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Set
+
+from langchain_neo4j.chains.graph_qa.cypher import construct_schema
+
+PROBE_QUERY = """
+CALL db.labels() YIELD label
+WITH collect(label) AS labels
+CALL db.relationshipTypes() YIELD relationshipType
+RETURN labels, collect(relationshipType) AS types
+"""
+
+
+@dataclass
+class SchemaSnapshot:
+    version: int
+    fingerprint: str
+    labels: List[str]
+    types: List[str]
+    structured_schema: Dict[str, Any]
+    schema: str
+    created_at: float
+
+
+def probe_fingerprint(labels: List[str], types: List[str]) -> str:
+    payload = json.dumps({"labels": sorted(labels), "types": sorted(types)})
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SchemaSnapshotStore:
+    """Keeps the last few schema versions as `<directory>/schema-v<N>.json`"""
+
+    def __init__(self, directory: str = ".cache/graph_rag/schema", keep: int = 5):
+        self.directory = directory
+        self.keep = keep
+        self.refreshes = 0
+        self.reuses = 0
+
+    def _paths(self) -> List[str]:
+        def version(path: str) -> int:
+            return int(re.search(r"schema-v(\d+)\.json$", path).group(1))
+        return sorted(glob.glob(os.path.join(self.directory, "schema-v*.json")), key=version)
+
+    def latest(self) -> Optional[SchemaSnapshot]:
+        paths = self._paths()
+        if not paths:
+            return None
+        with open(paths[-1], "r", encoding="utf-8") as f:
+            return SchemaSnapshot(**json.load(f))
+
+    def _write(self, snapshot: SchemaSnapshot) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"schema-v{snapshot.version}.json")
+        with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+            json.dump(asdict(snapshot), f)
+        os.replace(f"{path}.tmp", path)
+        for old in self._paths()[:-self.keep]:
+            os.remove(old)
+
+    def sync(self, graph: Any, force: bool = False) -> SchemaSnapshot:
+        """Load the snapshot into `graph`, refreshing it only if labels or relationship types changed"""
+        start = time.perf_counter()
+        probe = graph.query(PROBE_QUERY)
+        labels = probe[0]["labels"] if probe else []
+        types = probe[0]["types"] if probe else []
+        fingerprint = probe_fingerprint(labels, types)
+
+        snapshot = self.latest()
+        if snapshot is not None and snapshot.fingerprint == fingerprint and not force:
+            graph.structured_schema = snapshot.structured_schema
+            graph.schema = snapshot.schema
+            self.reuses += 1
+            print(f"Schema snapshot v{snapshot.version} reused ({(time.perf_counter() - start) * 1000:.0f} ms)")
+            return snapshot
+
+        graph.refresh_schema()
+        snapshot = SchemaSnapshot(
+            version=(snapshot.version + 1) if snapshot else 1,
+            fingerprint=fingerprint,
+            labels=sorted(labels),
+            types=sorted(types),
+            structured_schema=graph.structured_schema,
+            schema=graph.schema,
+            created_at=time.time(),
+        )
+        self._write(snapshot)
+        self.refreshes += 1
+        print(f"Schema refreshed as snapshot v{snapshot.version} ({(time.perf_counter() - start) * 1000:.0f} ms)")
+        return snapshot
+
+
+def _stem(word: str) -> str:
+    word = word.lower()
+    if word.endswith("ies") and len(word) > 4:
+        return word[:-3] + "y"
+    if word.endswith("es") and len(word) > 4:
+        return word[:-2]
+    if word.endswith("s") and len(word) > 3:
+        return word[:-1]
+    return word
+
+
+def _name_parts(name: str) -> Set[str]:
+    """"TechCompany" / "WORKS_FOR" / "created_at" -> {"tech", "company", "works", "for", ...}"""
+    spaced = re.sub(r"([a-z0-9])([A-Z])", r"\1 \2", name)
+    return {_stem(part) for part in re.split(r"[^A-Za-z0-9]+", spaced) if len(part) > 2}
+
+
+def prune_schema(structured_schema: Dict[str, Any], question: str, is_enhanced: bool = False,
+                 always_include: List[str] = None) -> Optional[str]:
+    """Schema text covering only labels/relationships relevant to `question` (None if nothing matched)"""
+    words = {_stem(w) for w in re.findall(r"[A-Za-z0-9]+", question) if len(w) > 2}
+    node_props = structured_schema.get("node_props", {})
+    rel_props = structured_schema.get("rel_props", {})
+    relationships = structured_schema.get("relationships", [])
+
+    def relevant(name: str, props: List[Dict[str, Any]]) -> bool:
+        if _name_parts(name) & words:
+            return True
+        return any(_name_parts(p.get("property", "")) & words for p in props)
+
+    labels = {label for label, props in node_props.items() if relevant(label, props)}
+    types = {rel for rel, props in rel_props.items() if relevant(rel, props)}
+    types |= {r["type"] for r in relationships if _name_parts(r["type"]) & words}
+    labels |= set(always_include or []) & set(node_props)
+    if not labels and not types:
+        return None
+
+    # Pull in one hop of structure around the matched labels and types
+    seed_labels, seed_types = set(labels), set(types)
+    for r in relationships:
+        if r["start"] in seed_labels or r["end"] in seed_labels or r["type"] in seed_types:
+            labels.update((r["start"], r["end"]))
+            types.add(r["type"])
+
+    return construct_schema(structured_schema, sorted(labels | types), [], is_enhanced)
@@ -0,0 +1,93 @@
+"""
+Token streaming helpers for answer generation and the Cypher QA chain.
+
+Every helper fills a StreamStats with time-to-first-token (measured from
+when the caller started the request, so retrieval time is included) and
+per-stage timings. Cypher stages are named after their cache outcome
+(cypher_miss means the LLM generated it).
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, Iterator
+
+from graph_rag.cypher_cache import CachedCypherQA
+
+
+@dataclass
+class StreamStats:
+    """Timing of one streamed response, in milliseconds"""
+    started: float = field(default_factory=time.perf_counter)
+    ttft_ms: float = None
+    total_ms: float = 0.0
+    chunks: int = 0
+    chars: int = 0
+    stages: Dict[str, float] = field(default_factory=dict)
+
+    def mark(self, stage: str, since: float) -> None:
+        self.stages[f"{stage}_ms"] = (time.perf_counter() - since) * 1000
+
+    def observe(self, text: str) -> None:
+        if self.ttft_ms is None:
+            self.ttft_ms = (time.perf_counter() - self.started) * 1000
+        self.chunks += 1
+        self.chars += len(text)
+
+    def finish(self) -> None:
+        self.total_ms = (time.perf_counter() - self.started) * 1000
+
+    def __str__(self) -> str:
+        ttft = f"{self.ttft_ms:.0f}" if self.ttft_ms is not None else "n/a"
+        stages = "".join(f", {name}={value:.0f}" for name, value in self.stages.items())
+        return f"ttft_ms={ttft}, total_ms={self.total_ms:.0f}, chunks={self.chunks}{stages}"
+
+
+def _text(chunk: Any) -> str:
+    """Chat models stream message chunks, StrOutputParser chains stream plain strings"""
+    content = getattr(chunk, "content", chunk)
+    return content if isinstance(content, str) else ""
+
+
+def stream_text(runnable: Any, inputs: Any, stats: StreamStats) -> Iterator[str]:
+    for chunk in runnable.stream(inputs):
+        text = _text(chunk)
+        if text:
+            stats.observe(text)
+            yield text
+    stats.finish()
+
+
+async def astream_text(runnable: Any, inputs: Any, stats: StreamStats) -> AsyncIterator[str]:
+    async for chunk in runnable.astream(inputs):
+        text = _text(chunk)
+        if text:
+            stats.observe(text)
+            yield text
+    stats.finish()
+
+
+def stream_cypher_qa(qa: CachedCypherQA, question: str, stats: StreamStats) -> Iterator[str]:
+    """Same steps as GraphCypherQAChain._call (Cypher served from cache when possible), answer streamed"""
+    start = time.perf_counter()
+    cypher, source, params, key = qa.resolve_cypher(question)
+    stats.mark(f"cypher_{source}", start)
+
+    start = time.perf_counter()
+    cypher, context = qa.execute(question, cypher, source, params, key)
+    stats.mark("cypher_execution", start)
+
+    yield from stream_text(qa.chain.qa_chain, {"question": question, "context": context}, stats)
+
+
+async def astream_cypher_qa(qa: CachedCypherQA, question: str, stats: StreamStats) -> AsyncIterator[str]:
+    start = time.perf_counter()
+    cypher, source, params, key = await qa.aresolve_cypher(question)
+    stats.mark(f"cypher_{source}", start)
+
+    start = time.perf_counter()
+    cypher, context = await asyncio.to_thread(qa.execute, question, cypher, source, params, key)
+    stats.mark("cypher_execution", start)
+
+    async for text in astream_text(qa.chain.qa_chain, {"question": question, "context": context}, stats):
+        yield text
@@ -0,0 +1,296 @@
+"""
+Lightweight tracing for the GraphRAG query path.
+
+    with tracer.span("hybrid_retrieval", question=question) as span:
+        ...
+        span.set("context_items", len(context))
+
+Spans nest through a context variable (thread pools must run work inside
+contextvars.copy_context() to inherit the parent). Each finished trace is
+exported as OTLP/JSON (`resourceSpans`), either appended to a local
+JSON-lines file or POSTed to an OTLP/HTTP collector at /v1/traces. The
+collector is called from a background thread fed by a bounded queue, so a
+slow or unreachable collector drops traces instead of stalling queries.
+
+Sampling is decided once per trace at the root span. When tracing is off
+or the trace is not sampled, span() returns a shared no-op object, so the
+instrumentation costs one attribute check per call.
+"""
+
+import atexit
+import contextvars
+import json
+import os
+import queue
+import random
+import threading
+import time
+import urllib.request
+from typing import Any, Dict, List, Optional
+
+
+def approx_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token), for batching and when no usage is reported"""
+    return len(text) // 4 + 1
+
+
+def text_size(text: str) -> Dict[str, int]:
+    """Byte and approximate token size attributes for a piece of text"""
+    text = text or ""
+    return {"bytes": len(text.encode("utf-8")), "tokens_est": approx_tokens(text)}
+
+
+def usage_attributes(message: Any) -> Dict[str, int]:
+    """Token usage reported by a chat model response (AIMessage.usage_metadata), if any"""
+    usage = getattr(message, "usage_metadata", None) or {}
+    return {key: usage[key] for key in ("input_tokens", "output_tokens", "total_tokens") if key in usage}
+
+
+class _NoopSpan:
+    """Returned when tracing is disabled or the trace was not sampled"""
+
+    sampled = False
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc: Any) -> bool:
+        return False
+
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+    def update(self, attributes: Dict[str, Any]) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+_current: contextvars.ContextVar = contextvars.ContextVar("graph_rag_span", default=None)
+
+
+class _Trace:
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.finished: List["Span"] = []
+        self.root_done = False
+
+
+class Span:
+    """One timed operation with attributes; use as a context manager"""
+
+    sampled = True
+
+    def __init__(self, tracer: "Tracer", name: str, trace: _Trace, parent: Optional["Span"],
+                 attributes: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.trace = trace
+        self.parent = parent
+        self.span_id = "%016x" % random.getrandbits(64)
+        self.attributes = attributes
+        self.start_ns = 0
+        self.end_ns = 0
+        self.error: Optional[str] = None
+        self._token = None
+
+    def set(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def update(self, attributes: Dict[str, Any]) -> None:
+        self.attributes.update(attributes)
+
+    def __enter__(self) -> "Span":
+        self.start_ns = time.time_ns()
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> bool:
+        self.end_ns = time.time_ns()
+        if exc is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        _current.reset(self._token)
+        self.tracer._finish(self)
+        return False
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_otlp_attribute(k, v) for k, v in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent is not None:
+            span["parentSpanId"] = self.parent.span_id
+        return span
+
+
+class _Unsampled(_NoopSpan):
+    """Marks a trace that lost the sampling draw so its children skip the draw too"""
+
+    def __init__(self):
+        self._token = None
+
+    def __enter__(self) -> "_Unsampled":
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, *exc: Any) -> bool:
+        _current.reset(self._token)
+        return False
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+class FileExporter:
+    """Appends one OTLP/JSON `resourceSpans` document per line"""
+
+    def __init__(self, path: str = ".cache/graph_rag/traces.jsonl"):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def export(self, payload: Dict[str, Any]) -> None:
+        line = json.dumps(payload)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+class OTLPHTTPExporter:
+    """POSTs OTLP/JSON to a collector, e.g. http://localhost:4318/v1/traces, from a background thread"""
+
+    def __init__(self, endpoint: str = "http://localhost:4318/v1/traces", timeout: float = 2.0,
+                 max_queue: int = 256):
+        self.endpoint = endpoint
+        self.timeout = timeout
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def export(self, payload: Dict[str, Any]) -> None:
+        """Queues the payload; never blocks the thread that finished the trace"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._worker, name="otlp-exporter", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+        try:
+            self._queue.put_nowait(payload)
+        except queue.Full:
+            # The collector cannot keep up; losing traces beats slowing down queries
+            self.dropped += 1
+
+    def _worker(self) -> None:
+        while True:
+            payload = self._queue.get()
+            try:
+                if payload is None:
+                    return
+                self._send(payload)
+            finally:
+                self._queue.task_done()
+
+    def _send(self, payload: Dict[str, Any]) -> None:
+        request = urllib.request.Request(self.endpoint, data=json.dumps(payload).encode("utf-8"),
+                                         headers={"Content-Type": "application/json"}, method="POST")
+        try:
+            urllib.request.urlopen(request, timeout=self.timeout).close()
+        except OSError as e:
+            # Tracing must never break the query path
+            print(f"Trace export to {self.endpoint} failed: {e}")
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Sends what is queued (waiting at most `timeout` seconds) and stops the worker"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        thread.join(timeout)
+        if self.dropped:
+            print(f"Dropped {self.dropped} traces because {self.endpoint} could not keep up")
+
+
+class Tracer:
+    """Creates spans; disabled by default"""
+
+    def __init__(self, service_name: str = "graph-rag", enabled: bool = False, sample_rate: float = 1.0,
+                 exporter: Any = None):
+        self.service_name = service_name
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.exporter = exporter
+        self._lock = threading.Lock()
+
+    def span(self, name: str, **attributes: Any):
+        """Child of the current span, or a new (possibly unsampled) trace when there is none"""
+        if not self.enabled:
+            return NOOP_SPAN
+        parent = _current.get()
+        if parent is None:
+            if random.random() >= self.sample_rate:
+                return _Unsampled()
+            return Span(self, name, _Trace("%032x" % random.getrandbits(128)), None, attributes)
+        if not parent.sampled:
+            return NOOP_SPAN
+        return Span(self, name, parent.trace, parent, attributes)
+
+    def _finish(self, span: Span) -> None:
+        trace = span.trace
+        with self._lock:
+            if trace.root_done:
+                # Finished after its root (e.g. a stage that was cut off); exported on its own
+                batch = [span]
+            else:
+                trace.finished.append(span)
+                if span.parent is not None:
+                    return
+                trace.root_done = True
+                batch, trace.finished = trace.finished, []
+        if self.exporter is not None:
+            self.exporter.export(self._payload(batch))
+
+    def _payload(self, spans: List[Span]) -> Dict[str, Any]:
+        return {"resourceSpans": [{
+            "resource": {"attributes": [_otlp_attribute("service.name", self.service_name)]},
+            "scopeSpans": [{"scope": {"name": "graph_rag"}, "spans": [s.to_otlp() for s in spans]}],
+        }]}
+
+
+tracer = Tracer()
+
+
+def configure_from_env(service_name: str = "graph-rag") -> Tracer:
+    """GRAPH_RAG_TRACING=off|file|otlp, GRAPH_RAG_TRACE_SAMPLE_RATE, GRAPH_RAG_TRACE_PATH,
+    OTEL_EXPORTER_OTLP_ENDPOINT; configures the shared `tracer` in place"""
+    mode = os.getenv("GRAPH_RAG_TRACING", "off")
+    tracer.service_name = service_name
+    tracer.sample_rate = float(os.getenv("GRAPH_RAG_TRACE_SAMPLE_RATE", "1.0"))
+    tracer.enabled = mode in ("file", "otlp")
+    if mode == "file":
+        tracer.exporter = FileExporter(os.getenv("GRAPH_RAG_TRACE_PATH", ".cache/graph_rag/traces.jsonl"))
+    elif mode == "otlp":
+        endpoint = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4318").rstrip("/")
+        tracer.exporter = OTLPHTTPExporter(f"{endpoint}/v1/traces")
+    return tracer
@@ -4,8 +4,11 @@ Building Knowledge-Grounded LLM Systems
 """
 
 import os
-import json
-from typing import List, Dict, Any
+import sys
+import asyncio
+import time
+import functools
+from typing import List, Dict, Any, Union, Iterator, AsyncIterator, Iterable, Tuple
 from dotenv import load_dotenv
 
 # LangChain imports
@@ -20,8 +23,29 @@ from langchain_neo4j import GraphCypherQAChain
 from langchain_core.example_selectors import SemanticSimilarityExampleSelector
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
-from langchain_perplexity import ChatPerplexity
 from langchain_huggingface import HuggingFaceEmbeddings
+# Shared GraphRAG helpers live one level up in all-in-one/lang-chain/graph_rag
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+# The shared LLM client lives in common/ at the repository root
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
+from common.langchain_chat import SharedChatModel
+from graph_rag.bulk_ingest import BulkGraphWriter
+from graph_rag.async_extraction import ExtractionScheduler
+from graph_rag.extraction_cache import ExtractionCache
+from graph_rag.incremental import IncrementalIngestor, IngestManifest
+from graph_rag.hybrid import GraphRetriever, HybridRetriever
+from graph_rag.local_vector import LocalVectorIndex
+from graph_rag.embedding_service import CachedEmbeddingService, EmbeddingCache
+from graph_rag.cypher_cache import CachedCypherQA, CypherCache
+from graph_rag.schema_cache import SchemaSnapshotStore, prune_schema
+from graph_rag.pipeline import IngestionPipeline, PipelineCheckpoint
+from graph_rag.kg_extraction import KnowledgeExtractor
+from graph_rag.entity_resolution import EntityResolver
+from graph_rag.context_packing import ContextPacker
+from graph_rag.batch_query import BatchAnswer, BatchQueryRunner
+from graph_rag.tracing import configure_from_env, text_size, tracer, usage_attributes
+from graph_rag.streaming import StreamStats, stream_text, astream_text, stream_cypher_qa, astream_cypher_qa
+
 class GraphRAGSystem:
     """Main class for GraphRAG system with Neo4j and LangChain"""
     
@@ -35,23 +59,69 @@ class GraphRAGSystem:
         self.neo4j_uri = os.getenv("NEO4J_URI", "bolt://localhost:7687")
         self.neo4j_username = os.getenv("NEO4J_USERNAME", "neo4j")
         self.neo4j_password = os.getenv("NEO4J_PASSWORD", "neo4j123")
+        self.graph_batch_size = int(os.getenv("GRAPH_BATCH_SIZE", "1000"))
+        self.extraction_concurrency = int(os.getenv("EXTRACTION_CONCURRENCY", "8"))
+        self.extraction_rps = float(os.getenv("EXTRACTION_RPS", "5"))
+        self.retrieval_budget_ms = float(os.getenv("RETRIEVAL_BUDGET_MS", "800"))
+        # "neo4j" (Neo4jVector over Bolt) or "local" (in-process memory-mapped index)
+        self.vector_backend = os.getenv("VECTOR_BACKEND", "neo4j")
+        self.local_vector_path = os.getenv("LOCAL_VECTOR_PATH", ".cache/graph_rag/vectors")
+        self.local_vector_dtype = os.getenv("LOCAL_VECTOR_DTYPE", "float32")
+        self.local_vector_ivf_lists = int(os.getenv("LOCAL_VECTOR_IVF_LISTS", "0"))
+        # Spans for retrieval, Cypher QA and answer generation; GRAPH_RAG_TRACING=off|file|otlp
+        configure_from_env("graph-rag-perplexity")
+        self.extraction_cache = ExtractionCache(
+            path=os.getenv("EXTRACTION_CACHE_PATH", ".cache/graph_rag/extraction.sqlite"),
+            max_entries=int(os.getenv("EXTRACTION_CACHE_MAX_ENTRIES", "50000"))
+        )
         
         # Initialize connections
         self.graph = self._initialize_neo4j_connection()
         self.llm = self._initialize_llm()
-        self.embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")      
+        self.bulk_writer = BulkGraphWriter(self.graph, batch_size=self.graph_batch_size)
+        self.graph_retriever = GraphRetriever(self.graph)
+        self._hybrid_retrievers = {}
+        self.embeddings = self._initialize_embeddings()
+        
+        # Question -> validated Cypher cache (exact, templated and embedding-similarity hits)
+        self.cypher_cache = CypherCache(
+            embeddings=self.embeddings,
+            ttl_seconds=float(os.getenv("CYPHER_CACHE_TTL_SECONDS", "86400")),
+            path=os.getenv("CYPHER_CACHE_PATH", ".cache/graph_rag/cypher_cache.json")
+        )
+        self._cypher_qa = {}
+        
+        # Folds "OpenAI" / "Open AI" / "openai" into one canonical node before anything is written
+        self.entity_resolver = EntityResolver(
+            self.graph,
+            embeddings=self.embeddings if os.getenv("ENTITY_RESOLUTION_EMBEDDINGS", "false") == "true" else None,
+            similarity_threshold=float(os.getenv("ENTITY_SIMILARITY_THRESHOLD", "0.93"))
+        )
         
         # Knowledge extraction prompt
         self.kg_prompt = self._create_knowledge_extraction_prompt()
+        # "auto" tries schema-constrained output first, then streams and scans the raw JSON
+        self.kg_extractor = KnowledgeExtractor(self.llm, self.kg_prompt, mode=os.getenv("EXTRACTION_MODE", "auto"))
+        
+        # Deduplicated, ranked answer context within CONTEXT_TOKEN_BUDGET tokens
+        # Perplexity exposes no tokenizer endpoint, so packing uses the local estimate unless CONTEXT_TOKENIZER=model
+        self.context_packer = ContextPacker(
+            budget_tokens=int(os.getenv("CONTEXT_TOKEN_BUDGET", "3000")),
+            model_counter=self._context_token_counter()
+        )
         
     def _initialize_neo4j_connection(self) -> Neo4jGraph:
         """Initialize connection to Neo4j database"""
         print("Connecting to Neo4j...")
+        # Full schema introspection is skipped here; the snapshot store only refreshes it when labels/types change
         graph = Neo4jGraph(
             url=self.neo4j_uri,
             username=self.neo4j_username,
-            password=self.neo4j_password
+            password=self.neo4j_password,
+            refresh_schema=False
         )
+        self.schema_store = SchemaSnapshotStore(os.getenv("SCHEMA_SNAPSHOT_DIR", ".cache/graph_rag/schema"))
+        self.schema_store.sync(graph)
        
         # Stop and remove existing container
             # docker stop neo4j
@@ -69,11 +139,23 @@ class GraphRAGSystem:
         print("Successfully connected to Neo4j")
         return graph
     
-    def _initialize_llm(self) -> ChatPerplexity:
-        """Initialize Perplexity Generative AI LLM"""
+    def _initialize_llm(self) -> SharedChatModel:
+        """Initialize Perplexity through the shared, pooled LLM client (reads PERPLEXITY_API_KEY)"""
         print("Initializing Perplexity LLM...")
-        os.environ["PPLX_API_KEY"] = self.perplexity_api_key
-        return ChatPerplexity(model="sonar", temperature=0.7)
+        return SharedChatModel(provider="perplexity", model="sonar", temperature=0.7)
+
+    def _initialize_embeddings(self) -> CachedEmbeddingService:
+        """Deduplicating, cached, token-batched embeddings (local model: thread pool)"""
+        return CachedEmbeddingService(
+            HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2"),
+            model_name="sentence-transformers/all-MiniLM-L6-v2",
+            cache=EmbeddingCache(os.getenv("EMBEDDING_CACHE_PATH", ".cache/graph_rag/embeddings.sqlite")),
+            remote=False
+        )
+    
+    def _model_name(self) -> str:
+        """Name of the configured chat model, used to key cached extractions"""
+        return getattr(self.llm, "model", None) or getattr(self.llm, "model_name", None) or type(self.llm).__name__
 
     def _create_knowledge_extraction_prompt(self) -> PromptTemplate:
         """Create prompt template for knowledge extraction"""
@@ -93,25 +175,42 @@ Return output strictly in this JSON format:
 }}
 """)
     
-    def extract_knowledge_from_text(self, text: str) -> Dict[str, Any]:
-        """Extract entities and relationships from text using LLM"""
+    def extract_knowledge_from_text(self, text: str, on_partial=None) -> Dict[str, Any]:
+        """Extract entities and relationships from text using LLM
+        
+        `on_partial(entities, relationships)` receives items as soon as they are parsed,
+        so graph writes can start before a long response finishes.
+        """
         print("Extracting knowledge from text...")
-        response = self.llm.invoke(
-            self.kg_prompt.format(text=text)
-        )
+        cache_key = ExtractionCache.make_key(text, self._model_name(), self.kg_prompt.template)
+        kg_data = self.extraction_cache.get(cache_key)
+        if kg_data is not None:
+            print(f"Extraction cache hit ({self.extraction_cache})")
+            if on_partial is not None:
+                on_partial(kg_data.get("entities", []), kg_data.get("relationships", []))
+            return kg_data
         
         try:
-            kg_data = json.loads(response.content)
-            print(f"Extracted {len(kg_data.get('entities', []))} entities and {len(kg_data.get('relationships', []))} relationships")
-            return kg_data
-        except json.JSONDecodeError as e:
-            print(f"Error parsing LLM response: {e}")
+            kg_data = self.kg_extractor.extract(text, on_partial=on_partial)
+        except Exception as e:
+            print(f"Error extracting knowledge: {e}")
             return {"entities": [], "relationships": []}
+        
+        print(f"Extracted {len(kg_data['entities'])} entities and {len(kg_data['relationships'])} relationships "
+              f"({self.kg_extractor.stats})")
+        # Empty results are not cached so that the chunk is retried next time
+        if kg_data["entities"] or kg_data["relationships"]:
+            self.extraction_cache.put(cache_key, kg_data)
+        return kg_data
+    
+    def _create_text_splitter(self) -> TokenTextSplitter:
+        """Splitter shared by full and incremental ingestion"""
+        return TokenTextSplitter(chunk_size=512, chunk_overlap=24)
     
     def load_documents(self, documents: List[str]) -> List[Document]:
         """Load and chunk documents for processing"""
         print("Loading and chunking documents...")
-        text_splitter = TokenTextSplitter(chunk_size=512, chunk_overlap=24)
+        text_splitter = self._create_text_splitter()
         
         doc_objects = [Document(page_content=doc) for doc in documents]
         chunked_docs = text_splitter.split_documents(doc_objects)
@@ -123,25 +222,61 @@ Return output strictly in this JSON format:
         """Build knowledge graph from documents using LLMGraphTransformer"""
         print("Building knowledge graph from documents...")
         
-        # Initialize LLM Graph Transformer
-        llm_transformer = LLMGraphTransformer(llm=self.llm)
+        # Extract chunks concurrently and stream finished graph documents to Neo4j in batches
+        scheduler = self._create_extraction_scheduler()
+        stats = scheduler.run(documents)
         
-        # Convert documents to graph documents
-        graph_documents = llm_transformer.convert_to_graph_documents(documents)
-        
-        # Add to Neo4j
-        self.graph.add_graph_documents(
-            graph_documents,
-            baseEntityLabel=True,
-            include_source=True
+        print(f"Knowledge graph built successfully: {stats}")
+        print(f"Extraction cache: {self.extraction_cache}")
+    
+    def _create_extraction_scheduler(self) -> ExtractionScheduler:
+        """Concurrent LLMGraphTransformer runner backed by the extraction cache"""
+        return ExtractionScheduler(
+            LLMGraphTransformer(llm=self.llm),
+            self.graph,
+            max_concurrency=self.extraction_concurrency,
+            requests_per_second=self.extraction_rps,
+            cache=self.extraction_cache,
+            model_name=self._model_name(),
+            resolver=self.entity_resolver
         )
-        
-        print("Knowledge graph built successfully")
+    
+    def ingest_incremental(self, sources: Dict[str, str], delete_missing: bool = False):
+        """Ingest only new or changed chunks of `sources` (source id -> text)"""
+        print("Ingesting documents incrementally...")
+        ingestor = IncrementalIngestor(
+            self.graph,
+            self._create_text_splitter(),
+            IngestManifest(os.getenv("INGEST_MANIFEST_PATH", ".cache/graph_rag/manifest.json")),
+            batch_size=self.graph_batch_size
+        )
+        plan = ingestor.run(sources, self._create_extraction_scheduler(), delete_missing=delete_missing)
+        print(f"Incremental ingestion complete: {plan}")
+        return plan
+    
+    def ingest_streaming(self, sources: Iterable[Tuple[str, str]]):
+        """Stream (source id, text) pairs through split -> extract -> write -> embed with bounded queues"""
+        print("Ingesting documents through the streaming pipeline...")
+        pipeline = IngestionPipeline(
+            self.graph,
+            self._create_text_splitter(),
+            self._create_extraction_scheduler(),
+            embeddings=self.embeddings,
+            checkpoint=PipelineCheckpoint(os.getenv("PIPELINE_CHECKPOINT_PATH", ".cache/graph_rag/pipeline_checkpoint.json")),
+            queue_size=int(os.getenv("PIPELINE_QUEUE_SIZE", "64"))
+        )
+        stats = pipeline.run(sources)
+        print(f"Streaming ingestion complete:\n{stats}")
+        print(f"Extraction cache: {self.extraction_cache}")
+        return stats
     
     def create_vector_index(self, index_name: str = "document_embeddings"):
         """Create vector index for semantic search"""
         print(f"Creating vector index: {index_name}...")
         
+        if self.vector_backend == "local":
+            return self._create_local_vector_index()
+        
         vector_index = Neo4jVector.from_existing_graph(
             self.embeddings,
             search_type="hybrid",
@@ -155,6 +290,23 @@ Return output strictly in this JSON format:
         )
         
         print("Vector index created successfully")
+        print(f"Embeddings: {self.embeddings.stats}")
+        return vector_index
+    
+    def _create_local_vector_index(self) -> LocalVectorIndex:
+        """Load the on-disk index (no re-embedding) and add any Document nodes it is missing"""
+        if LocalVectorIndex.exists(self.local_vector_path):
+            vector_index = LocalVectorIndex.load(self.local_vector_path, self.embeddings)
+        else:
+            vector_index = LocalVectorIndex(self.local_vector_path, self.embeddings, dtype=self.local_vector_dtype)
+        
+        added = vector_index.sync_from_graph(self.graph)
+        if self.local_vector_ivf_lists and (added or vector_index.centroids is None):
+            vector_index.build_ivf(n_lists=self.local_vector_ivf_lists)
+        vector_index.save()
+        
+        print(f"Local vector index ready: {vector_index.count} vectors ({added} new) at {self.local_vector_path}")
+        print(f"Embeddings: {self.embeddings.stats}")
         return vector_index
     
     def setup_cypher_qa_chain(self, examples: List[Dict[str, str]] = None):
@@ -174,6 +326,9 @@ Return output strictly in this JSON format:
                 }
             ]
         
+        # Ingestion may have added labels since startup; this is a cheap probe unless they changed
+        self.schema_store.sync(self.graph)
+        
         # Create Cypher QA chain
         chain = GraphCypherQAChain.from_llm(
             graph=self.graph,
@@ -181,80 +336,193 @@ Return output strictly in this JSON format:
             verbose=True,
             allow_dangerous_requests=True
         )
+        # Few-shot examples feed the prompt's {examples} slot and seed the Cypher cache
+        self._cypher_qa[id(chain)] = CachedCypherQA(chain, self.cypher_cache, examples,
+                                                    schema_for=self._question_schema(chain))
         
         print("Cypher QA chain ready")
         return chain
     
+    def _cached_cypher_qa(self, chain: GraphCypherQAChain) -> CachedCypherQA:
+        """Cache-backed runner for a chain (chains not built by setup_cypher_qa_chain get one lazily)"""
+        if id(chain) not in self._cypher_qa:
+            self._cypher_qa[id(chain)] = CachedCypherQA(chain, self.cypher_cache,
+                                                        schema_for=self._question_schema(chain))
+        return self._cypher_qa[id(chain)]
+    
+    def _question_schema(self, chain: GraphCypherQAChain):
+        """Build a question -> pruned sub-schema function, falling back to the chain's full schema"""
+        def schema_for(question: str) -> str:
+            pruned = prune_schema(self.graph.get_structured_schema, question)
+            if pruned is None:
+                return chain.graph_schema
+            print(f"Schema pruned for prompt: {len(pruned)} of {len(chain.graph_schema)} chars")
+            return pruned
+        return schema_for
+    
     def query_graph_with_natural_language(self, question: str, chain: GraphCypherQAChain) -> str:
         """Query the knowledge graph using natural language"""
         print(f"\nQuerying: {question}")
-        response = chain.invoke({"query": question})
+        with tracer.span("graph_qa") as span:
+            response = self._cached_cypher_qa(chain).invoke(question)
+            span.set("cypher_source", response["cypher_source"])
+        print(f"Cypher cache: {self.cypher_cache}")
         return response
     
-    def hybrid_retrieval(self, question: str, vector_index: Neo4jVector, k: int = 3) -> List[str]:
+    def stream_graph_with_natural_language(self, question: str, chain: GraphCypherQAChain,
+                                           stats: StreamStats = None) -> Iterator[str]:
+        """Streaming variant of query_graph_with_natural_language: yields answer tokens"""
+        print(f"\nQuerying (streaming): {question}")
+        stats = stats or StreamStats()
+        yield from stream_cypher_qa(self._cached_cypher_qa(chain), question, stats)
+        print(f"\nStreamed graph answer: {stats}")
+    
+    async def astream_graph_with_natural_language(self, question: str, chain: GraphCypherQAChain,
+                                                  stats: StreamStats = None) -> AsyncIterator[str]:
+        """Async streaming variant of query_graph_with_natural_language"""
+        print(f"\nQuerying (streaming): {question}")
+        stats = stats or StreamStats()
+        async for token in astream_cypher_qa(self._cached_cypher_qa(chain), question, stats):
+            yield token
+        print(f"\nStreamed graph answer: {stats}")
+    
+    def hybrid_retrieval(self, question: str, vector_index: Union[Neo4jVector, LocalVectorIndex], k: int = 3) -> List[str]:
         """Perform hybrid retrieval combining graph and vector search"""
         print(f"Performing hybrid retrieval for: {question}")
         
-        # Vector similarity search
-        semantic_docs = vector_index.similarity_search(question, k=k)
-        semantic_facts = [doc.page_content for doc in semantic_docs]
-        
-        # Graph retrieval (simplified - can be extended with Cypher queries)
-        graph_facts = []
-        
-        # Combine results
-        combined_context = semantic_facts + graph_facts
-        print(f"Retrieved {len(combined_context)} context items")
-        
-        return combined_context
+        retriever = self._hybrid_retrievers.get(id(vector_index))
+        if retriever is None:
+            retriever = HybridRetriever(vector_index, self.graph_retriever, latency_budget_ms=self.retrieval_budget_ms)
+            self._hybrid_retrievers[id(vector_index)] = retriever
+        
+        # Vector search and k-hop graph expansion run concurrently, merged with reciprocal-rank fusion
+        with tracer.span("hybrid_retrieval", k=k) as span:
+            result = retriever.retrieve(question, k=k)
+            span.update({"context_items": len(result.context), "graph_cut_off": result.graph_cut_off})
+            if span.sampled:
+                span.update(text_size("\n".join(result.context)))
+        timings = ", ".join(f"{name}={value:.0f}" for name, value in result.timings.items())
+        cut_off = " (graph stage cut off)" if result.graph_cut_off else ""
+        print(f"Retrieved {len(result.context)} context items "
+              f"({result.vector_hits} vector, {result.graph_hits} graph){cut_off} [{timings}]")
+        
+        return result.context
     
-    def generate_answer_with_context(self, question: str, context: List[str]) -> str:
-        """Generate answer using LLM with retrieved context"""
-        context_str = "\n".join(context)
-        
-        prompt = f"""Based on the following context, answer the question.
+    def _context_token_counter(self):
+        """Model tokenizer for context packing, or None to rely on the local estimate"""
+        if os.getenv("CONTEXT_TOKENIZER", "estimate") != "model":
+            return None
+        # Repeated questions pack the same context; do not pay for counting it twice
+        return functools.lru_cache(maxsize=256)(self.llm.get_num_tokens)
+    
+    def _build_answer_prompt(self, question: str, context: List[str]) -> str:
+        """Prompt shared by blocking and streaming answer generation"""
+        # Fixed instructions first and the question last, with context in a stable order in between,
+        # so repeated and related questions share the longest possible cacheable prompt prefix
+        with tracer.span("context_packing", context_items=len(context)) as span:
+            packed = self.context_packer.pack(context)
+            span.update({"packed_items": len(packed.items), "packed_tokens": packed.tokens,
+                         "dropped": packed.dropped, "duplicates": packed.duplicates + packed.merged})
+            if packed.counter_error:
+                span.set("counter_error", packed.counter_error)
+        print(f"Context packed: {packed}")
+        
+        return f"""Based on the following context, answer the question.
 
 Context:
-{context_str}
+{packed.text}
 
 Question: {question}
 
 Answer:"""
-        
-        response = self.llm.invoke(prompt)
+    
+    def generate_answer_with_context(self, question: str, context: List[str]) -> str:
+        """Generate answer using LLM with retrieved context"""
+        with tracer.span("generate_answer", context_items=len(context)) as span:
+            prompt = self._build_answer_prompt(question, context)
+            if span.sampled:
+                span.update({f"prompt_{k}": v for k, v in text_size(prompt).items()})
+            
+            response = self.llm.invoke(prompt)
+            if span.sampled:
+                span.update(usage_attributes(response))
+                span.update({f"answer_{k}": v for k, v in text_size(response.content).items()})
         return response.content
     
+    def stream_answer_with_context(self, question: str, context: List[str],
+                                   stats: StreamStats = None) -> Iterator[str]:
+        """Yield answer tokens as the LLM produces them"""
+        stats = stats or StreamStats()
+        yield from stream_text(self.llm, self._build_answer_prompt(question, context), stats)
+        print(f"Streamed answer: {stats}")
+    
+    async def astream_answer_with_context(self, question: str, context: List[str],
+                                          stats: StreamStats = None) -> AsyncIterator[str]:
+        """Async variant of stream_answer_with_context"""
+        stats = stats or StreamStats()
+        async for token in astream_text(self.llm, self._build_answer_prompt(question, context), stats):
+            yield token
+        print(f"Streamed answer: {stats}")
+    
+    def stream_hybrid_answer(self, question: str, vector_index: Union[Neo4jVector, LocalVectorIndex],
+                             k: int = 3, stats: StreamStats = None) -> Iterator[str]:
+        """Retrieve (vector and graph stages in parallel) and stream the answer as soon as context is ready"""
+        stats = stats or StreamStats()
+        start = time.perf_counter()
+        context = self.hybrid_retrieval(question, vector_index, k=k)
+        stats.mark("retrieval", start)
+        yield from self.stream_answer_with_context(question, context, stats)
+    
+    async def astream_hybrid_answer(self, question: str, vector_index: Union[Neo4jVector, LocalVectorIndex],
+                                    k: int = 3, stats: StreamStats = None) -> AsyncIterator[str]:
+        """Async variant of stream_hybrid_answer; retrieval runs off the event loop"""
+        stats = stats or StreamStats()
+        start = time.perf_counter()
+        context = await asyncio.to_thread(self.hybrid_retrieval, question, vector_index, k)
+        stats.mark("retrieval", start)
+        async for token in self.astream_answer_with_context(question, context, stats):
+            yield token
+    
+    def answer_questions(self, questions: List[str], vector_index: Union[Neo4jVector, LocalVectorIndex],
+                         chain: GraphCypherQAChain = None, k: int = 3) -> Iterator[BatchAnswer]:
+        """Answer many questions concurrently; results are yielded in completion order with per-question timings"""
+        graph_qa = functools.partial(self.query_graph_with_natural_language, chain=chain) if chain else None
+        runner = BatchQueryRunner(
+            vector_index,
+            self.graph_retriever,
+            self.generate_answer_with_context,
+            embeddings=self.embeddings,
+            graph_qa=graph_qa,
+            k=k,
+            latency_budget_ms=self.retrieval_budget_ms,
+            max_workers=int(os.getenv("BATCH_MAX_WORKERS", "16")),
+            max_llm_concurrency=int(os.getenv("BATCH_LLM_CONCURRENCY", "4"))
+        )
+        with tracer.span("answer_questions", questions=len(questions)):
+            yield from runner.run(questions)
+        print(f"Batch: {runner.stats}")
+    
     def build_knowledge_graph_manual(self, text: str):
         """Manually build knowledge graph using extract_knowledge_from_text method"""
         print("Building knowledge graph manually from text...")
         
-        # Extract knowledge using LLM
-        kg_data = self.extract_knowledge_from_text(text)
+        # Entities are written while the response is still streaming; relationships need both endpoints
+        name_to_label = {}
+        def write_entities(entities: List[Dict[str, Any]], relationships: List[Dict[str, Any]]):
+            # Variants are merged into canonical entities before they reach the graph
+            entities = [e for e in self.entity_resolver.resolve_entities(entities) if e["name"] not in name_to_label]
+            if entities:
+                _, labels = self.bulk_writer.write_entities(entities)
+                name_to_label.update(labels)
         
-        # Create entities
-        for entity in kg_data.get("entities", []):
-            entity_name = entity.get("name")
-            entity_type = entity.get("type", "Entity")
-            
-            query = f"""
-            MERGE (e:{entity_type} {{name: $name}})
-            RETURN e
-            """
-            self.graph.query(query, params={"name": entity_name})
-        
-        # Create relationships
-        for rel in kg_data.get("relationships", []):
-            source = rel.get("source")
-            relation = rel.get("relation", "RELATED_TO").upper().replace(" ", "_")
-            target = rel.get("target")
-            
-            query = f"""
-            MATCH (s {{name: $source}})
-            MATCH (t {{name: $target}})
-            MERGE (s)-[r:{relation}]->(t)
-            RETURN r
-            """
-            self.graph.query(query, params={"source": source, "target": target})
+        kg_data = self.extract_knowledge_from_text(text, on_partial=write_entities)
+        
+        # Write relationships (endpoints rewritten to canonical names) with batched UNWIND queries
+        relationships = self.entity_resolver.resolve_relationships(kg_data["relationships"])
+        stats = self.bulk_writer.write_relationships(relationships, name_to_label)
+        print(f"Bulk ingest: {len(name_to_label)} entities written during extraction, "
+              f"{stats.relationships} relationships in {stats.queries} queries")
+        print(f"Entity resolution: {self.entity_resolver.stats}")
         
         print("Manual knowledge graph built successfully")
     
@@ -283,6 +551,13 @@ Answer:"""
         
         self.graph.query(sample_query)
         print("Sample data loaded successfully")
+    
+    def close(self):
+        """Release the hybrid retrievers' thread pools and the extraction cache"""
+        for retriever in self._hybrid_retrievers.values():
+            retriever.close()
+        self._hybrid_retrievers.clear()
+        self.extraction_cache.close()
 
 
 def main():
@@ -308,17 +583,31 @@ def main():
         """
     ]
     
-    # Process documents
-    print("\n" + "=" * 60)
-    print("STEP 1: Loading and Processing Documents")
-    print("=" * 60)
-    chunked_docs = system.load_documents(documents)
-    
-    # Build knowledge graph (Method 1: Automated)
-    print("\n" + "=" * 60)
-    print("STEP 2: Building Knowledge Graph (Automated)")
-    print("=" * 60)
-    system.build_knowledge_graph_from_documents(chunked_docs)
+    ingest_mode = os.getenv("INGEST_MODE", "full")
+    if ingest_mode == "streaming":
+        # Chunking, extraction, graph writes and embedding overlap; a crashed run resumes from its checkpoint
+        print("\n" + "=" * 60)
+        print("STEP 1-2: Streaming Ingestion")
+        print("=" * 60)
+        system.ingest_streaming((f"doc-{i}", doc) for i, doc in enumerate(documents))
+    elif ingest_mode == "incremental":
+        # Only new or changed chunks are extracted; removed chunks are deleted from the graph
+        print("\n" + "=" * 60)
+        print("STEP 1-2: Incremental Ingestion")
+        print("=" * 60)
+        system.ingest_incremental({f"doc-{i}": doc for i, doc in enumerate(documents)})
+    else:
+        # Process documents
+        print("\n" + "=" * 60)
+        print("STEP 1: Loading and Processing Documents")
+        print("=" * 60)
+        chunked_docs = system.load_documents(documents)
+        
+        # Build knowledge graph (Method 1: Automated)
+        print("\n" + "=" * 60)
+        print("STEP 2: Building Knowledge Graph (Automated)")
+        print("=" * 60)
+        system.build_knowledge_graph_from_documents(chunked_docs)
     
     # Build knowledge graph (Method 2: Manual extraction)
     # print("\n" + "=" * 60)
@@ -359,18 +648,21 @@ def main():
         "What technologies are connected to LangChain?"
     ]
     
-    for question in questions:
-        try:
-            response = system.query_graph_with_natural_language(question, qa_chain)
-            print(f"\nQ: {question}")
-            print(f"A: {response.get('result', 'No answer generated')}")
-            print("-" * 60)
-        except Exception as e:
-            print(f"Error processing question: {e}")
+    # Retrieval, Cypher QA and answer generation for all questions run concurrently
+    for result in system.answer_questions(questions, vector_index, qa_chain):
+        print(f"\nQ: {result.question}")
+        if result.error:
+            print(f"Error processing question: {result.error}")
+            continue
+        print(f"A: {result.graph_answer or 'No answer generated'}")
+        print(f"Hybrid answer: {result.answer}")
+        print("Timings: " + ", ".join(f"{name}={value:.0f}" for name, value in result.timings.items()))
+        print("-" * 60)
     
     print("\n" + "=" * 60)
     print("GraphRAG Pipeline Completed Successfully!")
     print("=" * 60)
+    system.close()
 
 
 if __name__ == "__main__":
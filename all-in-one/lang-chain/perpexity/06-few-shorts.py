@@ -1,9 +1,18 @@
 import os
+import sys
 import pandas as pd
 from langchain_core.prompts import FewShotPromptTemplate, PromptTemplate
+from langchain_core.globals import set_llm_cache
 from langchain_perplexity import ChatPerplexity
 
+# The shared response cache lives in common/ at the repository root
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".."))
+from common.langchain_cache import LangChainResponseCache
+
 os.environ["PPLX_API_KEY"] = os.getenv("PERPLEXITY_API_KEY")
+# temperature=0 answers are deterministic, so repeats come from .cache/llm/responses.sqlite
+cache = LangChainResponseCache()
+set_llm_cache(cache)
 llm = ChatPerplexity(model="sonar", temperature=0)
 
 examples = [{
@@ -40,4 +49,5 @@ Examples:"""
 chain = few_shot_prompt_template_strict | llm
 print("\n" + "="*50 + "\n")
 print(chain.invoke({"input": "Who is the president of India?"}).content)
-print("\n" + "="*50 + "\n")
\ No newline at end of file
+print("\n" + "="*50 + "\n")
+print(f"Response cache: {cache.stats}")
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Tests import graph_rag the same way the scripts do, from all-in-one/lang-chain
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+from langchain_core.documents import Document
+from langchain_experimental.graph_transformers import LLMGraphTransformer
+
+from graph_rag.async_extraction import ExtractionScheduler
+from graph_rag.fakes import FakeChatModel, RecordingGraph
+
+
+class FailingGraph(RecordingGraph):
+    def add_graph_documents(self, graph_documents, **kwargs):
+        raise RuntimeError("neo4j is down")
+
+
+def test_writer_failure_fails_the_run_instead_of_hanging():
+    docs = [Document(page_content=f"Neo4j Stores Graphs For LangChain Chunk{i}") for i in range(40)]
+    scheduler = ExtractionScheduler(LLMGraphTransformer(llm=FakeChatModel(latency=0.01)), FailingGraph(),
+                                    max_concurrency=8, requests_per_second=1000, write_batch_size=2)
+
+    async def run():
+        return await asyncio.wait_for(scheduler.arun(docs), timeout=10)
+
+    with pytest.raises(RuntimeError, match="neo4j is down"):
+        asyncio.run(run())
+
+
+def test_run_writes_every_document():
+    docs = [Document(page_content=f"Neo4j Stores Graphs For LangChain Chunk{i}") for i in range(10)]
+    graph = RecordingGraph()
+    scheduler = ExtractionScheduler(LLMGraphTransformer(llm=FakeChatModel()), graph,
+                                    requests_per_second=1000, write_batch_size=3)
+    stats = scheduler.run(docs)
+    assert stats.extracted == stats.written == len(graph.graph_documents) == 10
+
+
+def test_prompt_id_follows_the_transformer_config():
+    def scheduler(**config):
+        return ExtractionScheduler(LLMGraphTransformer(llm=FakeChatModel(), **config), RecordingGraph())
+
+    default = scheduler().prompt_id
+    assert scheduler().prompt_id == default
+    assert scheduler(allowed_nodes=["Tool"]).prompt_id != default
+    assert scheduler(allowed_relationships=["USES"]).prompt_id != default
+    assert scheduler(additional_instructions="Only extract tools").prompt_id != default
+    assert ExtractionScheduler(LLMGraphTransformer(llm=FakeChatModel()), RecordingGraph(),
+                               prompt_id="v2").prompt_id == "v2"
@@ -0,0 +1,27 @@
+from graph_rag.context_packing import ContextPacker
+
+TEXT = " ".join(f"word{i:03d}" for i in range(200))
+# Six splitter chunks of 200 characters, each overlapping the next by 60
+CHUNKS = [TEXT[start:start + 200] for start in range(0, 6 * 140, 140)]
+
+
+def test_overlapping_chunks_do_not_crowd_out_graph_facts():
+    packed = ContextPacker(budget_tokens=150).pack(CHUNKS + ["Alice WORKS_AT Acme"])
+
+    assert "Alice WORKS_AT Acme" in packed.items
+    assert not packed.truncated
+    # The two best chunks fit on their own and are then stitched into one passage
+    assert packed.merged == 1
+    assert CHUNKS[0] + CHUNKS[1][60:] in packed.items
+    assert packed.tokens <= 150
+
+
+def test_model_counter_failure_is_reported_on_the_result(capsys):
+    def broken_counter(text):
+        raise RuntimeError("count_tokens unavailable")
+
+    packed = ContextPacker(budget_tokens=150, model_counter=broken_counter).pack(["Alice WORKS_AT Acme"])
+
+    assert packed.items == ["Alice WORKS_AT Acme"]
+    assert packed.counter_error == "count_tokens unavailable"
+    assert capsys.readouterr().out == ""
@@ -0,0 +1,152 @@
+import os
+import threading
+from types import SimpleNamespace
+
+from langchain_core.embeddings import Embeddings
+
+from graph_rag.cypher_cache import CachedCypherQA, CypherCache
+from graph_rag.fakes import InMemoryGraph
+
+
+def make_cache():
+    return CypherCache(ttl_seconds=None)
+
+
+def test_repeated_literal_builds_a_back_referencing_template():
+    cache = make_cache()
+    cache.store("Is Neo4j related to Neo4j Aura or Neo4j?",
+                "MATCH (a {name: 'Neo4j'})--(b {name: 'Neo4j Aura'}) RETURN b")
+
+    pattern, _, slots = cache._templates["is neo4j related to neo4j aura or neo4j"]
+    assert slots == 2
+    assert pattern.match("is pinecone related to qdrant or pinecone")
+    assert not pattern.match("is pinecone related to qdrant or chroma")
+
+
+def test_substring_literal_does_not_raise():
+    cache = make_cache()
+    cache.store("What does neo do for neon?", "MATCH (a {name: 'neo'})--(b {name: 'neon'}) RETURN b")
+    cache.store("Who uses Neo4j Aura?", "MATCH (a {name: 'Neo4j Aura'})<-[:USES]-(b {name: 'Aura'}) RETURN b")
+
+    assert "what does neo do for neon" in cache._templates
+    # 'Aura' only occurs inside 'Neo4j Aura', so the slot mapping is ambiguous
+    assert "who uses neo4j aura" not in cache._templates
+    assert cache.lookup("Who uses Neo4j Aura?")[1] == "exact"
+
+
+def test_literal_inside_a_word_is_not_a_slot():
+    cache = make_cache()
+    cache.store("Which tools does LangChain integrate?", "MATCH (a {name: 'Lang'}) RETURN a")
+
+    assert not cache._templates
+
+
+def known(*names):
+    return lambda values: {value: value for value in values if value in names}
+
+
+def test_template_hit_passes_slot_values_as_parameters():
+    cache = make_cache()
+    cache.store("What is Neo4j used for?", "MATCH (a {name: 'Neo4j'})-[r]->(b) RETURN b")
+
+    cypher, source, params, key = cache.lookup("What is Pinecone used for?", known("Pinecone"))
+
+    assert source == "template"
+    assert cypher == "MATCH (a {name: $slot0})-[r]->(b) RETURN b"
+    assert params == {"slot0": "Pinecone"}
+    assert key == "what is neo4j used for"
+
+
+def test_template_rejects_values_that_are_not_entities():
+    cache = make_cache()
+    cache.store("What is Neo4j used for?", "MATCH (a {name: 'Neo4j'})-[r]->(b) RETURN b")
+
+    for question in ("What is the meaning of life used for?", "What is x'}) DETACH DELETE (a) // used for?",
+                     "What is foo\\ used for?"):
+        assert cache.lookup(question, known("Pinecone"))[1] == "miss"
+    # Without a way to check entities, templates are never used
+    assert cache.lookup("What is Pinecone used for?")[1] == "miss"
+
+
+def test_cached_qa_checks_slots_against_graph_entities():
+    graph = InMemoryGraph()
+    graph._node("Pinecone", "Tool", "pinecone")
+    chain = SimpleNamespace(graph=graph, graph_schema="schema", top_k=10, cypher_query_corrector=None)
+    cache = make_cache()
+    qa = CachedCypherQA(chain, cache, [{"question": "What is Neo4j used for?",
+                                        "query": "MATCH (a {name: 'Neo4j'})-[r]->(b) RETURN b"}])
+
+    cypher, source, params, key = qa.resolve_cypher("What is pinecone used for?")
+    assert (source, params) == ("template", {"slot0": "Pinecone"})
+
+    qa.execute("What is pinecone used for?", cypher, source, params, key)
+    assert graph.queries[-1] == {"query": cypher, "params": {"slot0": "Pinecone"}}
+    assert cache.lookup("What is Chroma used for?", qa.known_entities)[1] == "miss"
+
+
+def test_concurrent_store_and_save(tmp_path):
+    path = tmp_path / "cypher_cache.json"
+    cache = CypherCache(ttl_seconds=None, path=str(path))
+    errors = []
+
+    def work(worker):
+        try:
+            for i in range(50):
+                cache.store(f"What does tool {worker}-{i} do?", f"MATCH (a {{name: 'tool {worker}-{i}'}}) RETURN a")
+                cache.lookup(f"What does tool {worker}-{i} do?")
+                cache.save()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=work, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert os.listdir(tmp_path) == ["cypher_cache.json"]
+    assert len(CypherCache(ttl_seconds=None, path=str(path)).entries) == 200
+
+
+class ConstantEmbeddings(Embeddings):
+    def embed_documents(self, texts):
+        return [[1.0, 0.0] for _ in texts]
+
+    def embed_query(self, text):
+        return [1.0, 0.0]
+
+
+class BrokenCypherGraph(InMemoryGraph):
+    def query(self, query, params=None):
+        if "missing_property" in query:
+            raise RuntimeError("Unknown property")
+        return super().query(query, params)
+
+
+def test_failed_semantic_hit_evicts_the_entry_that_served_it():
+    graph = BrokenCypherGraph()
+    generation = SimpleNamespace(invoke=lambda args: "MATCH (t:Tool) RETURN t.name")
+    chain = SimpleNamespace(graph=graph, graph_schema="schema", top_k=10, cypher_query_corrector=None,
+                            cypher_generation_chain=generation)
+    cache = CypherCache(embeddings=ConstantEmbeddings(), ttl_seconds=None)
+    qa = CachedCypherQA(chain, cache)
+    cache.store("Which tools are there?", "MATCH (t:Tool) RETURN t.missing_property")
+
+    cypher, source, params, key = qa.resolve_cypher("List every tool")
+    assert (source, key) == ("semantic", "which tools are there")
+
+    cypher, _ = qa.execute("List every tool", cypher, source, params, key)
+    assert cypher == "MATCH (t:Tool) RETURN t.name"
+    assert "which tools are there" not in cache.entries
+    assert cache.lookup("Show all tools")[0] == "MATCH (t:Tool) RETURN t.name"
+
+
+def test_semantic_hit_requires_the_same_numbers():
+    cache = CypherCache(embeddings=ConstantEmbeddings(), ttl_seconds=None)
+    cache.store("Top 5 most connected tools", "MATCH (t:Tool)--() RETURN t, count(*) AS c ORDER BY c DESC LIMIT 5")
+    cache.store("People older than thirty", "MATCH (p:Person) WHERE p.age > 30 RETURN p")
+
+    assert cache.lookup("Show the 10 most connected tools")[1] == "miss"
+    assert cache.lookup("People older than 40")[1] == "miss"
+    assert cache.lookup("The 5 tools with the most connections")[0].endswith("LIMIT 5")
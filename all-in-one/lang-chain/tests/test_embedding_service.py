@@ -0,0 +1,34 @@
+import asyncio
+
+from langchain_core.embeddings import Embeddings
+
+from graph_rag.embedding_service import CachedEmbeddingService, EmbeddingCache
+
+
+class RemoteEmbeddings(Embeddings):
+    def __init__(self):
+        self.loops = set()
+
+    def embed_documents(self, texts):
+        raise AssertionError("remote embeddings should go through aembed_documents")
+
+    def embed_query(self, text):
+        return [float(len(text)), 1.0]
+
+    async def aembed_documents(self, texts):
+        self.loops.add(asyncio.get_running_loop())
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+def test_sync_embed_works_inside_a_running_loop(tmp_path):
+    inner = RemoteEmbeddings()
+    service = CachedEmbeddingService(inner, "remote", EmbeddingCache(str(tmp_path / "embeddings.sqlite")),
+                                     remote=True, max_batch_size=2)
+
+    async def called_from_a_loop():
+        return service.embed_documents(["a", "bb", "ccc"])
+
+    assert asyncio.run(called_from_a_loop()) == [[1.0, 1.0], [2.0, 1.0], [3.0, 1.0]]
+    assert service.embed_documents(["dddd"]) == [[4.0, 1.0]]
+    # Every sync call fans out on the same background loop
+    assert len(inner.loops) == 1
@@ -0,0 +1,60 @@
+import threading
+import time
+from types import SimpleNamespace
+
+from graph_rag.hybrid import GraphRetriever, HybridRetriever
+
+
+class VectorIndex:
+    def similarity_search(self, question, k):
+        return [SimpleNamespace(page_content=f"chunk {i}") for i in range(k)]
+
+
+class FailingGraphRetriever(GraphRetriever):
+    def retrieve(self, question, paths_per_seed=None):
+        raise RuntimeError("fulltext index is missing")
+
+
+def test_graph_failure_falls_back_to_vector_results():
+    retriever = HybridRetriever(VectorIndex(), FailingGraphRetriever(graph=None))
+    try:
+        result = retriever.retrieve("What is LangChain?", k=2)
+    finally:
+        retriever.close()
+
+    assert result.context == ["chunk 0", "chunk 1"]
+    assert result.graph_error == "fulltext index is missing"
+    assert not result.graph_cut_off
+
+
+def test_lucene_query_drops_operator_words():
+    retriever = GraphRetriever(graph=None)
+
+    assert retriever.lucene_query("Is LangChain AND Neo4j OR Pinecone NOT Qdrant?") == \
+        "LangChain OR Neo4j OR Pinecone OR Qdrant"
+    assert retriever.lucene_query("langchain or not gpt-4") == "langchain OR gpt\\-4"
+
+
+class HangingGraphRetriever(GraphRetriever):
+    def __init__(self):
+        super().__init__(graph=None)
+        self.release = threading.Event()
+
+    def retrieve(self, question, paths_per_seed=None):
+        self.release.wait(5)
+        return []
+
+
+def test_overrunning_graph_queries_do_not_starve_vector_search():
+    graph_retriever = HangingGraphRetriever()
+    retriever = HybridRetriever(VectorIndex(), graph_retriever, latency_budget_ms=20, max_workers=2)
+    try:
+        start = time.perf_counter()
+        results = [retriever.retrieve(f"question {i}", k=1) for i in range(6)]
+        elapsed = time.perf_counter() - start
+    finally:
+        graph_retriever.release.set()
+        retriever.close()
+
+    assert all(result.graph_cut_off and result.context == ["chunk 0"] for result in results)
+    assert elapsed < 1.0
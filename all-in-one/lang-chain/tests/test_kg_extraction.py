@@ -0,0 +1,60 @@
+from graph_rag.kg_extraction import KnowledgeExtractor
+
+
+class StructuredFailure(Exception):
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class FlakyStructured:
+    def __init__(self, errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def invoke(self, prompt):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return {"entities": [{"name": "Neo4j", "type": "Technology"}], "relationships": []}
+
+
+class LLM:
+    def __init__(self, structured):
+        self.structured = structured
+        self.streams = 0
+
+    def with_structured_output(self, schema):
+        return self.structured
+
+    def stream(self, prompt):
+        self.streams += 1
+        yield '{"entities": [{"name": "LangChain", "type": "Technology"}], "relationships": []}'
+
+
+class Prompt:
+    def format(self, text):
+        return text
+
+
+def test_transient_structured_error_falls_back_for_one_call_only():
+    structured = FlakyStructured([StructuredFailure("503 overloaded", 503), TimeoutError("read timed out")])
+    llm = LLM(structured)
+    extractor = KnowledgeExtractor(llm, Prompt())
+
+    assert extractor.extract("a")["entities"][0]["name"] == "LangChain"
+    assert extractor.extract("b")["entities"][0]["name"] == "LangChain"
+    assert extractor.extract("c")["entities"][0]["name"] == "Neo4j"
+    assert (structured.calls, llm.streams) == (3, 2)
+
+
+def test_unsupported_structured_output_is_disabled():
+    for error in (NotImplementedError("with_structured_output"),
+                  StructuredFailure("Invalid schema for response_format 'json_schema'", 400)):
+        structured = FlakyStructured([error])
+        llm = LLM(structured)
+        extractor = KnowledgeExtractor(llm, Prompt())
+
+        extractor.extract("a")
+        extractor.extract("b")
+        assert (structured.calls, llm.streams) == (1, 2)
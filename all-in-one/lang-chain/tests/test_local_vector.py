@@ -0,0 +1,50 @@
+import json
+import os
+
+from graph_rag.fakes import InMemoryGraph
+from graph_rag.incremental import IncrementalIngestor, IngestManifest
+from graph_rag.local_vector import LocalVectorIndex
+
+
+def test_sync_drops_rows_of_removed_chunks(tmp_path):
+    graph = InMemoryGraph()
+    for i in range(5):
+        graph.documents[f"chunk-{i}"] = {"text": f"text {i}", "embedding": [1.0, float(i), 0.0]}
+    index = LocalVectorIndex(str(tmp_path / "vectors"), dim=3, block_size=2)
+    assert index.sync_from_graph(graph, page_size=2) == 5
+    index.build_ivf(n_lists=2)
+
+    ingestor = IncrementalIngestor(graph, splitter=None, manifest=IngestManifest(str(tmp_path / "manifest.json")))
+    ingestor.remove_chunks(["chunk-1", "chunk-3"])
+    assert index.sync_from_graph(graph, page_size=2) == 0
+
+    assert index.ids == ["chunk-0", "chunk-2", "chunk-4"]
+    for exact in (True, False):
+        hits = index.similarity_search_by_vector([1.0, 3.0, 0.0], k=5, exact=exact)
+        assert {doc.metadata["id"] for doc in hits} == {"chunk-0", "chunk-2", "chunk-4"}
+    top = index.similarity_search_by_vector([1.0, 4.0, 0.0], k=1, exact=True)
+    assert top[0].page_content == "text 4"
+
+    index.save()
+    reloaded = LocalVectorIndex.load(str(tmp_path / "vectors"))
+    assert reloaded.ids == index.ids
+    assert reloaded.similarity_search_by_vector([1.0, 2.0, 0.0], k=1)[0].metadata["id"] == "chunk-2"
+
+
+def test_empty_index_is_not_persisted_and_empty_meta_loads(tmp_path):
+    path = str(tmp_path / "vectors")
+    index = LocalVectorIndex(path)
+    assert index.sync_from_graph(InMemoryGraph()) == 0
+    index.save()
+    assert not LocalVectorIndex.exists(path)
+
+    # Meta written by earlier versions for an empty index
+    os.makedirs(path)
+    with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"dim": None, "dtype": "float32", "count": 0, "capacity": 0,
+                   "ids": [], "texts": [], "metadatas": []}, f)
+    reloaded = LocalVectorIndex.load(path)
+    assert reloaded.count == 0
+    assert reloaded.similarity_search_by_vector([1.0, 0.0], k=3) == []
+    reloaded.add_vectors([[1.0, 0.0]], ["first"], ["a"])
+    assert reloaded.similarity_search_by_vector([1.0, 0.0], k=3)[0].page_content == "first"
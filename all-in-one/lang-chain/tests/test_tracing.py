@@ -0,0 +1,37 @@
+import threading
+import time
+
+from graph_rag.tracing import OTLPHTTPExporter, Tracer
+
+
+class StuckExporter(OTLPHTTPExporter):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.sending = threading.Event()
+        self.release = threading.Event()
+        self.sent = []
+
+    def _send(self, payload):
+        self.sending.set()
+        self.release.wait(5)
+        self.sent.append(payload)
+
+
+def test_slow_collector_does_not_block_the_query_path():
+    exporter = StuckExporter(max_queue=2)
+    tracer = Tracer(enabled=True, exporter=exporter)
+
+    start = time.perf_counter()
+    with tracer.span("query", i=0):
+        pass
+    assert exporter.sending.wait(5)
+    for i in range(1, 6):
+        with tracer.span("query", i=i):
+            pass
+    assert time.perf_counter() - start < 1.0
+    # One payload is in flight, two are queued, the rest are dropped
+    assert exporter.dropped == 3
+
+    exporter.release.set()
+    exporter.close()
+    assert len(exporter.sent) == 3
@@ -0,0 +1,27 @@
+"""
+Code shared by the scripts and projects in this repository.
+
+LangChain and CrewAI adapters live in common.langchain_chat and
+common.crewai_llm; they are not imported here so that projects without
+those frameworks can still use the client.
+"""
+
+from common.response_cache import ResponseCache, ResponseCacheStats
+from common.llm_client import LLMClient, LLMError, LLMResponse, Provider, UsageRecord, default_providers, get_client
+from common.token_accounting import UsageMeter, UsageTotals, count_tokens, session_usage
+
+__all__ = [
+    "LLMClient",
+    "LLMError",
+    "LLMResponse",
+    "Provider",
+    "ResponseCache",
+    "ResponseCacheStats",
+    "UsageMeter",
+    "UsageRecord",
+    "UsageTotals",
+    "count_tokens",
+    "default_providers",
+    "get_client",
+    "session_usage",
+]
@@ -0,0 +1,44 @@
+"""
+CrewAI LLM backed by the shared LLMClient.
+
+    llm = SharedCrewLLM(provider="perplexity", model="sonar", temperature=0.7, max_tokens=4000)
+    Agent(config=..., llm=llm)
+
+Agents then share the process-wide connection pool, per-provider
+concurrency limits, retries and usage records with everything else.
+"""
+
+from typing import Any, Dict, List, Optional, Union
+
+from crewai import BaseLLM
+
+from common.llm_client import LLMClient, get_client
+
+
+class SharedCrewLLM(BaseLLM):
+    """crewai BaseLLM over common.llm_client.LLMClient (text in, text out; no native tool calling)"""
+
+    def __init__(self, provider: str, model: str, temperature: Optional[float] = None,
+                 max_tokens: Optional[int] = None, context_window: int = 127072, client: LLMClient = None):
+        super().__init__(model=model, temperature=temperature)
+        self.provider = provider
+        self.max_tokens = max_tokens
+        self.context_window = context_window
+        self.client = client
+
+    def call(self, messages: Union[str, List[Dict[str, str]]], tools: Optional[List[dict]] = None,
+             callbacks: Optional[List[Any]] = None, available_functions: Optional[Dict[str, Any]] = None,
+             from_task: Any = None, from_agent: Any = None, **kwargs: Any) -> str:
+        client = self.client or get_client()
+        response = client.complete(self.provider, self.model, messages, temperature=self.temperature,
+                                   max_tokens=self.max_tokens, stop=getattr(self, "stop", None) or None)
+        return response.text
+
+    def supports_function_calling(self) -> bool:
+        return False
+
+    def supports_stop_words(self) -> bool:
+        return True
+
+    def get_context_window_size(self) -> int:
+        return self.context_window
@@ -0,0 +1,42 @@
+"""
+LangChain cache backed by common.response_cache.ResponseCache.
+
+    from langchain_core.globals import set_llm_cache
+    set_llm_cache(LangChainResponseCache())
+
+Every LangChain model call is then keyed by the model's llm_string (class,
+model name, temperature and the other generation parameters) and the
+prompt, and served from memory or SQLite on a repeat.
+"""
+
+import json
+from typing import Any, Optional, Sequence
+
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+from langchain_core.outputs import Generation
+
+from common.response_cache import ResponseCache
+
+
+class LangChainResponseCache(BaseCache):
+    """BaseCache over ResponseCache (exact, or embedding-similarity when the ResponseCache has embeddings)"""
+
+    def __init__(self, cache: ResponseCache = None):
+        self.cache = cache or ResponseCache()
+
+    @property
+    def stats(self):
+        return self.cache.stats
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        cached = self.cache.lookup({"llm": llm_string}, prompt)
+        if cached is None:
+            return None
+        return [loads(generation) for generation in json.loads(cached)]
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Generation]) -> None:
+        self.cache.store({"llm": llm_string}, prompt, json.dumps([dumps(generation) for generation in return_val]))
+
+    def clear(self, **kwargs: Any) -> None:
+        self.cache.clear()
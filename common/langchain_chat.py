@@ -0,0 +1,143 @@
+"""
+LangChain chat model backed by the shared LLMClient.
+
+    llm = SharedChatModel(provider="gemini", model="gemini-2.5-flash", temperature=0.7)
+
+Drop-in for ChatGoogleGenerativeAI / ChatPerplexity in chains: invoke,
+stream, async and batch all go through the shared connection pool and
+per-provider limits. with_structured_output() uses the provider's JSON
+schema mode (response_format / responseJsonSchema / Ollama format) and
+parses the reply into the requested schema.
+"""
+
+import json
+import re
+from operator import itemgetter
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import Runnable, RunnableLambda, RunnableMap, RunnablePassthrough
+from pydantic import BaseModel, ConfigDict, Field
+
+from common.llm_client import LLMClient, LLMResponse, get_client
+from common.token_accounting import count_tokens
+
+ROLES = {"human": "user", "ai": "assistant", "system": "system", "chat": "user", "tool": "user", "function": "user"}
+JSON_FENCE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$")
+
+
+def to_client_messages(messages: List[BaseMessage]) -> List[Dict[str, str]]:
+    """LangChain messages -> [{"role", "content"}] with text-only content"""
+    converted = []
+    for message in messages:
+        content = message.content
+        if isinstance(content, list):
+            content = "".join(part if isinstance(part, str) else part.get("text", "") for part in content)
+        converted.append({"role": ROLES.get(message.type, "user"), "content": content})
+    return converted
+
+
+def _usage_metadata(response: LLMResponse) -> Optional[Dict[str, int]]:
+    usage = response.usage
+    if usage.total_tokens is None:
+        return None
+    return {"input_tokens": usage.input_tokens or 0, "output_tokens": usage.output_tokens or 0,
+            "total_tokens": usage.total_tokens}
+
+
+def _parse_json(message: AIMessage) -> Any:
+    return json.loads(JSON_FENCE.sub("", message.content))
+
+
+class SharedChatModel(BaseChatModel):
+    """BaseChatModel over common.llm_client.LLMClient"""
+
+    provider: str
+    model: str
+    temperature: Optional[float] = None
+    max_tokens: Optional[int] = None
+    client: Optional[LLMClient] = Field(default=None, exclude=True)
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    @property
+    def _llm_type(self) -> str:
+        return f"shared-{self.provider}"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"provider": self.provider, "model": self.model, "temperature": self.temperature,
+                "max_tokens": self.max_tokens}
+
+    def _client(self) -> LLMClient:
+        return self.client or get_client()
+
+    def _params(self, stop: Optional[List[str]], kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        return {"temperature": self.temperature, "max_tokens": self.max_tokens, "stop": stop, **kwargs}
+
+    def _result(self, response: LLMResponse) -> ChatResult:
+        message = AIMessage(
+            content=response.text,
+            usage_metadata=_usage_metadata(response),
+            response_metadata={"model_name": self.model, "provider": self.provider,
+                               "latency_ms": response.usage.latency_ms, "attempts": response.usage.attempts},
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        response = self._client().complete(self.provider, self.model, to_client_messages(messages),
+                                           **self._params(stop, kwargs))
+        return self._result(response)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Optional[AsyncCallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        response = await self._client().acomplete(self.provider, self.model, to_client_messages(messages),
+                                                  **self._params(stop, kwargs))
+        return self._result(response)
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        for text in self._client().stream(self.provider, self.model, to_client_messages(messages),
+                                          **self._params(stop, kwargs)):
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=text))
+            if run_manager:
+                run_manager.on_llm_new_token(text, chunk=chunk)
+            yield chunk
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                       run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+                       **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        async for text in self._client().astream(self.provider, self.model, to_client_messages(messages),
+                                                 **self._params(stop, kwargs)):
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=text))
+            if run_manager:
+                await run_manager.on_llm_new_token(text, chunk=chunk)
+            yield chunk
+
+    def get_num_tokens(self, text: str) -> int:
+        """Provider token count where there is an endpoint for it, otherwise the local tokenizer"""
+        try:
+            return self._client().count_tokens(self.provider, self.model, text)
+        except NotImplementedError:
+            return count_tokens(text)
+
+    def with_structured_output(self, schema: Any, *, include_raw: bool = False, **kwargs: Any) -> Runnable:
+        """JSON-schema constrained output parsed into `schema` (a pydantic model or a JSON schema dict)"""
+        kwargs.pop("method", None)
+        kwargs.pop("strict", None)
+        if kwargs:
+            raise ValueError(f"Received unsupported arguments {kwargs}")
+        is_model = isinstance(schema, type) and issubclass(schema, BaseModel)
+        json_schema = schema.model_json_schema() if is_model else schema
+        llm = self.bind(json_schema=json_schema)
+        parser = RunnableLambda(lambda message: schema.model_validate(_parse_json(message)) if is_model
+                                else _parse_json(message))
+        if include_raw:
+            parser_assign = RunnablePassthrough.assign(parsed=itemgetter("raw") | parser, parsing_error=lambda _: None)
+            parser_none = RunnablePassthrough.assign(parsed=lambda _: None)
+            return RunnableMap(raw=llm) | parser_assign.with_fallbacks([parser_none], exception_key="parsing_error")
+        return llm | parser
@@ -0,0 +1,580 @@
+"""
+Shared, provider-agnostic LLM client.
+
+    from common.llm_client import get_client
+
+    response = get_client().complete("gemini", "gemini-2.5-flash", "Explain GraphRAG", temperature=0.2)
+    print(response.text, response.usage)
+
+One process-wide client holds a keep-alive `requests.Session` (and, for
+the async API, one `httpx.AsyncClient` per event loop, closed when that
+loop's asyncio.run() finishes or by aclose()), so short calls
+reuse pooled connections instead of paying a TCP/TLS handshake each time.
+Every provider has its own concurrency limit and may have its own read
+timeout (local Ollama generation can run for minutes). 429/5xx responses
+and connection errors are retried with jittered exponential backoff
+(honouring Retry-After); a read timeout is not, because the provider may
+still be generating and a retry would run the whole generation again.
+Each call produces a UsageRecord with token counts, latency and attempts.
+Token counts come from the provider's usage metadata; when a provider
+leaves them out they are counted locally (common.token_accounting) and
+the record is marked `estimated`. The shared client adds every record
+to `common.token_accounting.session_usage`.
+
+With a ResponseCache attached, repeated calls are answered locally. By
+default only deterministic calls (temperature=0) are cached; the shared
+client reads LLM_RESPONSE_CACHE=off|deterministic|all.
+
+Providers speak one of three wire protocols:
+- "openai": OpenAI-compatible /chat/completions (Perplexity, OpenAI)
+- "gemini": Google Generative Language API generateContent
+- "ollama": local Ollama /api/chat
+"""
+
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from common.response_cache import ResponseCache, normalise_prompt
+from common.token_accounting import count_tokens, session_usage
+
+try:
+    import httpx
+except ImportError:  # async calls fall back to the pooled sync session in a thread
+    httpx = None
+
+RETRY_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+Messages = Union[str, Sequence[Dict[str, Any]]]
+
+
+@dataclass
+class Provider:
+    """Endpoint, credentials and concurrency limit for one LLM provider"""
+    name: str
+    base_url: str
+    protocol: str
+    api_key_env: Tuple[str, ...] = ()
+    max_concurrency: int = 8
+    # Seconds to wait for response data; None uses the client timeout, 0 waits indefinitely
+    read_timeout: Optional[float] = None
+
+    @property
+    def api_key(self) -> Optional[str]:
+        return next((os.getenv(env) for env in self.api_key_env if os.getenv(env)), None)
+
+
+def default_providers() -> Dict[str, Provider]:
+    """Built-in providers; LLM_MAX_CONCURRENCY_<NAME> and LLM_READ_TIMEOUT_<NAME> override the defaults"""
+    providers = [
+        Provider("gemini", "https://generativelanguage.googleapis.com/v1beta", "gemini",
+                 ("GEMINI_API_KEY", "GOOGLE_API_KEY"), 8),
+        Provider("perplexity", "https://api.perplexity.ai", "openai", ("PERPLEXITY_API_KEY", "PPLX_API_KEY"), 4),
+        Provider("openai", "https://api.openai.com/v1", "openai", ("OPENAI_API_KEY",), 8),
+        # Long transcripts on a local model take well over the default timeout to summarise
+        Provider("ollama", os.getenv("OLLAMA_HOST", "http://localhost:11434"), "ollama", (), 2, 900.0),
+    ]
+    for provider in providers:
+        provider.max_concurrency = int(os.getenv(f"LLM_MAX_CONCURRENCY_{provider.name.upper()}",
+                                                 provider.max_concurrency))
+        read_timeout = os.getenv(f"LLM_READ_TIMEOUT_{provider.name.upper()}")
+        if read_timeout:
+            provider.read_timeout = float(read_timeout)
+    return {provider.name: provider for provider in providers}
+
+
+@dataclass
+class UsageRecord:
+    """Tokens, latency and retries for one call; `estimated` when the token counts were computed locally"""
+    provider: str
+    model: str
+    input_tokens: Optional[int] = None
+    output_tokens: Optional[int] = None
+    latency_ms: float = 0.0
+    attempts: int = 1
+    streamed: bool = False
+    cached: bool = False
+    estimated: bool = False
+    error: Optional[str] = None
+
+    @property
+    def total_tokens(self) -> Optional[int]:
+        if self.input_tokens is None and self.output_tokens is None:
+            return None
+        return (self.input_tokens or 0) + (self.output_tokens or 0)
+
+    def __str__(self) -> str:
+        tokens = f"{self.input_tokens} in / {self.output_tokens} out" if self.total_tokens is not None else "no usage"
+        if self.estimated:
+            tokens += " (estimated)"
+        if self.cached:
+            return f"{self.provider}/{self.model}: cache hit, {self.latency_ms:.3f}ms"
+        return (f"{self.provider}/{self.model}: {tokens}, {self.latency_ms:.0f}ms, "
+                f"{self.attempts} attempt{'s' if self.attempts != 1 else ''}")
+
+
+@dataclass
+class LLMResponse:
+    """Generated text plus its usage record and the provider's raw JSON"""
+    text: str
+    usage: UsageRecord
+    raw: Dict[str, Any] = field(default_factory=dict)
+
+
+class LLMError(RuntimeError):
+    """Non-retryable provider error, or a retryable one that ran out of attempts"""
+
+    def __init__(self, message: str, status: int = None):
+        super().__init__(message)
+        self.status = status
+
+
+def _as_messages(messages: Messages) -> List[Dict[str, str]]:
+    if isinstance(messages, str):
+        return [{"role": "user", "content": messages}]
+    return [{"role": m["role"], "content": m["content"]} for m in messages]
+
+
+# ---------------------------------------------------------------- wire protocols
+
+def _openai_request(provider: Provider, model: str, messages: List[Dict[str, str]], params: Dict[str, Any],
+                    stream: bool) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+    body: Dict[str, Any] = {"model": model, "messages": messages, "stream": stream}
+    for key in ("temperature", "max_tokens", "stop", "top_p"):
+        if params.get(key) is not None:
+            body[key] = params[key]
+    if params.get("json_schema") is not None:
+        # OpenAI rejects a json_schema without a name; Perplexity ignores it
+        body["response_format"] = {"type": "json_schema",
+                                   "json_schema": {"name": "response", "schema": params["json_schema"]}}
+    headers = {"Authorization": f"Bearer {provider.api_key}"} if provider.api_key else {}
+    return f"{provider.base_url}/chat/completions", headers, body
+
+
+def _openai_parse(data: Dict[str, Any]) -> Tuple[str, Optional[int], Optional[int]]:
+    choices = data.get("choices") or [{}]
+    text = (choices[0].get("message") or choices[0].get("delta") or {}).get("content") or ""
+    usage = data.get("usage") or {}
+    return text, usage.get("prompt_tokens"), usage.get("completion_tokens")
+
+
+def _gemini_request(provider: Provider, model: str, messages: List[Dict[str, str]], params: Dict[str, Any],
+                    stream: bool) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+    system = [m["content"] for m in messages if m["role"] == "system"]
+    contents = [{"role": "model" if m["role"] == "assistant" else "user", "parts": [{"text": m["content"]}]}
+                for m in messages if m["role"] != "system"]
+    body: Dict[str, Any] = {"contents": contents}
+    if system:
+        body["systemInstruction"] = {"parts": [{"text": "\n\n".join(system)}]}
+    config = {}
+    for key, name in (("temperature", "temperature"), ("max_tokens", "maxOutputTokens"),
+                      ("stop", "stopSequences"), ("top_p", "topP")):
+        if params.get(key) is not None:
+            config[name] = params[key]
+    if params.get("json_schema") is not None:
+        config["responseMimeType"] = "application/json"
+        config["responseJsonSchema"] = params["json_schema"]
+    if config:
+        body["generationConfig"] = config
+    method = "streamGenerateContent?alt=sse" if stream else "generateContent"
+    return f"{provider.base_url}/models/{model}:{method}", {"x-goog-api-key": provider.api_key or ""}, body
+
+
+def _gemini_parse(data: Dict[str, Any]) -> Tuple[str, Optional[int], Optional[int]]:
+    candidates = data.get("candidates") or [{}]
+    parts = (candidates[0].get("content") or {}).get("parts") or []
+    usage = data.get("usageMetadata") or {}
+    return ("".join(part.get("text", "") for part in parts),
+            usage.get("promptTokenCount"), usage.get("candidatesTokenCount"))
+
+
+def _ollama_request(provider: Provider, model: str, messages: List[Dict[str, str]], params: Dict[str, Any],
+                    stream: bool) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+    body: Dict[str, Any] = {"model": model, "messages": messages, "stream": stream}
+    options = {}
+    for key, name in (("temperature", "temperature"), ("max_tokens", "num_predict"), ("stop", "stop"),
+                      ("top_p", "top_p")):
+        if params.get(key) is not None:
+            options[name] = params[key]
+    if options:
+        body["options"] = options
+    if params.get("json_schema") is not None:
+        body["format"] = params["json_schema"]
+    return f"{provider.base_url}/api/chat", {}, body
+
+
+def _ollama_parse(data: Dict[str, Any]) -> Tuple[str, Optional[int], Optional[int]]:
+    return (data.get("message") or {}).get("content") or "", data.get("prompt_eval_count"), data.get("eval_count")
+
+
+PROTOCOLS = {
+    "openai": (_openai_request, _openai_parse),
+    "gemini": (_gemini_request, _gemini_parse),
+    "ollama": (_ollama_request, _ollama_parse),
+}
+
+
+def _stream_payload(protocol: str, line: str) -> Optional[Dict[str, Any]]:
+    """JSON object carried by one line of a streamed response (SSE for openai/gemini, NDJSON for ollama)"""
+    line = line.strip()
+    if protocol != "ollama":
+        if not line.startswith("data:"):
+            return None
+        line = line[len("data:"):].strip()
+        if line == "[DONE]":
+            return None
+    return json.loads(line) if line else None
+
+
+class _StreamState:
+    """Accumulates usage across stream events; usage arrives on the last event(s)"""
+
+    def __init__(self, parse: Callable):
+        self.parse = parse
+        self.input_tokens = None
+        self.output_tokens = None
+
+    def feed(self, payload: Dict[str, Any]) -> str:
+        text, input_tokens, output_tokens = self.parse(payload)
+        self.input_tokens = input_tokens if input_tokens is not None else self.input_tokens
+        self.output_tokens = output_tokens if output_tokens is not None else self.output_tokens
+        return text
+
+
+# ---------------------------------------------------------------- client
+
+class LLMClient:
+    """Pooled, rate-limited, retrying client for every configured provider"""
+
+    def __init__(self, providers: Dict[str, Provider] = None, timeout: float = 120.0, max_retries: int = 3,
+                 base_delay: float = 0.5, max_delay: float = 20.0, on_usage: Callable[[UsageRecord], None] = None,
+                 cache: ResponseCache = None, cache_policy: str = "deterministic"):
+        self.providers = providers or default_providers()
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.on_usage = on_usage
+        self.cache = cache
+        # "deterministic": only temperature=0 calls; "all": every call (the key still includes temperature)
+        self.cache_policy = cache_policy
+        self.session = requests.Session()
+        pool_size = max(p.max_concurrency for p in self.providers.values()) * 2
+        self.session.mount("https://", HTTPAdapter(pool_connections=len(self.providers), pool_maxsize=pool_size))
+        self.session.mount("http://", HTTPAdapter(pool_connections=len(self.providers), pool_maxsize=pool_size))
+        self._slots = {name: threading.BoundedSemaphore(p.max_concurrency) for name, p in self.providers.items()}
+        # asyncio primitives and httpx clients belong to one event loop each; the closer task releases them
+        self._loop_state: Dict[asyncio.AbstractEventLoop, Tuple[Any, Dict]] = {}
+        self._loop_closers: Dict[asyncio.AbstractEventLoop, asyncio.Task] = {}
+
+    def provider(self, name: str) -> Provider:
+        if name not in self.providers:
+            raise ValueError(f"Unknown LLM provider '{name}'; configured: {', '.join(self.providers)}")
+        return self.providers[name]
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        if retry_after:
+            try:
+                return min(self.max_delay, float(retry_after))
+            except ValueError:
+                pass
+        # Full jitter so concurrent callers do not retry in lockstep
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def _record(self, usage: UsageRecord, messages: Messages = None, text: Optional[str] = None) -> UsageRecord:
+        if text is not None and (usage.input_tokens is None or usage.output_tokens is None):
+            # The provider did not report usage; count locally rather than making count_tokens round trips
+            if usage.input_tokens is None:
+                usage.input_tokens = count_tokens("\n".join(m["content"] for m in _as_messages(messages)))
+            if usage.output_tokens is None:
+                usage.output_tokens = count_tokens(text)
+            usage.estimated = True
+        if self.on_usage is not None:
+            self.on_usage(usage)
+        return usage
+
+    def _cache_lookup(self, provider: str, model: str, messages: Messages, params: Dict[str, Any]):
+        """(namespace, prompt, cached response or None); namespace is None when the call is not cacheable"""
+        if self.cache is None or (self.cache_policy == "deterministic" and params.get("temperature") != 0):
+            return None, None, None
+        namespace = {"provider": provider, "model": model,
+                     **{key: value for key, value in params.items() if value is not None}}
+        prompt = json.dumps([{"role": m["role"], "content": normalise_prompt(m["content"])}
+                             for m in _as_messages(messages)])
+        start = time.perf_counter()
+        text = self.cache.lookup(namespace, prompt)
+        if text is None:
+            return namespace, prompt, None
+        usage = UsageRecord(provider, model, latency_ms=(time.perf_counter() - start) * 1000, attempts=0, cached=True)
+        return namespace, prompt, LLMResponse(text, self._record(usage, messages, text))
+
+    def _read_timeout(self, provider: Provider) -> Optional[float]:
+        if provider.read_timeout is None:
+            return self.timeout
+        return provider.read_timeout or None
+
+    def _prepare(self, provider_name: str, model: str, messages: Messages, params: Dict[str, Any], stream: bool):
+        provider = self.provider(provider_name)
+        build, parse = PROTOCOLS[provider.protocol]
+        url, headers, body = build(provider, model, _as_messages(messages), params, stream)
+        return provider, parse, url, headers, body
+
+    # ------------------------------------------------------------ sync
+
+    def _post(self, provider: Provider, url: str, headers: Dict[str, str], body: Dict[str, Any],
+              usage: UsageRecord, stream: bool = False, idempotent: bool = False) -> requests.Response:
+        """POST with retries; a read timeout is only retried for `idempotent` calls, never for generation"""
+        timeout = (self.timeout, self._read_timeout(provider))
+        for attempt in range(self.max_retries + 1):
+            usage.attempts = attempt + 1
+            try:
+                response = self.session.post(url, headers=headers, json=body, timeout=timeout, stream=stream)
+            except requests.ReadTimeout as e:
+                if not idempotent or attempt == self.max_retries:
+                    raise LLMError(f"{provider.name}: {e}") from e
+                time.sleep(self._backoff(attempt))
+                continue
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.max_retries:
+                    raise LLMError(f"{provider.name}: {e}") from e
+                time.sleep(self._backoff(attempt))
+                continue
+            if response.status_code < 400:
+                return response
+            if response.status_code not in RETRY_STATUS or attempt == self.max_retries:
+                raise LLMError(f"{provider.name} returned {response.status_code}: {response.text[:500]}",
+                               response.status_code)
+            retry_after = response.headers.get("Retry-After")
+            response.close()
+            time.sleep(self._backoff(attempt, retry_after))
+
+    def complete(self, provider: str, model: str, messages: Messages, **params: Any) -> LLMResponse:
+        """One completion; params: temperature, max_tokens, stop, top_p, json_schema"""
+        namespace, prompt, cached = self._cache_lookup(provider, model, messages, params)
+        if cached is not None:
+            return cached
+        provider_cfg, parse, url, headers, body = self._prepare(provider, model, messages, params, stream=False)
+        usage = UsageRecord(provider, model)
+        start = time.perf_counter()
+        try:
+            with self._slots[provider]:
+                data = self._post(provider_cfg, url, headers, body, usage).json()
+        except LLMError as e:
+            usage.error = str(e)
+            usage.latency_ms = (time.perf_counter() - start) * 1000
+            self._record(usage)
+            raise
+        text, usage.input_tokens, usage.output_tokens = parse(data)
+        usage.latency_ms = (time.perf_counter() - start) * 1000
+        if namespace is not None:
+            self.cache.store(namespace, prompt, text)
+        return LLMResponse(text, self._record(usage, messages, text), data)
+
+    def stream(self, provider: str, model: str, messages: Messages, **params: Any) -> Iterator[str]:
+        """Yield text deltas as they arrive; the usage record is emitted when the stream ends"""
+        namespace, prompt, cached = self._cache_lookup(provider, model, messages, params)
+        if cached is not None:
+            yield cached.text
+            return
+        provider_cfg, parse, url, headers, body = self._prepare(provider, model, messages, params, stream=True)
+        usage = UsageRecord(provider, model, streamed=True)
+        state = _StreamState(parse)
+        pieces = []
+        start = time.perf_counter()
+        with self._slots[provider]:
+            response = self._post(provider_cfg, url, headers, body, usage, stream=True)
+            # iter_lines only decodes when the response declares a charset; SSE and NDJSON are UTF-8
+            response.encoding = response.encoding or "utf-8"
+            try:
+                for line in response.iter_lines(decode_unicode=True):
+                    payload = _stream_payload(provider_cfg.protocol, line or "")
+                    if payload is not None:
+                        text = state.feed(payload)
+                        if text:
+                            pieces.append(text)
+                            yield text
+            finally:
+                response.close()
+                usage.input_tokens, usage.output_tokens = state.input_tokens, state.output_tokens
+                usage.latency_ms = (time.perf_counter() - start) * 1000
+                self._record(usage, messages, "".join(pieces))
+        # Only reached when the stream was read to the end
+        if namespace is not None:
+            self.cache.store(namespace, prompt, "".join(pieces))
+
+    def count_tokens(self, provider: str, model: str, text: str) -> int:
+        """Provider-side token count (Gemini countTokens); NotImplementedError for other providers"""
+        provider_cfg = self.provider(provider)
+        if provider_cfg.protocol != "gemini":
+            raise NotImplementedError(f"{provider} has no token counting endpoint")
+        url = f"{provider_cfg.base_url}/models/{model}:countTokens"
+        body = {"contents": [{"role": "user", "parts": [{"text": text}]}]}
+        with self._slots[provider]:
+            response = self._post(provider_cfg, url, {"x-goog-api-key": provider_cfg.api_key or ""}, body,
+                                  UsageRecord(provider, model), idempotent=True)
+        return response.json().get("totalTokens", 0)
+
+    # ------------------------------------------------------------ async
+
+    def _async_state(self) -> Tuple[Any, Dict[str, asyncio.Semaphore]]:
+        loop = asyncio.get_running_loop()
+        state = self._loop_state.get(loop)
+        if state is None:
+            limits = httpx.Limits(max_keepalive_connections=20) if httpx is not None else None
+            client = httpx.AsyncClient(timeout=self.timeout, limits=limits) if httpx is not None else None
+            state = (client, {name: asyncio.Semaphore(p.max_concurrency) for name, p in self.providers.items()})
+            self._loop_state[loop] = state
+            # asyncio.run() cancels leftover tasks before closing the loop, which runs the closer's cleanup
+            self._loop_closers[loop] = loop.create_task(self._close_with_loop(loop, state))
+        return state
+
+    async def _close_with_loop(self, loop: asyncio.AbstractEventLoop, state: Tuple[Any, Dict]) -> None:
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await self._release(loop, state)
+
+    async def _release(self, loop: asyncio.AbstractEventLoop, state: Tuple[Any, Dict]) -> None:
+        if self._loop_state.get(loop) is state:
+            del self._loop_state[loop]
+            self._loop_closers.pop(loop, None)
+        client = state[0]
+        if client is not None and not client.is_closed:
+            await client.aclose()
+
+    async def aclose(self) -> None:
+        """Close the running loop's httpx client now rather than when the loop shuts down"""
+        loop = asyncio.get_running_loop()
+        state = self._loop_state.get(loop)
+        if state is not None:
+            closer = self._loop_closers.get(loop)
+            await self._release(loop, state)
+            if closer is not None:
+                closer.cancel()
+
+    async def _apost(self, client: Any, provider: Provider, url: str, headers: Dict[str, str],
+                     body: Dict[str, Any], usage: UsageRecord, stream: bool = False) -> Any:
+        """POST with retries; returns the parsed JSON, or with `stream` the open response for the caller to close"""
+        timeout = httpx.Timeout(self.timeout, read=self._read_timeout(provider))
+        for attempt in range(self.max_retries + 1):
+            usage.attempts = attempt + 1
+            try:
+                request = client.build_request("POST", url, headers=headers, json=body, timeout=timeout)
+                response = await client.send(request, stream=stream)
+            except httpx.ReadTimeout as e:
+                # The provider may still be generating; a retry would pay for the whole generation again
+                raise LLMError(f"{provider.name}: {e}") from e
+            except httpx.TransportError as e:
+                if attempt == self.max_retries:
+                    raise LLMError(f"{provider.name}: {e}") from e
+                await asyncio.sleep(self._backoff(attempt))
+                continue
+            if response.status_code < 400:
+                return response if stream else response.json()
+            # A streamed error body has not been read yet
+            await response.aread()
+            await response.aclose()
+            if response.status_code not in RETRY_STATUS or attempt == self.max_retries:
+                raise LLMError(f"{provider.name} returned {response.status_code}: {response.text[:500]}",
+                               response.status_code)
+            await asyncio.sleep(self._backoff(attempt, response.headers.get("Retry-After")))
+
+    async def acomplete(self, provider: str, model: str, messages: Messages, **params: Any) -> LLMResponse:
+        """Async variant of complete()"""
+        client, slots = self._async_state()
+        if client is None:
+            # Without httpx the sync session still pools connections; the per-provider limit applies there
+            return await asyncio.to_thread(self.complete, provider, model, messages, **params)
+        namespace, prompt, cached = self._cache_lookup(provider, model, messages, params)
+        if cached is not None:
+            return cached
+        provider_cfg, parse, url, headers, body = self._prepare(provider, model, messages, params, stream=False)
+        usage = UsageRecord(provider, model)
+        start = time.perf_counter()
+        try:
+            async with slots[provider]:
+                data = await self._apost(client, provider_cfg, url, headers, body, usage)
+        except LLMError as e:
+            usage.error = str(e)
+            usage.latency_ms = (time.perf_counter() - start) * 1000
+            self._record(usage)
+            raise
+        text, usage.input_tokens, usage.output_tokens = parse(data)
+        usage.latency_ms = (time.perf_counter() - start) * 1000
+        if namespace is not None:
+            self.cache.store(namespace, prompt, text)
+        return LLMResponse(text, self._record(usage, messages, text), data)
+
+    async def astream(self, provider: str, model: str, messages: Messages, **params: Any) -> AsyncIterator[str]:
+        """Async variant of stream(); without httpx the full response arrives as one piece"""
+        client, slots = self._async_state()
+        if client is None:
+            yield (await self.acomplete(provider, model, messages, **params)).text
+            return
+        namespace, prompt, cached = self._cache_lookup(provider, model, messages, params)
+        if cached is not None:
+            yield cached.text
+            return
+        provider_cfg, parse, url, headers, body = self._prepare(provider, model, messages, params, stream=True)
+        usage = UsageRecord(provider, model, streamed=True)
+        state = _StreamState(parse)
+        pieces = []
+        start = time.perf_counter()
+        async with slots[provider]:
+            try:
+                # Retried like acomplete() until the response headers arrive; nothing has been yielded yet
+                response = await self._apost(client, provider_cfg, url, headers, body, usage, stream=True)
+                try:
+                    async for line in response.aiter_lines():
+                        payload = _stream_payload(provider_cfg.protocol, line)
+                        if payload is not None:
+                            text = state.feed(payload)
+                            if text:
+                                pieces.append(text)
+                                yield text
+                finally:
+                    await response.aclose()
+            finally:
+                usage.input_tokens, usage.output_tokens = state.input_tokens, state.output_tokens
+                usage.latency_ms = (time.perf_counter() - start) * 1000
+                self._record(usage, messages, "".join(pieces))
+        if namespace is not None:
+            self.cache.store(namespace, prompt, "".join(pieces))
+
+    def close(self) -> None:
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
+
+
+_shared: Optional[LLMClient] = None
+_shared_lock = threading.Lock()
+
+
+def get_client() -> LLMClient:
+    """Process-wide client, so every script and adapter shares one connection pool"""
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                policy = os.getenv("LLM_RESPONSE_CACHE", "deterministic")
+                cache = None
+                if policy != "off":
+                    ttl = os.getenv("LLM_RESPONSE_CACHE_TTL_SECONDS")
+                    cache = ResponseCache(
+                        path=os.getenv("LLM_RESPONSE_CACHE_PATH", ".cache/llm/responses.sqlite"),
+                        max_entries=int(os.getenv("LLM_RESPONSE_CACHE_MAX_ENTRIES", "10000")),
+                        ttl_seconds=float(ttl) if ttl else None
+                    )
+                _shared = LLMClient(timeout=float(os.getenv("LLM_TIMEOUT_SECONDS", "120")),
+                                    max_retries=int(os.getenv("LLM_MAX_RETRIES", "3")),
+                                    on_usage=session_usage.record, cache=cache, cache_policy=policy)
+    return _shared
@@ -0,0 +1,246 @@
+"""
+Persistent LLM response cache.
+
+    cache = ResponseCache(".cache/llm/responses.sqlite", max_entries=10000, ttl_seconds=7 * 86400)
+    namespace = {"provider": "gemini", "model": "gemini-2.5-flash", "temperature": 0}
+    text = cache.lookup(namespace, prompt)
+    if text is None:
+        text = call_llm(prompt)
+        cache.store(namespace, prompt, text)
+
+Entries are keyed by the namespace (provider, model, temperature and any
+other generation parameters) plus the prompt with whitespace normalised.
+Lookups go through an in-memory LRU first, so a repeated call is served
+in microseconds, then the SQLite store. With `embeddings`, an exact miss
+falls back to the most similar stored prompt in the same namespace if it
+scores at least `similarity_threshold`.
+
+Size is bounded by `max_entries` (least recently used rows are evicted)
+and entries older than `ttl_seconds` are treated as misses and removed.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+WHITESPACE = re.compile(r"\s+")
+
+
+def normalise_prompt(prompt: str) -> str:
+    return WHITESPACE.sub(" ", prompt).strip()
+
+
+def namespace_key(namespace: Dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(namespace, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class ResponseCacheStats:
+    """Counters for a ResponseCache"""
+    memory_hits: int = 0
+    disk_hits: int = 0
+    semantic_hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+    expired: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits + self.semantic_hits
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __str__(self) -> str:
+        return (f"{self.hits} hits ({self.memory_hits} memory, {self.disk_hits} disk, {self.semantic_hits} semantic), "
+                f"{self.misses} misses, {self.hit_rate:.0%} hit rate, {self.stores} stored, "
+                f"{self.evictions} evicted, {self.expired} expired")
+
+
+class ResponseCache:
+    """SQLite-backed exact (and optionally embedding-similarity) response cache with LRU and TTL eviction"""
+
+    def __init__(self, path: str = ".cache/llm/responses.sqlite", max_entries: int = 10000,
+                 ttl_seconds: Optional[float] = None, memory_entries: int = 1024, embeddings: Any = None,
+                 similarity_threshold: float = 0.95):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.memory_entries = memory_entries
+        self.embeddings = embeddings
+        self.similarity_threshold = similarity_threshold
+        self.stats = ResponseCacheStats()
+        self._lock = threading.Lock()
+        # key -> (response, created_at)
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        # Memory hits do not write to SQLite; their access times are flushed on the next store
+        self._touched: Dict[str, float] = {}
+        # namespace -> (keys, matrix) for similarity lookups, loaded on first use
+        self._vectors: Dict[str, Tuple[List[str], Any]] = {}
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " namespace TEXT NOT NULL,"
+            " prompt TEXT NOT NULL,"
+            " response TEXT NOT NULL,"
+            " embedding BLOB,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_namespace ON responses (namespace)")
+        self._conn.commit()
+        self._count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    @staticmethod
+    def make_key(namespace: Dict[str, Any], prompt: str) -> str:
+        return hashlib.sha256(f"{namespace_key(namespace)}\x00{normalise_prompt(prompt)}".encode("utf-8")).hexdigest()
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - created_at > self.ttl_seconds
+
+    def _remember(self, key: str, response: str, created_at: float) -> None:
+        self._memory[key] = (response, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _delete(self, keys: List[str]) -> None:
+        for key in keys:
+            self._memory.pop(key, None)
+            self._touched.pop(key, None)
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", [(key,) for key in keys])
+        self._count -= len(keys)
+        self._vectors.clear()
+
+    def lookup(self, namespace: Dict[str, Any], prompt: str) -> Optional[str]:
+        """Cached response for this namespace and prompt, or None"""
+        key = self.make_key(namespace, prompt)
+        now = time.time()
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None and not self._expired(cached[1], now):
+                self._memory.move_to_end(key)
+                self._touched[key] = now
+                self.stats.memory_hits += 1
+                return cached[0]
+
+            row = self._conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                if self._expired(row[1], now):
+                    self._delete([key])
+                    self._conn.commit()
+                    self.stats.expired += 1
+                else:
+                    self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+                    self._conn.commit()
+                    self._remember(key, row[0], row[1])
+                    self.stats.disk_hits += 1
+                    return row[0]
+
+        if self.embeddings is not None:
+            response = self._similar(namespace, prompt, now)
+            if response is not None:
+                return response
+        with self._lock:
+            self.stats.misses += 1
+        return None
+
+    def _embed(self, prompt: str):
+        import numpy as np
+        vector = np.asarray(self.embeddings.embed_query(normalise_prompt(prompt)), dtype=np.float32)
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+    def _namespace_vectors(self, ns: str):
+        import numpy as np
+        if ns not in self._vectors:
+            rows = self._conn.execute(
+                "SELECT key, embedding FROM responses WHERE namespace = ? AND embedding IS NOT NULL", (ns,)
+            ).fetchall()
+            keys = [row[0] for row in rows]
+            matrix = np.array([array("f", row[1]) for row in rows], dtype=np.float32) if rows else None
+            self._vectors[ns] = (keys, matrix)
+        return self._vectors[ns]
+
+    def _similar(self, namespace: Dict[str, Any], prompt: str, now: float) -> Optional[str]:
+        vector = self._embed(prompt)
+        with self._lock:
+            keys, matrix = self._namespace_vectors(namespace_key(namespace))
+            if matrix is None:
+                return None
+            scores = matrix @ vector
+            best = int(scores.argmax())
+            if scores[best] < self.similarity_threshold:
+                return None
+            row = self._conn.execute("SELECT response, created_at FROM responses WHERE key = ?",
+                                     (keys[best],)).fetchone()
+            if row is None or self._expired(row[1], now):
+                return None
+            self._touched[keys[best]] = now
+            self.stats.semantic_hits += 1
+            return row[0]
+
+    def store(self, namespace: Dict[str, Any], prompt: str, response: str) -> None:
+        key = self.make_key(namespace, prompt)
+        ns = namespace_key(namespace)
+        embedding = self._embed(prompt) if self.embeddings is not None else None
+        now = time.time()
+        with self._lock:
+            exists = self._conn.execute("SELECT 1 FROM responses WHERE key = ?", (key,)).fetchone() is not None
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, namespace, prompt, response, embedding, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, ns, normalise_prompt(prompt), response,
+                 array("f", embedding).tobytes() if embedding is not None else None, now, now)
+            )
+            self._count += 0 if exists else 1
+            self._remember(key, response, now)
+            self._vectors.pop(ns, None)
+            self.stats.stores += 1
+            self._flush_touched()
+            if self._count > self.max_entries:
+                victims = [row[0] for row in self._conn.execute(
+                    "SELECT key FROM responses ORDER BY accessed_at ASC LIMIT ?", (self._count - self.max_entries,)
+                )]
+                self._delete(victims)
+                self.stats.evictions += len(victims)
+            self._conn.commit()
+
+    def _flush_touched(self) -> None:
+        if self._touched:
+            self._conn.executemany("UPDATE responses SET accessed_at = ? WHERE key = ?",
+                                   [(at, key) for key, at in self._touched.items()])
+            self._touched.clear()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            self._memory.clear()
+            self._touched.clear()
+            self._vectors.clear()
+            self._count = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_touched()
+            self._conn.commit()
+            self._conn.close()
+
+    def __len__(self) -> int:
+        return self._count
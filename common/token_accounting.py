@@ -0,0 +1,113 @@
+"""
+Token accounting for LLM calls.
+
+Token counts come from the provider's usage metadata on the response, so
+no extra count_tokens round trips are needed. When a provider does not
+report usage (some streams, some local servers), LLMClient fills the gap
+with count_tokens(): a locally cached tiktoken encoding, or ~4 characters
+per token if tiktoken or its encoding file is unavailable. Those records
+are marked `estimated`.
+
+UsageMeter aggregates UsageRecords per provider/model; the shared client
+feeds the module-level `session_usage` meter:
+
+    from common.token_accounting import session_usage
+    print(session_usage)
+"""
+
+import functools
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+ENCODING_NAME = os.getenv("LLM_TOKENIZER_ENCODING", "cl100k_base")
+
+
+@functools.lru_cache(maxsize=None)
+def _encoding() -> Optional[Any]:
+    """The tiktoken encoding, loaded once per process; None when it cannot be loaded"""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(ENCODING_NAME)
+    except Exception:
+        # Not installed, or the encoding file cannot be downloaded (offline); fall back to the estimate
+        return None
+
+
+@functools.lru_cache(maxsize=4096)
+def count_tokens(text: str) -> int:
+    """Local token count for text the provider did not report usage for"""
+    if not text:
+        return 0
+    encoding = _encoding()
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+@dataclass
+class UsageTotals:
+    """Running totals for one provider/model"""
+    calls: int = 0
+    cached_calls: int = 0
+    failed_calls: int = 0
+    estimated_calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    latency_ms: float = 0.0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+    def __str__(self) -> str:
+        return (f"{self.calls} calls ({self.cached_calls} cached, {self.failed_calls} failed, "
+                f"{self.estimated_calls} estimated), {self.input_tokens} in / {self.output_tokens} out tokens, "
+                f"{self.latency_ms / max(self.calls - self.cached_calls, 1):.0f}ms avg")
+
+
+class UsageMeter:
+    """Thread-safe per-provider/model totals of UsageRecords"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.by_model: Dict[Tuple[str, str], UsageTotals] = {}
+
+    def record(self, usage: Any) -> None:
+        """Add one common.llm_client.UsageRecord"""
+        with self._lock:
+            totals = self.by_model.setdefault((usage.provider, usage.model), UsageTotals())
+            totals.calls += 1
+            if usage.cached:
+                totals.cached_calls += 1
+                return
+            if usage.error:
+                totals.failed_calls += 1
+            if usage.estimated:
+                totals.estimated_calls += 1
+            totals.input_tokens += usage.input_tokens or 0
+            totals.output_tokens += usage.output_tokens or 0
+            totals.latency_ms += usage.latency_ms
+
+    def total(self) -> UsageTotals:
+        """Totals across every provider and model"""
+        combined = UsageTotals()
+        with self._lock:
+            for totals in self.by_model.values():
+                for name in ("calls", "cached_calls", "failed_calls", "estimated_calls", "input_tokens",
+                             "output_tokens", "latency_ms"):
+                    setattr(combined, name, getattr(combined, name) + getattr(totals, name))
+        return combined
+
+    def reset(self) -> None:
+        with self._lock:
+            self.by_model.clear()
+
+    def __str__(self) -> str:
+        lines = [f"total: {self.total()}"]
+        lines += [f"{provider}/{model}: {totals}" for (provider, model), totals in sorted(self.by_model.items())]
+        return "\n".join(lines)
+
+
+session_usage = UsageMeter()
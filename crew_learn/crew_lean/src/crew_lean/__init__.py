@@ -1,7 +1,11 @@
 import os
-from crewai import LLM
+import sys
 from dotenv import load_dotenv
 
+# The shared LLM client lives in common/ at the repository root
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", ".."))
+from common.crewai_llm import SharedCrewLLM
+
 # Load environment variables
 load_dotenv()
 
@@ -14,7 +18,7 @@ def create_perplexity_llm(modelName="sonar", **kwargs):
         **kwargs: Additional LLM parameters
     
     Returns:
-        LLM instance configured for Perplexity
+        LLM instance for Perplexity, served by the shared pooled client
     """
     model_map = {       
         "sonar": "sonar", 
@@ -27,16 +31,15 @@ def create_perplexity_llm(modelName="sonar", **kwargs):
         raise ValueError("PERPLEXITY_API_KEY environment variable not set")
     
     default_params = {
+        "provider": "perplexity",
         "model": model_map.get(modelName, model_map["sonar"]),
-        "api_key": api_key,
-        "base_url": "https://api.perplexity.ai",
         "temperature": 0.7,
         "max_tokens": 4000
     }
     
     # Merge with user-provided kwargs
     default_params.update(kwargs)    
-    return LLM(**default_params)
+    return SharedCrewLLM(**default_params)
 
 try: 
     RESEARCH_LLM = create_perplexity_llm(modelName="sonar_reasoning", max_tokens=8000)
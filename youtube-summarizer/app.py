@@ -1,18 +1,33 @@
 # app.py
+import os
 import gradio as gr
-from youtube_summarizer import process_youtube_video
+from whisper_pool import get_pool
+from chunked_transcription import default_workers
+from job_manager import JobManager
+
+# Every request runs as a job in its own work directory, so concurrent requests do not clobber each other.
+# STREAMING=0 falls back to download, then transcribe, then summarise.
+manager = JobManager(
+    max_workers=int(os.getenv("JOB_WORKERS", "2")),
+    max_queued=int(os.getenv("JOB_QUEUE_SIZE", "16")),
+    transcribe_workers=default_workers(),
+    streaming=os.getenv("STREAMING", "1") != "0"
+)
 
 def handle_input(url):
     try:
-        transcript, summary = process_youtube_video(url)
-        return transcript, summary
+        job = manager.submit(url)
+        # Transcript and running summary update live while the audio is still downloading
+        for snapshot in manager.follow(job.id):
+            yield f"[job {snapshot.id}] {snapshot.progress}", snapshot.transcript, snapshot.summary
     except Exception as e:
-        return f"Error: {str(e)}", ""
+        yield f"Error: {str(e)}", "", ""
 
 iface = gr.Interface(
     fn=handle_input,
     inputs=gr.Textbox(label="YouTube Video URL", placeholder="Paste a YouTube video link here..."),
     outputs=[
+        gr.Textbox(label="Progress", lines=1),
         gr.Textbox(label="Full Transcript", lines=20),
         gr.Textbox(label="Summarized Text", lines=10)
     ],
@@ -22,4 +37,8 @@ iface = gr.Interface(
 )
 
 if __name__ == "__main__":
+    # Load Whisper before the first request instead of during it
+    get_pool().preload(os.getenv("WHISPER_PRELOAD", "base").split(","))
+    # Gradio runs one request at a time by default; the job manager bounds the actual work
+    iface.queue(default_concurrency_limit=None)
     iface.launch()
@@ -0,0 +1,218 @@
+# artifact_cache.py
+"""
+On-disk cache of per-video artifacts: audio, titles, transcripts and summaries.
+
+    cache = get_artifact_cache()
+    vid = video_id(url)
+    transcript = cache.get_text(vid, "transcript", {"model_size": "base"})
+    if transcript is None:
+        transcript = transcribe(...)
+        cache.put_text(vid, "transcript", {"model_size": "base"}, transcript)
+
+Artifacts are keyed by the YouTube video id, the stage and the parameters
+that produced them (Whisper model size, summariser model, prompt version),
+so changing any of them misses instead of returning stale output. Files
+live under `<root>/<video id>/` with a SQLite index. When the total size
+passes `max_bytes`, the least recently used artifacts are deleted.
+
+The shared cache reads ARTIFACT_CACHE=off, ARTIFACT_CACHE_DIR and
+ARTIFACT_CACHE_MAX_MB.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+VIDEO_ID = re.compile(r"^[A-Za-z0-9_-]{11}$")
+
+
+def video_id(url: str) -> str:
+    """YouTube video id from watch, youtu.be, shorts, embed and live URLs; a hash of the URL otherwise"""
+    parsed = urlparse(url.strip())
+    host = (parsed.hostname or "").lower()
+    candidate = None
+    if host.endswith("youtu.be"):
+        candidate = parsed.path.strip("/").split("/")[0]
+    elif host.endswith("youtube.com") or host.endswith("youtube-nocookie.com"):
+        candidate = parse_qs(parsed.query).get("v", [None])[0]
+        parts = parsed.path.strip("/").split("/")
+        if candidate is None and len(parts) >= 2 and parts[0] in ("shorts", "embed", "live", "v"):
+            candidate = parts[1]
+    if candidate and VIDEO_ID.match(candidate):
+        return candidate
+    return "url-" + hashlib.sha256(url.strip().encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class ArtifactCacheStats:
+    """Counters for an ArtifactCache"""
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+
+    def __str__(self) -> str:
+        return f"{self.hits} hits, {self.misses} misses, {self.stores} stored, {self.evictions} evicted"
+
+
+class ArtifactCache:
+    """Size-bounded, LRU-evicted artifact files keyed by video id, stage and stage parameters"""
+
+    def __init__(self, root: str = os.path.join(".cache", "youtube"), max_bytes: int = 5 * 1024 ** 3,
+                 enabled: bool = True):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.stats = ArtifactCacheStats()
+        self._lock = threading.Lock()
+        if not enabled:
+            return
+        os.makedirs(root, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(root, "index.sqlite"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS artifacts ("
+            " key TEXT PRIMARY KEY,"
+            " video_id TEXT NOT NULL,"
+            " stage TEXT NOT NULL,"
+            " params TEXT NOT NULL,"
+            " path TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS artifacts_accessed ON artifacts (accessed_at)")
+        self._conn.commit()
+        self._total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM artifacts").fetchone()[0]
+
+    @staticmethod
+    def make_key(video: str, stage: str, params: Dict[str, Any]) -> str:
+        payload = json.dumps({"video_id": video, "stage": stage, "params": params}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get_path(self, video: str, stage: str, params: Dict[str, Any]) -> Optional[str]:
+        """Path of the cached artifact, or None"""
+        if not self.enabled:
+            return None
+        key = self.make_key(video, stage, params)
+        with self._lock:
+            row = self._conn.execute("SELECT path FROM artifacts WHERE key = ?", (key,)).fetchone()
+            if row is not None and not os.path.exists(row[0]):
+                # Removed behind our back; forget it
+                self._forget(key)
+                row = None
+            if row is None:
+                self.stats.misses += 1
+                return None
+            self._conn.execute("UPDATE artifacts SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            self.stats.hits += 1
+            return row[0]
+
+    def get_text(self, video: str, stage: str, params: Dict[str, Any]) -> Optional[str]:
+        path = self.get_path(video, stage, params)
+        if path is None:
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def put_file(self, video: str, stage: str, params: Dict[str, Any], source: str, move: bool = True) -> str:
+        """Store `source` (moved by default) and return its path in the cache; `source` itself when disabled"""
+        if not self.enabled:
+            return source
+        key = self.make_key(video, stage, params)
+        directory = os.path.join(self.root, video)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{stage}-{key[:16]}{os.path.splitext(source)[1]}")
+        if move:
+            shutil.move(source, path)
+        else:
+            shutil.copyfile(source, path)
+        self._index(key, video, stage, params, path)
+        return path
+
+    def put_text(self, video: str, stage: str, params: Dict[str, Any], text: str) -> None:
+        if not self.enabled:
+            return
+        directory = os.path.join(self.root, video)
+        os.makedirs(directory, exist_ok=True)
+        # Written to a temporary file and renamed, so readers never see a partial artifact
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".txt")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        self.put_file(video, stage, params, tmp_path)
+
+    def _index(self, key: str, video: str, stage: str, params: Dict[str, Any], path: str) -> None:
+        size = os.path.getsize(path)
+        now = time.time()
+        with self._lock:
+            previous = self._conn.execute("SELECT size, path FROM artifacts WHERE key = ?", (key,)).fetchone()
+            if previous is not None:
+                self._total -= previous[0]
+                if previous[1] != path and os.path.exists(previous[1]):
+                    os.remove(previous[1])
+            self._conn.execute(
+                "INSERT OR REPLACE INTO artifacts (key, video_id, stage, params, path, size, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, video, stage, json.dumps(params, sort_keys=True, default=str), path, size, now, now)
+            )
+            self._total += size
+            self.stats.stores += 1
+            self._evict(keep=key)
+            self._conn.commit()
+
+    def _forget(self, key: str) -> None:
+        row = self._conn.execute("SELECT size FROM artifacts WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            self._total -= row[0]
+            self._conn.execute("DELETE FROM artifacts WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def _evict(self, keep: str) -> None:
+        """Delete least recently used artifacts until the cache fits; caller holds _lock"""
+        if self._total <= self.max_bytes:
+            return
+        for key, path, size in self._conn.execute(
+                "SELECT key, path, size FROM artifacts WHERE key != ? ORDER BY accessed_at ASC", (keep,)).fetchall():
+            if self._total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self._conn.execute("DELETE FROM artifacts WHERE key = ?", (key,))
+            self._total -= size
+            self.stats.evictions += 1
+
+    def total_bytes(self) -> int:
+        return self._total if self.enabled else 0
+
+    def close(self) -> None:
+        if self.enabled:
+            with self._lock:
+                self._conn.close()
+
+
+_cache: Optional[ArtifactCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_artifact_cache() -> ArtifactCache:
+    """Process-wide cache shared by the CLI, the streaming pipeline and the job manager"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ArtifactCache(root=os.getenv("ARTIFACT_CACHE_DIR", os.path.join(".cache", "youtube")),
+                                       max_bytes=int(float(os.getenv("ARTIFACT_CACHE_MAX_MB", "5120")) * 1024 ** 2),
+                                       enabled=os.getenv("ARTIFACT_CACHE", "on") != "off")
+    return _cache
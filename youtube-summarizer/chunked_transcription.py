@@ -0,0 +1,199 @@
+# chunked_transcription.py
+"""
+Long-audio transcription split across CPU worker processes.
+
+    result = transcribe_long_audio("outputs/audio.mp3", model_size="base", workers=8)
+    print(result["text"])
+
+The audio is decoded once to 16 kHz mono, then cut into segments of about
+`segment_seconds` at the quietest point near each target boundary (frame
+energy voice-activity detection), so cuts land in pauses rather than
+mid-word. Each segment is padded with `overlap_seconds` of its neighbours
+and transcribed by a worker process that keeps its own resident Whisper
+model (see whisper_pool.py), so memory grows with the number of workers.
+
+Stitching shifts every Whisper segment by its chunk's start time and keeps
+it only if its midpoint falls in the chunk's own (unpadded) range. Each
+moment of audio is owned by exactly one chunk, so words heard in the
+overlap are not duplicated; a repeated line across a boundary is dropped.
+"""
+
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import whisper
+
+SAMPLE_RATE = whisper.audio.SAMPLE_RATE
+FRAME_SECONDS = 0.03
+
+
+@dataclass
+class AudioChunk:
+    """A span of the audio; [start, end) is owned by this chunk, [padded_start, padded_end) is transcribed"""
+    index: int
+    start: float
+    end: float
+    padded_start: float
+    padded_end: float
+
+
+def frame_energy(audio: np.ndarray, frame_seconds: float = FRAME_SECONDS) -> np.ndarray:
+    """RMS energy per frame"""
+    frame = int(frame_seconds * SAMPLE_RATE)
+    frames = len(audio) // frame
+    if frames == 0:
+        return np.zeros(0, dtype=np.float32)
+    shaped = audio[:frames * frame].reshape(frames, frame)
+    return np.sqrt((shaped.astype(np.float32) ** 2).mean(axis=1))
+
+
+def smoothed_energy(audio: np.ndarray, pause_seconds: float = 0.3) -> np.ndarray:
+    """Frame energy averaged over `pause_seconds`, so a cut lands in a pause rather than between two syllables"""
+    energy = frame_energy(audio)
+    width = max(1, int(pause_seconds / FRAME_SECONDS))
+    return np.convolve(energy, np.ones(width, dtype=np.float32) / width, mode="same")
+
+
+def quietest_point(smoothed: np.ndarray, start: float, end: float) -> float:
+    """Time (seconds) of the quietest frame of `smoothed` between `start` and `end`"""
+    lo = max(0, int(start / FRAME_SECONDS))
+    window = smoothed[lo:int(end / FRAME_SECONDS)]
+    if not len(window):
+        return round((start + end) / 2, 3)
+    return round((lo + int(window.argmin())) * FRAME_SECONDS + FRAME_SECONDS / 2, 3)
+
+
+def find_cut_points(audio: np.ndarray, segment_seconds: float = 60.0, search_seconds: float = 10.0) -> List[float]:
+    """Cut times (seconds) near every `segment_seconds`, each at the quietest point within `search_seconds`"""
+    duration = len(audio) / SAMPLE_RATE
+    if duration <= segment_seconds + search_seconds:
+        return []
+    smoothed = smoothed_energy(audio)
+    cuts = []
+    target = segment_seconds
+    while target < duration - search_seconds:
+        cut = quietest_point(smoothed, target - search_seconds, target + search_seconds)
+        cuts.append(cut)
+        target = cut + segment_seconds
+    return cuts
+
+
+def plan_chunks(audio: np.ndarray, segment_seconds: float = 60.0, overlap_seconds: float = 1.0) -> List[AudioChunk]:
+    duration = len(audio) / SAMPLE_RATE
+    bounds = [0.0] + find_cut_points(audio, segment_seconds) + [duration]
+    return [
+        AudioChunk(i, start, end, max(0.0, start - overlap_seconds), min(duration, end + overlap_seconds))
+        for i, (start, end) in enumerate(zip(bounds, bounds[1:]))
+    ]
+
+
+# ---------------------------------------------------------------- worker process
+
+def _init_worker(model_size: str, threads: int) -> None:
+    import torch
+    from whisper_pool import get_pool
+    # Workers split the cores between them instead of each starting one thread per core
+    torch.set_num_threads(threads)
+    get_pool().preload([model_size])
+
+
+def transcribe_chunk(model_size: str, audio: np.ndarray, options: Dict[str, Any]) -> Dict[str, Any]:
+    from whisper_pool import get_pool
+    result = get_pool().transcribe(model_size, audio, **options)
+    return {
+        "language": result.get("language"),
+        "segments": [{"start": s["start"], "end": s["end"], "text": s["text"]} for s in result["segments"]],
+    }
+
+
+def default_workers() -> int:
+    """TRANSCRIBE_WORKERS, or half the cores (Whisper on CPU gains little from hyper-threads)"""
+    return int(os.getenv("TRANSCRIBE_WORKERS") or max(1, (os.cpu_count() or 1) // 2))
+
+
+_executors: Dict[Tuple[str, int], ProcessPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def get_executor(model_size: str, workers: int) -> ProcessPoolExecutor:
+    """Worker processes are kept between calls so each loads its model once"""
+    with _executors_lock:
+        key = (model_size, workers)
+        if key not in _executors:
+            print(f"Starting {workers} transcription workers (Whisper {model_size})...")
+            threads = max(1, (os.cpu_count() or 1) // workers)
+            # spawn: forking a process that already initialised torch's thread pools can deadlock
+            _executors[key] = ProcessPoolExecutor(max_workers=workers,
+                                                  mp_context=multiprocessing.get_context("spawn"),
+                                                  initializer=_init_worker, initargs=(model_size, threads))
+        return _executors[key]
+
+
+@atexit.register
+def shutdown_executors() -> None:
+    with _executors_lock:
+        for executor in _executors.values():
+            executor.shutdown(cancel_futures=True)
+        _executors.clear()
+
+
+# ---------------------------------------------------------------- stitching
+
+def append_chunk(segments: List[Dict[str, Any]], chunk: AudioChunk, result: Dict[str, Any]) -> None:
+    """Add one chunk's segments (in chunk order) onto the original timeline, keeping those whose midpoint it owns"""
+    # The final chunk has no right-hand padding and owns everything up to the end
+    owned_until = chunk.end if chunk.padded_end > chunk.end else float("inf")
+    for segment in result["segments"]:
+        start = segment["start"] + chunk.padded_start
+        end = segment["end"] + chunk.padded_start
+        if not chunk.start <= (start + end) / 2 < owned_until:
+            continue
+        text = segment["text"].strip()
+        if not text:
+            continue
+        # The same line heard from both sides of a cut
+        if segments and segments[-1]["text"] == text and start < segments[-1]["end"] + 1.0:
+            segments[-1]["end"] = max(segments[-1]["end"], round(end, 2))
+            continue
+        segments.append({"id": len(segments), "start": round(start, 2), "end": round(end, 2), "text": text})
+
+
+def stitch(chunks: List[AudioChunk], results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Merge per-chunk results onto the original timeline, each moment owned by exactly one chunk"""
+    segments = []
+    for chunk, result in zip(chunks, results):
+        append_chunk(segments, chunk, result)
+    languages = [result["language"] for result in results if result.get("language")]
+    return {
+        "text": " ".join(segment["text"] for segment in segments),
+        "segments": segments,
+        "language": max(set(languages), key=languages.count) if languages else None,
+    }
+
+
+def transcribe_long_audio(audio: Any, model_size: str = "base", workers: Optional[int] = None,
+                          segment_seconds: float = 60.0, overlap_seconds: float = 1.0,
+                          **options: Any) -> Dict[str, Any]:
+    """Whisper-style result ({"text", "segments", "language"}) for an audio file or 16 kHz array"""
+    workers = workers or default_workers()
+    if isinstance(audio, str):
+        audio = whisper.load_audio(audio)
+    chunks = plan_chunks(audio, segment_seconds, overlap_seconds)
+    print(f"Transcribing {len(audio) / SAMPLE_RATE:.0f}s of audio as {len(chunks)} chunks on {workers} workers...")
+    executor = get_executor(model_size, workers)
+    futures = [
+        executor.submit(transcribe_chunk, model_size,
+                        audio[int(chunk.padded_start * SAMPLE_RATE):int(chunk.padded_end * SAMPLE_RATE)], options)
+        for chunk in chunks
+    ]
+    results = []
+    for chunk, future in zip(chunks, futures):
+        results.append(future.result())
+        print(f"  chunk {chunk.index + 1}/{len(chunks)} ({chunk.start:.0f}s-{chunk.end:.0f}s) done")
+    return stitch(chunks, results)
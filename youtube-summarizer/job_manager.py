@@ -0,0 +1,185 @@
+# job_manager.py
+"""
+Concurrent summarizer jobs, each in its own work directory.
+
+    manager = JobManager(max_workers=2)
+    job = manager.submit(url)
+    for snapshot in manager.follow(job.id):
+        print(snapshot.status, snapshot.progress)
+    print(manager.get(job.id).summary)
+
+Every job writes its audio, transcript.txt and summary.md under
+`<root>/<job id>/`, so concurrent requests no longer overwrite each
+other's files. Jobs run on a bounded pool of `max_workers` threads; up to
+`max_queued` more wait in line and further submissions are rejected with
+JobQueueFull. When a job finishes, its audio is deleted and only the
+transcript and summary are kept. Past `max_finished_jobs`, the oldest
+finished jobs and their directories are removed.
+
+Whisper inference is serialised per resident model (whisper_pool.py), so
+concurrent jobs overlap downloads, transcription on other models or
+worker processes, and LLM calls.
+"""
+
+import os
+import shutil
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Iterator, List, Optional
+
+from youtube_summarizer import ensure_output_folder, process_youtube_video
+from streaming_pipeline import stream_youtube_video
+
+KEEP_FILES = {"transcript.txt", "summary.md"}
+FINISHED = {"done", "failed"}
+
+
+class JobQueueFull(RuntimeError):
+    """All workers are busy and the queue is at capacity"""
+
+
+@dataclass
+class Job:
+    """Status and results of one summarizer run"""
+    id: str
+    url: str
+    work_dir: str
+    status: str = "queued"  # queued, running, done, failed
+    progress: str = "Queued"
+    transcript: str = ""
+    summary: str = ""
+    error: Optional[str] = None
+    created_at: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+
+
+class JobManager:
+    """Bounded worker pool and queue for summarizer jobs"""
+
+    def __init__(self, root: str = os.path.join("outputs", "jobs"), max_workers: int = 2, max_queued: int = 16,
+                 max_finished_jobs: int = 100, model_size: str = "base", transcribe_workers: int = 1,
+                 streaming: bool = True):
+        self.root = root
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.max_finished_jobs = max_finished_jobs
+        self.model_size = model_size
+        self.transcribe_workers = transcribe_workers
+        self.streaming = streaming
+        ensure_output_folder(root)
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="summarizer-job")
+
+    def submit(self, url: str) -> Job:
+        with self._lock:
+            waiting = sum(1 for job in self._jobs.values() if job.status == "queued")
+            if waiting >= self.max_queued:
+                raise JobQueueFull(f"{waiting} jobs are already waiting; try again later")
+            job_id = uuid.uuid4().hex[:12]
+            job = Job(job_id, url, os.path.join(self.root, job_id), created_at=time.time())
+            self._jobs[job_id] = job
+        ensure_output_folder(job.work_dir)
+        self._executor.submit(self._run, job)
+        return replace(job)
+
+    def get(self, job_id: str) -> Job:
+        """Snapshot of the job; KeyError for unknown or pruned ids"""
+        with self._lock:
+            job = self._jobs[job_id]
+            snapshot = replace(job)
+        if job.status == "queued":
+            snapshot.progress = f"Queued (position {self.queue_position(job_id)})"
+        return snapshot
+
+    def jobs(self) -> List[Job]:
+        with self._lock:
+            return [replace(job) for job in self._jobs.values()]
+
+    def queue_position(self, job_id: str) -> int:
+        with self._lock:
+            queued = [job.id for job in self._jobs.values() if job.status == "queued"]
+        return queued.index(job_id) + 1 if job_id in queued else 0
+
+    def follow(self, job_id: str, timeout: float = 1.0) -> Iterator[Job]:
+        """Snapshots of the job whenever it changes (or every `timeout` seconds) until it finishes"""
+        while True:
+            snapshot = self.get(job_id)
+            yield snapshot
+            if snapshot.finished:
+                return
+            with self._changed:
+                self._changed.wait(timeout)
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Job:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._changed:
+            while not self._jobs[job_id].finished:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._changed.wait(remaining)
+        return self.get(job_id)
+
+    def _update(self, job: Job, **changes) -> None:
+        with self._changed:
+            for name, value in changes.items():
+                setattr(job, name, value)
+            self._changed.notify_all()
+
+    def _run(self, job: Job) -> None:
+        self._update(job, status="running", progress="Starting", started_at=time.time())
+        try:
+            if self.streaming:
+                for update in stream_youtube_video(job.url, self.model_size, output_folder=job.work_dir,
+                                                   workers=self.transcribe_workers):
+                    self._update(job, progress=update.status, transcript=update.transcript,
+                                 summary=update.summary or update.partial_summary)
+            else:
+                self._update(job, progress="Downloading, transcribing and summarising")
+                transcript, summary = process_youtube_video(job.url, self.model_size, output_folder=job.work_dir)
+                self._update(job, transcript=transcript, summary=summary)
+            outcome = {"status": "done", "progress": "Done"}
+        except Exception as e:
+            print(f"❌ Job {job.id} failed: {e}")
+            outcome = {"status": "failed", "progress": f"Error: {e}", "error": str(e)}
+        # Clean up before reporting the job finished, so its results are final once it is
+        self._cleanup(job)
+        self._update(job, finished_at=time.time(), **outcome)
+        self._prune()
+
+    def _cleanup(self, job: Job) -> None:
+        """Delete the job's audio and any other intermediate files, keeping the transcript and summary"""
+        for name in os.listdir(job.work_dir):
+            if name in KEEP_FILES:
+                continue
+            path = os.path.join(job.work_dir, name)
+            try:
+                if os.path.isdir(path):
+                    shutil.rmtree(path)
+                else:
+                    os.remove(path)
+            except OSError as e:
+                print(f"Could not remove {path}: {e}")
+
+    def _prune(self) -> None:
+        with self._lock:
+            finished = [job for job in self._jobs.values() if job.finished]
+            stale = finished[:max(0, len(finished) - self.max_finished_jobs)]
+            for job in stale:
+                del self._jobs[job.id]
+        for job in stale:
+            shutil.rmtree(job.work_dir, ignore_errors=True)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,298 @@
+# streaming_pipeline.py
+"""
+Streaming mode: transcribe while yt-dlp is still downloading.
+
+    for update in stream_youtube_video(url):
+        print(update.status)
+    transcript, summary = update.transcript, update.summary
+
+yt-dlp writes the audio to stdout and ffmpeg decodes it to 16 kHz mono PCM
+as it arrives. The PCM is cut at pauses into rolling segments (a short
+first one so text shows up within seconds, then about `segment_seconds`
+each) and every segment is transcribed as soon as it is cut, on the
+resident Whisper model or, with `workers` > 1, on the worker processes
+from chunked_transcription.py. A running summary is refreshed in the
+background every `summary_every_seconds` of new transcript, and the full
+markdown summary is generated once the transcript is complete.
+
+Cached artifacts (artifact_cache.py) short-circuit the run: a cached
+transcript skips the download and Whisper, cached audio skips the
+download, and a cached summary skips the LLM.
+
+Each StreamUpdate carries the progress so far, so app.py can show the
+transcript and summaries live.
+"""
+
+import os
+import queue
+import subprocess
+import tempfile
+import threading
+import wave
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import whisper
+
+from chunked_transcription import (SAMPLE_RATE, AudioChunk, append_chunk, get_executor, quietest_point,
+                                   smoothed_energy, transcribe_chunk)
+from youtube_summarizer import (ensure_output_folder, get_tittle_from_url, save_markdown_summary, summary_params,
+                                summarize_partial_with_ollama, summarize_with_ollama, transcript_params)
+from artifact_cache import get_artifact_cache, video_id
+
+BYTES_PER_SECOND = SAMPLE_RATE * 2  # s16le mono
+
+
+@dataclass
+class StreamUpdate:
+    """Progress of a streaming run; `summary` is set once the run is done"""
+    stage: str
+    downloaded_seconds: float = 0.0
+    transcribed_seconds: float = 0.0
+    transcript: str = ""
+    partial_summary: str = ""
+    summary: str = ""
+    segments: List[Dict[str, Any]] = field(default_factory=list)
+    done: bool = False
+
+    @property
+    def status(self) -> str:
+        return (f"{self.stage}: downloaded {self.downloaded_seconds:.0f}s, "
+                f"transcribed {self.transcribed_seconds:.0f}s")
+
+
+class PcmStream:
+    """yt-dlp | ffmpeg, yielding 16 kHz mono float32 blocks as they are decoded and saving them as WAV"""
+
+    def __init__(self, url: str, wav_path: str):
+        self.url = url
+        self.wav_path = wav_path
+        self.seconds = 0.0
+        self._errors = [tempfile.TemporaryFile(), tempfile.TemporaryFile()]
+        self._download = subprocess.Popen(
+            ["yt-dlp", "-f", "bestaudio", "--quiet", "--no-progress", "--no-part", "--output", "-", url],
+            stdout=subprocess.PIPE, stderr=self._errors[0]
+        )
+        self._decode = subprocess.Popen(
+            ["ffmpeg", "-loglevel", "error", "-i", "pipe:0", "-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE),
+             "pipe:1"],
+            stdin=self._download.stdout, stdout=subprocess.PIPE, stderr=self._errors[1]
+        )
+        # ffmpeg owns the pipe now; closing our copy lets yt-dlp see a broken pipe if ffmpeg exits
+        self._download.stdout.close()
+
+    def blocks(self, block_seconds: float = 1.0) -> Iterator[np.ndarray]:
+        block_bytes = int(block_seconds * BYTES_PER_SECOND)
+        with wave.open(self.wav_path, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(SAMPLE_RATE)
+            while True:
+                data = self._decode.stdout.read(block_bytes)
+                if not data:
+                    break
+                # read() returns the full block except at the end of the stream, so samples are never split
+                wav.writeframes(data)
+                self.seconds += len(data) / BYTES_PER_SECOND
+                yield np.frombuffer(data[:len(data) // 2 * 2], dtype=np.int16).astype(np.float32) / 32768.0
+        self._check()
+
+    def _check(self) -> None:
+        for name, process, errors in (("yt-dlp", self._download, self._errors[0]),
+                                      ("ffmpeg", self._decode, self._errors[1])):
+            if process.wait() != 0:
+                errors.seek(0)
+                raise RuntimeError(f"{name} failed: {errors.read().decode('utf-8', 'replace')[-2000:]}")
+
+    def close(self) -> None:
+        for process in (self._decode, self._download):
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+        for errors in self._errors:
+            errors.close()
+
+
+class AudioFileStream:
+    """Cached audio decoded in one go and fed through the same segmenting path as a live download"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.seconds = 0.0
+
+    def blocks(self, block_seconds: float = 1.0) -> Iterator[np.ndarray]:
+        audio = whisper.load_audio(self.path)
+        self.seconds = len(audio) / SAMPLE_RATE
+        block = int(block_seconds * SAMPLE_RATE)
+        for start in range(0, len(audio), block):
+            yield audio[start:start + block]
+
+    def close(self) -> None:
+        pass
+
+
+def segment_stream(blocks: Iterator[np.ndarray], first_segment_seconds: float = 20.0,
+                   segment_seconds: float = 60.0, search_seconds: float = 10.0,
+                   overlap_seconds: float = 1.0) -> Iterator[Tuple[AudioChunk, np.ndarray]]:
+    """Cut a live PCM stream into overlapping chunks at pauses, as soon as each cut point has been heard"""
+    pieces: List[np.ndarray] = []
+    buffered = 0  # samples in `pieces`
+    buffer_start = 0.0  # stream time of the first buffered sample
+    chunk_start = 0.0
+    index = 0
+    target = first_segment_seconds
+    for block in blocks:
+        pieces.append(block)
+        buffered += len(block)
+        # Enough audio to search past the target and to pad the chunk on the right
+        if buffer_start + buffered / SAMPLE_RATE < target + search_seconds + overlap_seconds:
+            continue
+        buffer = np.concatenate(pieces)
+        search_from = max(chunk_start + 1.0, target - search_seconds)
+        cut = buffer_start + quietest_point(smoothed_energy(buffer), search_from - buffer_start,
+                                            target + search_seconds - buffer_start)
+        padded_end = cut + overlap_seconds
+        yield (AudioChunk(index, chunk_start, cut, buffer_start, padded_end),
+               buffer[:int((padded_end - buffer_start) * SAMPLE_RATE)])
+        # Keep the left padding of the next chunk
+        keep_from = max(buffer_start, cut - overlap_seconds)
+        pieces = [buffer[int((keep_from - buffer_start) * SAMPLE_RATE):]]
+        buffered = len(pieces[0])
+        buffer_start, chunk_start = keep_from, cut
+        index += 1
+        target = cut + segment_seconds
+    if buffered:
+        end = buffer_start + buffered / SAMPLE_RATE
+        yield AudioChunk(index, chunk_start, end, buffer_start, end), np.concatenate(pieces)
+
+
+def _stream_transcript(url: str, audio_path: Optional[str], model_size: str, output_folder: str, workers: int,
+                       summary_every_seconds: float, update: StreamUpdate, background: ThreadPoolExecutor,
+                       segment_options: Dict[str, Any]) -> Iterator[StreamUpdate]:
+    """Transcribe a live download (or cached audio) segment by segment into `update`"""
+    if workers > 1:
+        transcriber = None
+        submit = lambda audio: get_executor(model_size, workers).submit(transcribe_chunk, model_size, audio, {})
+    else:
+        transcriber = ThreadPoolExecutor(max_workers=1)
+        submit = lambda audio: transcriber.submit(transcribe_chunk, model_size, audio, {})
+
+    if audio_path is not None:
+        print("\n♻️ Using cached audio")
+        stream = AudioFileStream(audio_path)
+    else:
+        print("\n🔽 Streaming audio from YouTube and transcribing as it arrives")
+        stream = PcmStream(url, os.path.join(output_folder, "audio.wav"))
+    chunks: "queue.Queue[Any]" = queue.Queue()
+
+    def read() -> None:
+        try:
+            for item in segment_stream(stream.blocks(), **segment_options):
+                chunks.put(item)
+            chunks.put(None)
+        except Exception as e:
+            chunks.put(e)
+
+    reader = threading.Thread(target=read, daemon=True)
+    reader.start()
+
+    pending: "deque[Tuple[AudioChunk, Future]]" = deque()
+    summary_future: Optional[Future] = None
+    summarised_until = 0  # segments already folded into the running summary
+    reading = True
+    try:
+        while reading or pending:
+            try:
+                item = chunks.get(timeout=0.5)
+                if item is None:
+                    reading = False
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    chunk, audio = item
+                    pending.append((chunk, submit(audio)))
+                    update.stage = "Transcribing"
+            except queue.Empty:
+                pass
+            # Results are stitched in chunk order, so a fast later chunk waits for an earlier one
+            while pending and pending[0][1].done():
+                chunk, future = pending.popleft()
+                append_chunk(update.segments, chunk, future.result())
+                update.transcribed_seconds = chunk.end
+                update.transcript = " ".join(segment["text"] for segment in update.segments)
+                print(f"  transcribed up to {chunk.end:.0f}s")
+
+            if summary_future is not None and summary_future.done():
+                update.partial_summary = summary_future.result()
+                summary_future = None
+            new_segments = update.segments[summarised_until:]
+            if (summary_future is None and new_segments
+                    and new_segments[-1]["end"] - new_segments[0]["start"] >= summary_every_seconds):
+                summary_future = background.submit(summarize_partial_with_ollama, update.partial_summary,
+                                                   " ".join(segment["text"] for segment in new_segments))
+                summarised_until = len(update.segments)
+
+            update.downloaded_seconds = stream.seconds
+            yield update
+    finally:
+        stream.close()
+        if transcriber is not None:
+            transcriber.shutdown(wait=False, cancel_futures=True)
+    if audio_path is None:
+        # The download completed; keep the audio so a later run with another model can skip it
+        get_artifact_cache().put_file(video_id(url), "audio", {}, stream.wav_path)
+
+
+def stream_youtube_video(url: str, model_size: str = "base", output_folder: str = "outputs", workers: int = 1,
+                         summary_every_seconds: float = 300.0, **segment_options: Any) -> Iterator[StreamUpdate]:
+    """Download, transcribe and summarise concurrently, yielding progress along the way"""
+    ensure_output_folder(output_folder)
+    # Each stage is skipped when the artifact cache already has its output for this video and these parameters
+    cache = get_artifact_cache()
+    vid = video_id(url)
+    background = ThreadPoolExecutor(max_workers=3)
+    title_future = background.submit(get_tittle_from_url, url)
+    update = StreamUpdate(stage="Downloading")
+    try:
+        transcript = cache.get_text(vid, "transcript", transcript_params(model_size))
+        if transcript is not None:
+            print("\n♻️ Using cached transcript")
+            update.transcript = transcript
+        else:
+            yield from _stream_transcript(url, cache.get_path(vid, "audio", {}), model_size, output_folder, workers,
+                                          summary_every_seconds, update, background, segment_options)
+            cache.put_text(vid, "transcript", transcript_params(model_size), update.transcript)
+
+        transcript_path = os.path.join(output_folder, "transcript.txt")
+        with open(transcript_path, "w", encoding="utf-8") as f:
+            f.write(update.transcript)
+
+        update.summary = cache.get_text(vid, "summary", summary_params(model_size))
+        if update.summary is not None:
+            print("\n♻️ Using cached markdown summary")
+        else:
+            update.stage = "Summarising"
+            yield update
+            print("\n✂️ Generating markdown summary")
+            update.summary = summarize_with_ollama(update.transcript)
+            cache.put_text(vid, "summary", summary_params(model_size), update.summary)
+        markdown_path = save_markdown_summary(title_future.result(), url, update.summary, output_folder)
+        print("\n✅ Done! Markdown summary saved to:")
+        print("📁", markdown_path)
+        update.stage = "Done"
+        update.done = True
+        yield update
+    finally:
+        background.shutdown(wait=False, cancel_futures=True)
+
+
+if __name__ == "__main__":
+    url = input("Enter YouTube video URL: ").strip()
+    last_status = None
+    for progress in stream_youtube_video(url, output_folder="outputs"):
+        if progress.status != last_status:
+            print(progress.status)
+            last_status = progress.status
@@ -0,0 +1,153 @@
+# whisper_pool.py
+"""
+Process-wide registry of loaded Whisper models.
+
+    pool = get_pool()
+    pool.preload(["base"])                       # at server start
+    result = pool.transcribe("base", "outputs/audio.mp3")
+
+Each model size is loaded once, on first use, and kept resident so warm
+requests only pay for inference. Models are evicted least recently used
+first when the pool holds more than `max_models` or their weights exceed
+`memory_cap_mb`. Whisper's decoder installs per-call hooks on the model,
+so calls on the same model are serialised; different sizes run in
+parallel.
+
+The shared pool reads WHISPER_POOL_MAX_MODELS and WHISPER_POOL_MEMORY_MB.
+"""
+
+import gc
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+import whisper
+
+# Parameter counts from the Whisper model card, used to make room before a load (fp32 weights)
+MODEL_PARAMS = {
+    "tiny": 39_000_000,
+    "base": 74_000_000,
+    "small": 244_000_000,
+    "medium": 769_000_000,
+    "large": 1_550_000_000,
+    "turbo": 809_000_000,
+}
+
+
+def _model_mb(model: Any) -> float:
+    return sum(p.numel() * p.element_size() for p in model.parameters()) / 1024 / 1024
+
+
+def _estimated_mb(model_size: str) -> float:
+    base_size = model_size.split(".")[0].split("-")[0]
+    return MODEL_PARAMS.get(base_size, 0) * 4 / 1024 / 1024
+
+
+class _Entry:
+    def __init__(self, model: Any):
+        self.model = model
+        self.size_mb = _model_mb(model)
+        # Serialises inference on this model
+        self.lock = threading.Lock()
+
+
+class WhisperModelPool:
+    """Lazily loaded, LRU-evicted, thread-safe Whisper models keyed by size"""
+
+    def __init__(self, max_models: int = 2, memory_cap_mb: Optional[float] = None, device: Optional[str] = None,
+                 download_root: Optional[str] = None):
+        self.max_models = max_models
+        self.memory_cap_mb = memory_cap_mb
+        self.device = device
+        self.download_root = download_root
+        self._models: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        # One lock per size so two first requests for the same size load it once
+        self._load_locks: Dict[str, threading.Lock] = {}
+
+    def _resident_mb(self) -> float:
+        return sum(entry.size_mb for entry in self._models.values())
+
+    def _evict(self, incoming_mb: float = 0.0, keep: Optional[str] = None) -> None:
+        """Drop least recently used models until the pool (plus `incoming_mb`) fits its limits; caller holds _lock"""
+        incoming = 0 if keep is not None else 1
+        for name in list(self._models):
+            over_count = len(self._models) + incoming > self.max_models
+            over_memory = (self.memory_cap_mb is not None
+                           and self._resident_mb() + incoming_mb > self.memory_cap_mb)
+            if not (over_count or over_memory):
+                break
+            if name == keep:
+                continue
+            print(f"Evicting Whisper model ({name}) from the pool")
+            # Callers still transcribing hold their own reference; the weights are freed when they finish
+            del self._models[name]
+        gc.collect()
+
+    def _entry(self, model_size: str) -> _Entry:
+        with self._lock:
+            entry = self._models.get(model_size)
+            if entry is not None:
+                self._models.move_to_end(model_size)
+                return entry
+            load_lock = self._load_locks.setdefault(model_size, threading.Lock())
+        with load_lock:
+            with self._lock:
+                entry = self._models.get(model_size)
+                if entry is not None:
+                    self._models.move_to_end(model_size)
+                    return entry
+                self._evict(incoming_mb=_estimated_mb(model_size))
+            print(f"Loading Whisper model ({model_size})...")
+            start = time.perf_counter()
+            model = whisper.load_model(model_size, device=self.device, download_root=self.download_root)
+            entry = _Entry(model)
+            print(f"Loaded Whisper model ({model_size}, {entry.size_mb:.0f} MB) in {time.perf_counter() - start:.1f}s")
+            with self._lock:
+                self._models[model_size] = entry
+                self._evict(keep=model_size)
+            return entry
+
+    def get(self, model_size: str) -> Any:
+        """The resident model for `model_size`, loading it on first use; use `model()` or `transcribe()` for inference"""
+        return self._entry(model_size).model
+
+    @contextmanager
+    def model(self, model_size: str) -> Iterator[Any]:
+        """Exclusive use of the model for the duration of the block"""
+        entry = self._entry(model_size)
+        with entry.lock:
+            yield entry.model
+
+    def transcribe(self, model_size: str, audio: Any, **options: Any) -> Dict[str, Any]:
+        """whisper `model.transcribe(audio, **options)` on the resident model"""
+        with self.model(model_size) as model:
+            return model.transcribe(audio, **options)
+
+    def preload(self, model_sizes: Iterable[str]) -> None:
+        for model_size in model_sizes:
+            self._entry(model_size)
+
+    def loaded(self) -> Dict[str, float]:
+        """Resident model sizes (least recently used first) and their weights in MB"""
+        with self._lock:
+            return {name: entry.size_mb for name, entry in self._models.items()}
+
+
+_pool: Optional[WhisperModelPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> WhisperModelPool:
+    """Process-wide pool shared by the CLI and the Gradio app"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                memory_cap = os.getenv("WHISPER_POOL_MEMORY_MB")
+                _pool = WhisperModelPool(max_models=int(os.getenv("WHISPER_POOL_MAX_MODELS", "2")),
+                                         memory_cap_mb=float(memory_cap) if memory_cap else None)
+    return _pool
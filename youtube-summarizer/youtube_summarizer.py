@@ -1,24 +1,45 @@
 # youtube_summarizer.py
 import os
+import sys
 import subprocess
 import whisper
 from transformers import pipeline
 import warnings
-import requests
 import json
-from openai import OpenAI
+
+# The shared LLM client lives in common/ at the repository root
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.llm_client import get_client
+from whisper_pool import get_pool
+from chunked_transcription import SAMPLE_RATE, default_workers, transcribe_long_audio
+from artifact_cache import get_artifact_cache, video_id
 
 # Suppress FP16 warning on CPU
 warnings.filterwarnings("ignore", category=UserWarning)
-OLLAMA_ENDPOINT = "http://localhost:11434/api/generate"
+# Endpoints and keys (OLLAMA_HOST, PERPLEXITY_API_KEY) are resolved by the shared client
 OLLAMA_MODEL = "llama3"
-PERPLIXITY_ENDPOINT = "https://api.perplexity.ai"
-api_key = os.getenv("PERPLEXITY_API_KEY"); 
+PERPLEXITY_MODEL = "sonar"
+# Audio longer than this is transcribed in parallel chunks
+LONG_AUDIO_SECONDS = float(os.getenv("LONG_AUDIO_SECONDS", "600"))
+# Bump when the summary prompt changes so cached summaries are regenerated
+SUMMARY_PROMPT_VERSION = 1
 
 def ensure_output_folder(folder):
     os.makedirs(folder, exist_ok=True)
 
+def transcript_params(model_size):
+    """Artifact cache parameters of a transcript"""
+    return {"model_size": model_size}
+
+def summary_params(model_size):
+    """Artifact cache parameters of a summary; it depends on the transcript it was made from"""
+    return {**transcript_params(model_size), "model": OLLAMA_MODEL, "prompt_version": SUMMARY_PROMPT_VERSION}
+
 def get_tittle_from_url(url):
+    cache = get_artifact_cache()
+    title = cache.get_text(video_id(url), "title", {})
+    if title is not None:
+        return title
     try:
         result = subprocess.run(
             ["yt-dlp", "--dump-json", url],
@@ -28,7 +49,9 @@ def get_tittle_from_url(url):
             text=True
         )
         info = json.loads(result.stdout)
-        return info.get("title", "YouTube Video")
+        title = info.get("title", "YouTube Video")
+        cache.put_text(video_id(url), "title", {}, title)
+        return title
     except Exception as e:
         print(f"Error getting video title from yt-dlp: {e}")
         return "YouTube Video"
@@ -63,10 +86,15 @@ def download_audio(youtube_url, output_folder="outputs", output_filename="audio.
         raise
     return output_path
 
-def transcribe_audio(file_path, model_size="base"):
-    print(f"Loading Whisper model ({model_size})...")
-    model = whisper.load_model(model_size)
-    result = model.transcribe(file_path)
+def transcribe_audio(file_path, model_size="base", workers=None):
+    audio = whisper.load_audio(file_path)
+    workers = workers or default_workers()
+    if workers > 1 and len(audio) / SAMPLE_RATE > LONG_AUDIO_SECONDS:
+        # Long audio: split on pauses and transcribe the pieces on worker processes
+        result = transcribe_long_audio(audio, model_size, workers)
+    else:
+        # Models stay resident in the shared pool; only the first call for a size pays the load
+        result = get_pool().transcribe(model_size, audio)
     return result['text']
 
 def summarize_text(text, max_chunk=1000):
@@ -85,13 +113,23 @@ def summarize_with_ollama(transcript):
         f"Transcript:\n{transcript}"
     )
     
-    response = requests.post(OLLAMA_ENDPOINT, json={
-        "model": OLLAMA_MODEL,
-        "prompt": prompt,
-        "stream": False
-    })
-    response.raise_for_status()
-    return response.json()["response"]
+    response = get_client().complete("ollama", OLLAMA_MODEL, prompt)
+    print(f"Usage: {response.usage}")
+    return response.text
+
+def summarize_partial_with_ollama(previous_summary, new_transcript):
+    print("Updating the running summary with LLaMA 3 via Ollama...")
+    prompt = (
+        "You are summarising a video while it is still being transcribed.\n"
+        "Update the running Markdown summary below with the new part of the transcript. Keep it short:\n"
+        "an overview and bullet points for the key points so far.\n\n"
+        f"Running summary:\n{previous_summary or '(none yet)'}\n\n"
+        f"New transcript:\n{new_transcript}"
+    )
+    response = get_client().complete("ollama", OLLAMA_MODEL, prompt)
+    print(f"Usage: {response.usage}")
+    return response.text
+
 def summarize_with_perplexity(transcript):
     print("Generating structured markdown summary with Perplexity AI...")
     prompt = (
@@ -100,8 +138,9 @@ def summarize_with_perplexity(transcript):
         "and a timeline breakdown if you detect one.\n\n"
         f"Transcript:\n{transcript}"
     )
-    client = OpenAI(api_key, base_url=PERPLIXITY_ENDPOINT)
-    
+    response = get_client().complete("perplexity", PERPLEXITY_MODEL, prompt)
+    print(f"Usage: {response.usage}")
+    return response.text
 
 
 
@@ -116,11 +155,24 @@ def save_markdown_summary(title, url, markdown_summary, output_folder="outputs")
 
 
 def process_youtube_video(url, model_size="base", output_folder="outputs"):
-    print("\n🔽 Step 1: Downloading audio from YouTube")
-    audio_path = download_audio(url, output_folder=output_folder)
-
-    print("\n🧠 Step 2: Transcribing with Whisper")
-    transcript = transcribe_audio(audio_path, model_size)
+    ensure_output_folder(output_folder)
+    # Each stage is skipped when the artifact cache already has its output for this video and these parameters
+    cache = get_artifact_cache()
+    vid = video_id(url)
+    transcript = cache.get_text(vid, "transcript", transcript_params(model_size))
+    if transcript is not None:
+        print("\n♻️ Steps 1-2: Using cached transcript")
+    else:
+        audio_path = cache.get_path(vid, "audio", {})
+        if audio_path is not None:
+            print("\n♻️ Step 1: Using cached audio")
+        else:
+            print("\n🔽 Step 1: Downloading audio from YouTube")
+            audio_path = cache.put_file(vid, "audio", {}, download_audio(url, output_folder=output_folder))
+
+        print("\n🧠 Step 2: Transcribing with Whisper")
+        transcript = transcribe_audio(audio_path, model_size)
+        cache.put_text(vid, "transcript", transcript_params(model_size), transcript)
 
     transcript_path = os.path.join(output_folder, "transcript.txt")
     with open(transcript_path, "w", encoding="utf-8") as f:
@@ -129,9 +181,14 @@ def process_youtube_video(url, model_size="base", output_folder="outputs"):
    # print("\n✂️ Step 3: Summarizing transcript")
     # summary = summarize_text(transcript)
     
-    print("\n✂️ Step 3: Generating markdown summary")
-    markdown_summary = summarize_with_ollama(transcript)
-    
+    markdown_summary = cache.get_text(vid, "summary", summary_params(model_size))
+    if markdown_summary is not None:
+        print("\n♻️ Step 3: Using cached markdown summary")
+    else:
+        print("\n✂️ Step 3: Generating markdown summary")
+        markdown_summary = summarize_with_ollama(transcript)
+        cache.put_text(vid, "summary", summary_params(model_size), markdown_summary)
+
     markdown_path = save_markdown_summary(get_tittle_from_url(url), url, markdown_summary, output_folder)
 
     print("\n✅ Done! Markdown summary saved to:")